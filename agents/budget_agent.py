@@ -22,7 +22,7 @@ BUDGET_AGENT_SYS_PROMPT = """
 </agent_role>
 """
 
-def create_budget_agent():
+def create_budget_agent(dataset=None, rollup_level=None):
     BA_model = get_text_model_instance()
     
     BA_agent = Agent(
@@ -42,7 +42,7 @@ def create_budget_agent():
     @BA_agent.tool_plain
     def project_tool() -> dict:
         nonlocal projection_data
-        projection_data = project_budget(file_path="input_data.json")
+        projection_data = project_budget(file_path="input_data.json", dataset=dataset, level=rollup_level)
         return projection_data
     
     @BA_agent.tool_plain
@@ -55,12 +55,25 @@ def create_budget_agent():
             print("Error: No projection data available")
             return "unknown"
         
-        return risk_identification(projections=data_to_use)
+        return risk_identification(projections=data_to_use, level=rollup_level)
     
     return BA_agent
 
-async def run_budget_agent():
-    agent = create_budget_agent()
+def run_budget_skills(dataset=None, rollup_level=None):
+    """
+    Runs the Budget Agent's tool chain directly without a model call:
+    project_budget followed by risk_identification on its output.
+    With a rollup_level the projections list category subtotals at that level.
+    """
+    projections = project_budget(file_path="input_data.json", dataset=dataset, level=rollup_level)
+    risk_level = risk_identification(projections=projections, level=rollup_level)
+    return {
+        "projections": projections,
+        "risk_ranking": risk_level
+    }
+
+async def run_budget_agent(dataset=None, rollup_level=None):
+    agent = create_budget_agent(dataset, rollup_level)
     prompt = "Create budget projections and evaluate financial risk."
     
     # logfire.configure(send_to_logfire='if-token-present')
@@ -71,25 +84,13 @@ async def run_budget_agent():
         # If the agent didn't return a dictionary, create one with the required fields
         print("Warning: Budget agent didn't return a dictionary, creating proper structure")
         # Call the tools directly to ensure we have the data
-        projections = project_budget(file_path="input_data.json")
-        risk_level = risk_identification(projections=projections)
-        return {
-            "projections": projections,
-            "risk_ranking": risk_level
-        }
+        return run_budget_skills(dataset, rollup_level)
     
     # If it's a dict but missing required keys, add them
     if "projections" not in result.data or "risk_ranking" not in result.data:
         print("Warning: Budget agent response missing required keys, fixing structure")
         # Call the tools directly to ensure we have the data
-        projections = project_budget(file_path="input_data.json")
-        risk_level = risk_identification(projections=projections)
-        
-        # Create properly formatted response
-        return {
-            "projections": projections,
-            "risk_ranking": risk_level
-        }
+        return run_budget_skills(dataset, rollup_level)
     
     return result.data
 
@@ -8,7 +8,7 @@ from agent_factory import get_text_model_instance
 
 # Import tools
 from skills.data_validation_tool import validate_data
-from skills.visualization_tool import create_visual_plots_from_json
+from skills.visualization_tool import create_plot_artifacts, create_visual_plots_from_json
 
 # Load environment variables
 load_dotenv()
@@ -22,7 +22,7 @@ You are the Data Manager Agent for the Ministry of Finance system. Your task is
 </agent_role>
 """
 
-def create_data_manager_agent():
+def create_data_manager_agent(dataset=None, plots=None, plots_dir="visual plots", incremental=False):
     DMA_model = get_text_model_instance()
     
     DMA_agent = Agent(
@@ -38,20 +38,46 @@ def create_data_manager_agent():
     
     @DMA_agent.tool_plain
     def validate_data_tool() -> bool:
-        return validate_data(file_path="input_data.json")
+        return validate_data(file_path="input_data.json", dataset=dataset, incremental=incremental)
     
     @DMA_agent.tool_plain
     def create_visual_plots_tool() -> None:
-        return create_visual_plots_from_json(file_path="input_data.json")
+        # When a plots list is given, the charts are kept in memory for the report
+        if plots is None:
+            return create_visual_plots_from_json(file_path="input_data.json", dataset=dataset)
+        if dataset is not None:
+            plots[:] = create_plot_artifacts(dataset, plots_dir)
     
     return DMA_agent
 
-async def run_data_manager_agent():
-    agent = create_data_manager_agent()
+def run_data_manager_skills(dataset=None, plots=None, plots_dir="visual plots", incremental=False):
+    """
+    Runs the Data Manager Agent's tools directly without a model call.
+    Plots are only generated when the data passes validation. When a plots list is given,
+    the charts are rendered into it as in-memory artifacts and only saved to plots_dir if
+    that is set. With incremental=True only records appended since the last successful
+    validation are checked.
+    """
+    data_valid = validate_data(file_path="input_data.json", dataset=dataset, incremental=incremental)
+    if data_valid:
+        if plots is None:
+            create_visual_plots_from_json(file_path="input_data.json", dataset=dataset)
+        elif dataset is not None:
+            plots[:] = create_plot_artifacts(dataset, plots_dir)
+    return {"data_valid": data_valid}
+
+async def run_data_manager_agent(dataset=None, plots=None, plots_dir="visual plots", incremental=False):
+    agent = create_data_manager_agent(dataset, plots, plots_dir, incremental)
     prompt = "Is the input data valid? Yes or No. Also generate visual plots."
     
     # logfire.configure(send_to_logfire='if-token-present')
     result = await agent.run(user_prompt=prompt)
+
+    # The model may skip the plot tool; render the charts directly so the report never
+    # falls back to images an earlier run left in plots_dir
+    if plots is not None and not plots and dataset is not None and dataset.validation_result:
+        print("Warning: Data Manager agent didn't render the plots, rendering them directly")
+        plots[:] = create_plot_artifacts(dataset, plots_dir)
     return result.data
 
 if __name__ == "__main__":
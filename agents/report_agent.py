@@ -22,6 +22,8 @@ class RA_deps:
     tax_slabs: List[Dict[str, Any]]
     visual_plots_dir: str
     insights: Dict[str, Any] = None
+    plots: List[Any] = None
+    rollup_level: int = None
 
 REPORT_SYS_PROMPT = """
 <agent_role>
@@ -68,13 +70,37 @@ def create_report_agent():
             tax_slabs=ctx.deps.tax_slabs,
             visual_plots_dir=ctx.deps.visual_plots_dir,
             output_pdf=output_pdf,
-            insights=ctx.deps.insights
+            insights=ctx.deps.insights,
+            plots=ctx.deps.plots,
+            level=ctx.deps.rollup_level
         )
         return output_pdf
     
     return RA_agent
 
-async def run_report_agent(projections, risk_level, tax_slabs, visual_plots_dir="visual_plots", insights=None):
+def run_report_skills(projections, risk_level, tax_slabs, visual_plots_dir="visual_plots", insights=None, plots=None,
+                      rollup_level=None):
+    """
+    Compiles the report directly without a model call. When no insights are given,
+    compile_report falls back to its default insight paragraphs. In-memory plot artifacts
+    are embedded directly; without them the plots are read from visual_plots_dir.
+    With a rollup_level the revenue and expenditure tables list category subtotals.
+    """
+    output_pdf = "final_budget_report.pdf"
+    compile_report(
+        projections=projections,
+        risk_level=risk_level,
+        tax_slabs=tax_slabs,
+        visual_plots_dir=visual_plots_dir,
+        output_pdf=output_pdf,
+        insights=insights,
+        plots=plots,
+        level=rollup_level
+    )
+    return {"report_path": output_pdf}
+
+async def run_report_agent(projections, risk_level, tax_slabs, visual_plots_dir="visual_plots", insights=None, plots=None,
+                           rollup_level=None):
     agent = create_report_agent()
     
     # If insights are not provided, instruct the agent to generate them
@@ -95,7 +121,9 @@ async def run_report_agent(projections, risk_level, tax_slabs, visual_plots_dir=
         risk_ranking=risk_level,
         tax_slabs=tax_slabs,
         visual_plots_dir=visual_plots_dir,
-        insights=insights
+        insights=insights,
+        plots=plots,
+        rollup_level=rollup_level
     )
     
     # logfire.configure(send_to_logfire='if-token-present')
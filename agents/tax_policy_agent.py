@@ -25,7 +25,7 @@ Your final output must be a JSON object with a key "recommended_slabs" containin
 </agent_role>
 """
 
-def create_tax_policy_agent():
+def create_tax_policy_agent(dataset=None, income_file=None):
     TA_model = get_text_model_instance()
     
     TA_agent = Agent(
@@ -42,7 +42,7 @@ def create_tax_policy_agent():
     @TA_agent.tool_plain
     def project_tool() -> dict:
         """Generate budget projections that will be used for tax slab calculation"""
-        return project_budget(file_path="input_data.json")
+        return project_budget(file_path="input_data.json", dataset=dataset)
     
     @TA_agent.tool_plain
     def slabs_tool(projections: dict) -> list:
@@ -54,12 +54,24 @@ def create_tax_policy_agent():
         # Explicitly print what we received to debug
         print(f"Received projections for tax slab creation: {type(projections)}")
         
-        return create_tax_slabs(projections=projections)
+        return create_tax_slabs(projections=projections, income_file=income_file)
     
     return TA_agent
 
-async def run_tax_policy_agent():
-    agent = create_tax_policy_agent()
+def run_tax_policy_skills(dataset=None, income_file=None):
+    """
+    Runs the Tax Policy Agent's tool chain directly without a model call:
+    project_budget followed by create_tax_slabs on its output. With an income_file the
+    slabs are optimized over those taxpayer incomes to cover the projected deficit.
+    """
+    projections = project_budget(file_path="input_data.json", dataset=dataset)
+    slabs = create_tax_slabs(projections=projections, income_file=income_file)
+    return {
+        "recommended_slabs": slabs
+    }
+
+async def run_tax_policy_agent(dataset=None, income_file=None):
+    agent = create_tax_policy_agent(dataset, income_file)
     prompt = "Create tax slabs based on budget projections."
     
     # logfire.configure(send_to_logfire='if-token-present')
@@ -69,11 +81,7 @@ async def run_tax_policy_agent():
     if not isinstance(result.data, dict):
         print("Warning: Tax agent didn't return a dictionary, creating proper structure")
         # Call the tools directly to ensure we have the data
-        projections = project_budget(file_path="input_data.json")
-        slabs = create_tax_slabs(projections=projections)
-        return {
-            "recommended_slabs": slabs
-        }
+        return run_tax_policy_skills(dataset, income_file)
     
     # If the result is missing the expected key
     if "recommended_slabs" not in result.data:
@@ -87,11 +95,7 @@ async def run_tax_policy_agent():
                     return {"recommended_slabs": value}
         
         # If no list is found, call the tools directly
-        projections = project_budget(file_path="input_data.json")
-        slabs = create_tax_slabs(projections=projections)
-        return {
-            "recommended_slabs": slabs
-        }
+        return run_tax_policy_skills(dataset, income_file)
     
     return result.data
 
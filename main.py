@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 from dotenv import load_dotenv
 import json
@@ -7,14 +8,26 @@ from orchestrator import run
 # Load environment variables
 load_dotenv()
 
-async def main():
+async def main(deterministic: bool = False, rollup_level: int = None, plots_dir: str = "visual plots",
+               incremental_validation: bool = False, income_file: str = None, aggregate_stream: bool = False,
+               input_path: str = None):
     """
     Main entry point for the Ministry of Finance system.
+    With deterministic=True the skills are run directly without any model calls.
+    rollup_level reports revenue and expenditure at that level of their category paths.
+    Plots are also saved to plots_dir, unless it is None.
+    incremental_validation only validates records appended since the last successful run.
+    With an income_file of taxpayer incomes the tax slabs are optimized to cover the deficit.
+    input_path replaces input_data.json; .ndjson/.jsonl inputs are streamed, and with
+    aggregate_stream their line items are summed per category as they arrive, so memory
+    stays bounded however many records the input holds.
     """
     print("Initializing Ministry of Finance system...")
     logfire.configure(send_to_logfire='if-token-present')
     # Run the orchestrated workflow
-    result = await run()
+    result = await run(deterministic=deterministic, rollup_level=rollup_level, plots_dir=plots_dir,
+                       incremental_validation=incremental_validation, income_file=income_file,
+                       aggregate_stream=aggregate_stream, input_path=input_path)
     
     # Output the final result
     if result["status"] == "success":
@@ -27,4 +40,23 @@ async def main():
     return result
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Ministry of Finance budget workflow")
+    parser.add_argument("--no-llm", action="store_true",
+                        help="Run the skills directly with default insights and no model calls")
+    parser.add_argument("--rollup-level", type=int, default=None,
+                        help="Project and report revenue/expenditure at this level of the category paths")
+    parser.add_argument("--no-plot-files", action="store_true",
+                        help="Keep the plots in memory only instead of also saving them to 'visual plots'")
+    parser.add_argument("--incremental-validation", action="store_true",
+                        help="Only validate records appended to the input since the last successful run")
+    parser.add_argument("--income-file", default=None,
+                        help="Taxpayer incomes (.npy or CSV) to optimize the tax slabs over the projected deficit")
+    parser.add_argument("--input", default=None,
+                        help="Input data file (JSON, or NDJSON/JSONL to stream it) instead of input_data.json")
+    parser.add_argument("--aggregate-stream", action="store_true",
+                        help="Sum the line items of an NDJSON input per category while streaming it (bounded memory)")
+    args = parser.parse_args()
+    asyncio.run(main(deterministic=args.no_llm, rollup_level=args.rollup_level,
+                     plots_dir=None if args.no_plot_files else "visual plots",
+                     incremental_validation=args.incremental_validation, income_file=args.income_file,
+                     aggregate_stream=args.aggregate_stream, input_path=args.input))
\ No newline at end of file
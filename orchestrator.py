@@ -2,83 +2,218 @@ import asyncio
 import logfire
 from dotenv import load_dotenv
 import json
+from functools import partial
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
 
 # Import agent runner functions
-from agents.data_manager_agent import run_data_manager_agent
-from agents.budget_agent import run_budget_agent
-from agents.tax_policy_agent import run_tax_policy_agent
-from agents.report_agent import run_report_agent
+from agents.data_manager_agent import run_data_manager_agent, run_data_manager_skills
+from agents.budget_agent import run_budget_agent, run_budget_skills
+from agents.tax_policy_agent import run_tax_policy_agent, run_tax_policy_skills
+from agents.report_agent import run_report_agent, run_report_skills
+from skills.fiscal_dataset import load_dataset
 
 # Load environment variables
 load_dotenv()
 
-async def run_workflow():
+INPUT_DATA_PATH = "input_data.json"
+
+class WorkflowError(Exception):
     """
-    Orchestrates the workflow by running agents in sequence and passing data between them.
+    Raised by a stage to stop the workflow. The message becomes the 'reason' of the failed result.
     """
-    print("Starting Ministry of Finance workflow...")
-    
-    # Step 1: Run Data Manager Agent to validate data and create visualizations
-    print("Step 1: Running Data Manager Agent...")
-    data_manager_result = await run_data_manager_agent()
+
+
+@dataclass
+class Stage:
+    """
+    A single step of the workflow graph.
+
+    Attributes:
+        name: Unique stage name, used in logs and in other stages' 'after' lists.
+        run: Coroutine function called with one keyword argument per entry in 'inputs'.
+             It must return a dict containing every key listed in 'outputs'.
+        inputs: Context keys the stage consumes. Each is produced by another stage's 'outputs'.
+        outputs: Context keys the stage produces.
+        after: Extra stage names that must complete first even though no data is passed
+               (e.g. gating on successful validation).
+    """
+    name: str
+    run: Callable[..., Awaitable[Dict[str, Any]]]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+
+
+async def run_stages(stages: List[Stage], context: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Runs the stages as a dependency graph. A stage starts as soon as every stage producing one
+    of its inputs (or listed in 'after') has completed, so independent stages run concurrently.
+
+    Returns the context dict holding every stage output. If any stage raises, the remaining
+    running stages are cancelled and the exception propagates.
+    """
+    context = dict(context or {})
+
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                raise WorkflowError(f"Output '{output}' is produced by both '{producers[output]}' and '{stage.name}'")
+            producers[output] = stage.name
+
+    stage_names = {stage.name for stage in stages}
+    dependencies = {}
+    for stage in stages:
+        deps = set(stage.after)
+        for key in stage.inputs:
+            if key in producers:
+                deps.add(producers[key])
+            elif key not in context:
+                raise WorkflowError(f"Stage '{stage.name}' needs '{key}' but no stage produces it")
+        unknown = deps - stage_names
+        if unknown:
+            raise WorkflowError(f"Stage '{stage.name}' depends on unknown stages: {sorted(unknown)}")
+        dependencies[stage.name] = deps
+
+    pending = {stage.name: stage for stage in stages}
+    running = {}
+    completed = set()
+    try:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if dependencies[name] <= completed:
+                    kwargs = {key: context[key] for key in stage.inputs}
+                    running[asyncio.create_task(stage.run(**kwargs))] = stage
+                    del pending[name]
+
+            if not running:
+                raise WorkflowError(f"Circular stage dependencies: {sorted(pending)}")
+
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                stage = running.pop(task)
+                outputs = task.result()
+                missing = [key for key in stage.outputs if not isinstance(outputs, dict) or key not in outputs]
+                if missing:
+                    raise WorkflowError(f"Stage '{stage.name}' did not return {missing}")
+                context.update({key: outputs[key] for key in stage.outputs})
+                completed.add(stage.name)
+    finally:
+        for task in running:
+            task.cancel()
+
+    return context
+
+
+async def data_manager_stage(dataset, deterministic: bool = False, plots_dir: str = "visual plots",
+                             incremental_validation: bool = False) -> Dict[str, Any]:
+    """
+    Validates the input data and renders the visualizations into memory for the report,
+    also saving them to plots_dir unless it is None. With incremental_validation only
+    records appended since the last successful run are validated.
+    """
+    plots = []
+    if deterministic:
+        print("Running Data Manager skills (no LLM)...")
+        data_manager_result = run_data_manager_skills(dataset, plots, plots_dir, incremental_validation)
+    else:
+        print("Running Data Manager Agent...")
+        data_manager_result = await run_data_manager_agent(dataset, plots, plots_dir, incremental_validation)
     print(f"Data Manager Agent completed. Result: {data_manager_result}")
-    
+
     # Verify data is valid before proceeding
     if isinstance(data_manager_result, dict) and data_manager_result.get("data_valid") is False:
         print("Error: Input data failed validation. Stopping workflow.")
-        return {"status": "failed", "reason": "Data validation failed"}
-    
-    # Step 2: Run Budget Agent to generate projections and risk analysis
-    print("Step 2: Running Budget Agent...")
-    budget_result = await run_budget_agent()
+        raise WorkflowError("Data validation failed")
+
+    # Always a list, so the report never reads images an earlier run left in plots_dir
+    return {"data_validation": data_manager_result, "plots": plots}
+
+
+async def budget_stage(dataset, deterministic: bool = False, rollup_level: int = None) -> Dict[str, Any]:
+    """Generates projections and the risk ranking, optionally at a category roll-up level."""
+    if deterministic:
+        print("Running Budget skills (no LLM)...")
+        budget_result = run_budget_skills(dataset, rollup_level)
+    else:
+        print("Running Budget Agent...")
+        budget_result = await run_budget_agent(dataset, rollup_level)
     print(f"Budget Agent completed. Result type: {type(budget_result).__name__}")
-    
+
     # Extract projections and risk level from budget agent result
     if not isinstance(budget_result, dict):
         print(f"Error: Budget Agent returned {type(budget_result).__name__} instead of dictionary")
-        return {"status": "failed", "reason": f"Budget Agent returned invalid data type: {type(budget_result).__name__}"}
-    
+        raise WorkflowError(f"Budget Agent returned invalid data type: {type(budget_result).__name__}")
+
     print(f"Budget result keys: {list(budget_result.keys())}")
-    
+
     if "projections" not in budget_result:
         print("Error: Budget Agent did not return 'projections' key")
-        return {"status": "failed", "reason": "Budget data missing 'projections'"}
-        
+        raise WorkflowError("Budget data missing 'projections'")
+
     if "risk_ranking" not in budget_result:
         print("Error: Budget Agent did not return 'risk_ranking' key")
-        return {"status": "failed", "reason": "Budget data missing 'risk_ranking'"}
-    
-    projections = budget_result["projections"]
-    risk_level = budget_result["risk_ranking"]
-    
-    # Step 3: Run Tax Policy Agent to create tax slabs
-    print("Step 3: Running Tax Policy Agent...")
-    tax_result = await run_tax_policy_agent()
+        raise WorkflowError("Budget data missing 'risk_ranking'")
+
+    return {"projections": budget_result["projections"], "risk_level": budget_result["risk_ranking"]}
+
+
+async def tax_policy_stage(dataset, deterministic: bool = False, income_file: str = None) -> Dict[str, Any]:
+    """Creates the recommended tax slabs, optimized over the taxpayer incomes in income_file if given."""
+    if deterministic:
+        print("Running Tax Policy skills (no LLM)...")
+        tax_result = run_tax_policy_skills(dataset, income_file)
+    else:
+        print("Running Tax Policy Agent...")
+        tax_result = await run_tax_policy_agent(dataset, income_file)
     print(f"Tax Policy Agent completed. Result type: {type(tax_result).__name__}")
-    
+
     # Extract tax slabs from tax agent result
     if not isinstance(tax_result, dict):
         print(f"Error: Tax Policy Agent returned {type(tax_result).__name__} instead of dictionary")
-        return {"status": "failed", "reason": f"Tax Policy Agent returned invalid data type: {type(tax_result).__name__}"}
-    
+        raise WorkflowError(f"Tax Policy Agent returned invalid data type: {type(tax_result).__name__}")
+
     print(f"Tax result keys: {list(tax_result.keys())}")
-    
+
     if "recommended_slabs" not in tax_result:
         print("Error: Tax Policy Agent did not return 'recommended_slabs' key")
-        return {"status": "failed", "reason": "Tax data missing 'recommended_slabs'"}
-    
-    tax_slabs = tax_result["recommended_slabs"]
-    
-    # Step 4: Run Report Agent to compile final report
-    print("Step 4: Running Report Agent...")
-    report_result = await run_report_agent(
-        projections=projections,
-        risk_level=risk_level,
-        tax_slabs=tax_slabs,
-        visual_plots_dir="visual plots"
-    )
+        raise WorkflowError("Tax data missing 'recommended_slabs'")
+
+    return {"tax_slabs": tax_result["recommended_slabs"]}
+
+
+async def report_stage(projections, risk_level, tax_slabs, plots=None, deterministic: bool = False,
+                       rollup_level: int = None, plots_dir: str = "visual plots") -> Dict[str, Any]:
+    """
+    Compiles the final PDF report from the budget and tax outputs and the rendered plots.
+    Without in-memory plots the images are read from plots_dir, or left out when plot
+    files are disabled (plots_dir=None).
+    """
+    if plots is None and plots_dir is None:
+        plots = []
+    if deterministic:
+        print("Running Report skills with default insights (no LLM)...")
+        report_result = run_report_skills(
+            projections=projections,
+            risk_level=risk_level,
+            tax_slabs=tax_slabs,
+            visual_plots_dir=plots_dir,
+            plots=plots,
+            rollup_level=rollup_level
+        )
+    else:
+        print("Running Report Agent...")
+        report_result = await run_report_agent(
+            projections=projections,
+            risk_level=risk_level,
+            tax_slabs=tax_slabs,
+            visual_plots_dir=plots_dir,
+            plots=plots,
+            rollup_level=rollup_level
+        )
     print(f"Report Agent completed. Result: {report_result}")
-    
+
     # Handle the report result, which might be a string or dictionary
     report_path = None
     if isinstance(report_result, dict) and "report_path" in report_result:
@@ -94,24 +229,85 @@ async def run_workflow():
         except:
             # Not a JSON string, use as is
             pass
-    
+
+    return {"report_path": report_path}
+
+
+def build_workflow_stages(deterministic: bool = False, rollup_level: int = None,
+                          plots_dir: str = "visual plots", incremental_validation: bool = False,
+                          income_file: str = None) -> List[Stage]:
+    """
+    Builds the workflow graph. Budget and Tax Policy only wait for validation, so they run
+    concurrently. With deterministic=True every stage calls the skills directly and no
+    model requests are made. Stages reading the input data take the run's shared 'dataset'.
+    A rollup_level makes the budget projections, risk and report tables use category
+    subtotals at that level of the records' paths. Plots reach the report in memory;
+    plots_dir=None skips saving them to disk. incremental_validation only validates the
+    records appended since the last successful run. An income_file of taxpayer incomes
+    makes the tax stage optimize the slabs to cover the projected deficit.
+    """
+    return [
+        Stage("data_manager", partial(data_manager_stage, deterministic=deterministic, plots_dir=plots_dir,
+                                      incremental_validation=incremental_validation),
+              inputs=("dataset",), outputs=("data_validation", "plots")),
+        Stage("budget", partial(budget_stage, deterministic=deterministic, rollup_level=rollup_level),
+              inputs=("dataset",), outputs=("projections", "risk_level"), after=("data_manager",)),
+        Stage("tax_policy", partial(tax_policy_stage, deterministic=deterministic, income_file=income_file),
+              inputs=("dataset",), outputs=("tax_slabs",), after=("data_manager",)),
+        Stage("report", partial(report_stage, deterministic=deterministic, rollup_level=rollup_level,
+                                plots_dir=plots_dir),
+              inputs=("projections", "risk_level", "tax_slabs", "plots"), outputs=("report_path",)),
+    ]
+
+
+WORKFLOW_STAGES = build_workflow_stages()
+
+
+async def run_workflow(stages: List[Stage] = None, deterministic: bool = False, rollup_level: int = None,
+                       plots_dir: str = "visual plots", incremental_validation: bool = False,
+                       income_file: str = None, aggregate_stream: bool = False, input_path: str = None):
+    """
+    Orchestrates the workflow by running the stage graph and passing data between agents.
+    The input file (input_path, default INPUT_DATA_PATH) is loaded once and the resulting
+    dataset is shared by every stage.
+    If no stages are given, the default graph is built for the selected mode.
+    aggregate_stream sums the line items of an NDJSON input while streaming it, keeping
+    memory bounded by the number of categories (see load_dataset).
+    """
+    print("Starting Ministry of Finance workflow...")
+    if stages is None:
+        stages = build_workflow_stages(deterministic=deterministic, rollup_level=rollup_level, plots_dir=plots_dir,
+                                       incremental_validation=incremental_validation, income_file=income_file)
+
+    # A failed load leaves dataset as None; the skills then report the problem and validation fails.
+    dataset = load_dataset(input_path or INPUT_DATA_PATH, aggregate_stream=aggregate_stream)
+
+    try:
+        context = await run_stages(stages, {"dataset": dataset})
+    except WorkflowError as e:
+        return {"status": "failed", "reason": str(e)}
+
     # Return the final result with status information
     return {
         "status": "success",
-        "report_path": report_path,
+        "report_path": context["report_path"],
         "workflow_summary": {
-            "data_validation": data_manager_result,
+            "data_validation": context["data_validation"],
             "budget_projections": "completed",
-            "risk_level": risk_level,
-            "tax_slabs_count": len(tax_slabs)
+            "risk_level": context["risk_level"],
+            "tax_slabs_count": len(context["tax_slabs"])
         }
     }
 
 # Main function to run the orchestrator
-async def run():
+async def run(deterministic: bool = False, rollup_level: int = None, plots_dir: str = "visual plots",
+              incremental_validation: bool = False, income_file: str = None, aggregate_stream: bool = False,
+              input_path: str = None):
     try:
         logfire.configure(send_to_logfire='if-token-present')
-        result = await run_workflow()
+        result = await run_workflow(deterministic=deterministic, rollup_level=rollup_level, plots_dir=plots_dir,
+                                    incremental_validation=incremental_validation, income_file=income_file,
+                                    aggregate_stream=aggregate_stream, input_path=input_path)
         print(f"Workflow complete: {json.dumps(result, indent=2)}")
         return result
     except Exception as e:
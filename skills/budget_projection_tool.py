@@ -1,104 +1,281 @@
 import json
-import os
+from dataclasses import dataclass
 import numpy as np
+from skills.category_hierarchy import PATH_FIELD, CategoryHierarchy
+from skills.fiscal_dataset import CategoryColumns, FiscalDataset, load_dataset
+from skills.projection_cache import PROJECTION_CACHE, copy_result
+from skills.trend_forecasting import INDICATOR_REGISTRY, forecast_batch, indicator_registry_key
 
-def project_budget(file_path: str) -> dict:
+@dataclass
+class BudgetProjection:
     """
-    Loads the JSON file at file_path and performs projections:
-      - For 'revenue': Each category is projected with a fixed 5% growth rate.
-      - For 'expenditure': Each category is projected with a fixed 3% growth rate.
+    Array-backed multi-year projection of one line-item section.
+
+    Attributes:
+        names: Category name of every line item.
+        base_amounts: Current amount of every line item (missing amounts count as 0).
+        growth: Growth rate applied to every line item in each projected year, shape (items, horizon).
+        amounts: Projected amount of every line item in each projected year, shape (items, horizon).
+    """
+    names: np.ndarray
+    base_amounts: np.ndarray
+    growth: np.ndarray
+    amounts: np.ndarray
+
+    @property
+    def horizon(self) -> int:
+        return self.amounts.shape[1]
+
+    def totals(self) -> np.ndarray:
+        """
+        Returns the section total for each projected year.
+        """
+        return self.amounts.sum(axis=0)
+
+    def to_items(self, amounts: list = None) -> list:
+        """
+        Record view for the existing callers, built straight from the arrays: each record
+        holds 'name', 'amount' (the given input amounts, otherwise base_amounts),
+        'projected_amount' (the first projected year) and, for horizons above one year,
+        'projected_amounts' for every year.
+        """
+        names = self.names.tolist()
+        amounts = self.base_amounts.tolist() if amounts is None else amounts
+        first_year = self.amounts[:, 0].tolist()
+        if self.horizon == 1:
+            return [{"name": name, "amount": amount, "projected_amount": projected}
+                    for name, amount, projected in zip(names, amounts, first_year)]
+        return [{"name": name, "amount": amount, "projected_amount": projected, "projected_amounts": yearly}
+                for name, amount, projected, yearly in zip(names, amounts, first_year, self.amounts.tolist())]
+
+    def rollup(self, hierarchy: CategoryHierarchy, level: int) -> "BudgetProjection":
+        """
+        Sums the line items into the roll-up categories of a hierarchy level. The base
+        amounts are the hierarchy's own leaf amounts, so line items updated through
+        CategoryHierarchy.update_leaf count at their new value. The growth of each roll-up
+        category is the growth its summed amounts imply year over year.
+        """
+        labels = hierarchy.rollup(level)[0]
+        base_amounts = hierarchy.rollup_sums(level, hierarchy.amounts)
+        amounts = hierarchy.rollup_sums(level, self.amounts)
+        previous = np.column_stack([base_amounts, amounts[:, :-1]])
+        growth = np.divide(amounts - previous, previous, out=np.zeros_like(amounts), where=previous != 0)
+        return BudgetProjection(names=labels, base_amounts=base_amounts, growth=growth, amounts=amounts)
+
+def growth_table_matrix(labels: np.ndarray, horizon: int, default_rate: float, growth_rates: dict = None) -> np.ndarray:
+    """
+    Builds the (categories, horizon) growth rate matrix from a growth-rate table.
+
+    growth_rates maps a category name to either one rate for every year or a list of
+    per-year rates; a list shorter than the horizon keeps its last rate for the remaining
+    years. Categories not in the table grow at default_rate. An empty list, or a name that
+    is not one of the labels (usually a typo), raises ValueError.
+    """
+    matrix = np.full((len(labels), horizon), default_rate, dtype=np.float64)
+    if growth_rates:
+        positions = {str(label): index for index, label in enumerate(labels.tolist())}
+        unknown = [name for name in growth_rates if name not in positions]
+        if unknown:
+            raise ValueError(f"Unknown categories in the growth rate table: {unknown}. "
+                             f"Known categories: {sorted(positions)}.")
+        for name, rates in growth_rates.items():
+            rates = np.atleast_1d(np.asarray(rates, dtype=np.float64))[:horizon]
+            if rates.size == 0:
+                raise ValueError(f"The growth rate list for '{name}' is empty.")
+            row = matrix[positions[name]]
+            row[:len(rates)] = rates
+            row[len(rates):] = rates[-1]
+    return matrix
+
+def growth_rates_key(growth_rates: dict = None):
+    """
+    Canonical JSON form of a per-section growth-rate table for cache keys. Rates may be
+    Python or NumPy numbers, lists or arrays; each becomes a plain list of floats.
+    """
+    if not growth_rates:
+        return None
+    return json.dumps({section: {str(name): np.atleast_1d(np.asarray(rates, dtype=np.float64)).tolist()
+                                 for name, rates in (table or {}).items()}
+                       for section, table in growth_rates.items()}, sort_keys=True)
+
+def project_section_matrix(columns: CategoryColumns, default_rate: float, horizon: int = 1,
+                           growth_rates: dict = None) -> BudgetProjection:
+    """
+    Projects every line item over the horizon in one broadcast: the compounded growth
+    factors are computed once per category and indexed by each item's category code.
+    """
+    category_growth = growth_table_matrix(columns.labels, horizon, default_rate, growth_rates)
+    factors = np.cumprod(1 + category_growth, axis=1)
+    base_amounts = np.nan_to_num(np.asarray(columns.amounts, dtype=np.float64))
+    return BudgetProjection(names=columns.names, base_amounts=base_amounts,
+                            growth=category_growth[columns.codes],
+                            amounts=base_amounts[:, None] * factors[columns.codes])
+
+def project_budget_matrix(file_path: str = "input_data.json", revenue_growth_rate: float = 0.05,
+                          expenditure_growth_rate: float = 0.03, horizon: int = 1, growth_rates: dict = None,
+                          dataset: FiscalDataset = None) -> dict:
+    """
+    Returns {"revenue": BudgetProjection, "expenditure": BudgetProjection} for the dataset
+    (or the file at file_path) over the given horizon in years.
+
+    growth_rates optionally holds a per-section table, e.g.
+        {"revenue": {"Oil Revenue": [0.08, 0.06, 0.04]}, "expenditure": {"Defense": 0.02}}
+    with categories outside the table growing at the section's default rate. Sections other
+    than revenue and expenditure, and categories the data does not have, raise ValueError.
+    """
+    if horizon < 1:
+        raise ValueError("horizon must be at least 1 year")
+    unknown_sections = sorted(set(growth_rates or {}) - {"revenue", "expenditure"})
+    if unknown_sections:
+        raise ValueError(f"Unknown sections in the growth rate table: {unknown_sections}. "
+                         f"Expected 'revenue' and/or 'expenditure'.")
+    if dataset is None:
+        dataset = load_dataset(file_path)
+        if dataset is None:
+            return {}
+    growth_rates = growth_rates or {}
+    return {
+        "revenue": project_section_matrix(dataset.category_columns("revenue"), revenue_growth_rate,
+                                          horizon, growth_rates.get("revenue")),
+        "expenditure": project_section_matrix(dataset.category_columns("expenditure"), expenditure_growth_rate,
+                                              horizon, growth_rates.get("expenditure")),
+    }
+
+def project_budget(file_path: str = "input_data.json", revenue_growth_rate: float = 0.05,
+                   expenditure_growth_rate: float = 0.03, dataset: FiscalDataset = None,
+                   horizon: int = 1, growth_rates: dict = None, level: int = None) -> dict:
+    """
+    Performs projections on the financial data (the loaded dataset when given, otherwise file_path):
+      - For 'revenue': Each category is projected with a growth rate (default 5%).
+      - For 'expenditure': Each category is projected with a growth rate (default 3%).
       - For 'inflation': A linear regression is applied to the year-rate series to predict next year's inflation rate.
       - For 'gdp_growth': A linear regression is applied to the year-rate series to predict next year's GDP growth rate.
     
+    With horizon > 1 revenue and expenditure are projected for that many years and each item also
+    gets 'projected_amounts'. growth_rates can override the rate per category and per year
+    (see project_budget_matrix).
+    
+    With a roll-up level, revenue and expenditure items are summed up to that level of their
+    category paths (see category_hierarchy) after projecting every line item, so
+    'projected_revenue' and 'projected_expenditure' list one entry per roll-up category.
+    
+    Results are cached process-wide on the dataset's content hash and revision (line items
+    updated in memory, see FiscalDataset.category_hierarchy), the projection parameters and
+    the registered indicators,
+    so every agent asking for the same dataset version shares one computed result. Each call
+    returns its own copy, so callers may modify it without affecting later cache hits.
+    
     Prints details about the projection process and returns a dictionary with projected values.
     """
-    if not os.path.isfile(file_path):
-        print(f"Error: File not found: {file_path}")
-        return {}
+    if dataset is None:
+        dataset = load_dataset(file_path)
+        if dataset is None:
+            return {}
     
-    try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-    except json.JSONDecodeError:
-        print(f"Error: Invalid JSON in file: {file_path}")
-        return {}
+    cache_key = (dataset.content_hash, dataset.revision, revenue_growth_rate, expenditure_growth_rate, horizon,
+                 growth_rates_key(growth_rates), level, indicator_registry_key())
+    projections = PROJECTION_CACHE.get(cache_key)
+    if projections is not None:
+        print(f"Using cached budget projection for {dataset.source_path}.")
+        return copy_result(projections)
     
-    projections = {}
+    matrices = project_budget_matrix(revenue_growth_rate=revenue_growth_rate,
+                                     expenditure_growth_rate=expenditure_growth_rate,
+                                     horizon=horizon, growth_rates=growth_rates, dataset=dataset)
+    projections = _compute_projections(dataset, matrices, level)
+    PROJECTION_CACHE.put(cache_key, projections)
+    return copy_result(projections)
 
-    # 1. Project revenue: Use a fixed growth rate of 5%
-    revenue_data = data.get("revenue", [])
-    projected_revenue = []
-    revenue_growth_rate = 0.05
-    for item in revenue_data:
-        projected_item = item.copy()
-        current_amount = item.get("amount", 0)
-        projected_item["projected_amount"] = current_amount * (1 + revenue_growth_rate)
-        projected_revenue.append(projected_item)
-        print(f"Revenue '{item.get('name', 'Unknown')}' projected from {current_amount} to {projected_item['projected_amount']:.2f}.")
-    projections["projected_revenue"] = projected_revenue
-
-    # 2. Project expenditure: Use a fixed growth rate of 3%
-    expenditure_data = data.get("expenditure", [])
-    projected_expenditure = []
-    expenditure_growth_rate = 0.03
-    for item in expenditure_data:
-        projected_item = item.copy()
-        current_amount = item.get("amount", 0)
-        projected_item["projected_amount"] = current_amount * (1 + expenditure_growth_rate)
-        projected_expenditure.append(projected_item)
-        print(f"Expenditure '{item.get('name', 'Unknown')}' projected from {current_amount} to {projected_item['projected_amount']:.2f}.")
-    projections["projected_expenditure"] = projected_expenditure
-
-    # 3. Project inflation using linear regression to predict next year's rate
-    inflation_data = data.get("inflation", [])
-    if inflation_data and len(inflation_data) >= 2:
-        years, rates = [], []
-        for item in inflation_data:
-            try:
-                years.append(int(item.get("year")))
-                rates.append(float(item.get("rate")))
-            except (ValueError, TypeError):
-                continue
-        if len(years) >= 2:
-            m, c = np.polyfit(years, rates, 1)  # Linear regression: rate = m * year + c
-            next_year = max(years) + 1
-            projected_inflation_rate = m * next_year + c
-            projections["projected_inflation"] = {"year": str(next_year), "rate": round(projected_inflation_rate, 2)}
-            print(f"Inflation projected for year {next_year} is {projected_inflation_rate:.2f} using linear regression.")
-        else:
-            avg_rate = np.mean(rates) if rates else 0
-            next_year = max(years) + 1 if years else "Unknown"
-            projections["projected_inflation"] = {"year": str(next_year), "rate": round(avg_rate, 2)}
-            print(f"Not enough data for regression. Using average inflation rate {avg_rate:.2f} for year {next_year}.")
+def _input_amounts(columns: CategoryColumns) -> list:
+    """
+    The section's amounts as plain values, with None for missing or non-numeric amounts.
+    """
+    amounts = columns.amounts.tolist()
+    if columns.amounts.dtype.kind == 'f':
+        amounts = [None if amount != amount else amount for amount in amounts]
+    return amounts
+
+def _project_section(dataset: FiscalDataset, section: str, projection: BudgetProjection, label: str,
+                     level: int = None) -> list:
+    """
+    Returns the section's line items with their projected amounts, or the roll-up
+    categories at 'level' with their summed amounts, built from the columnar arrays.
+    Line items keep their 'path', so the records can be rolled up later
+    (see category_hierarchy.rollup_items).
+    """
+    columns = dataset.category_columns(section)
+    if level is not None:
+        projection = projection.rollup(dataset.category_hierarchy(section), level)
+        amounts = None
+        label = f"{label} (level {level})"
     else:
-        print("Insufficient inflation data for projection.")
-        projections["projected_inflation"] = {}
-
-    # 4. Project GDP Growth using linear regression to predict next year's rate
-    gdp_growth_data = data.get("gdp_growth", [])
-    if gdp_growth_data and len(gdp_growth_data) >= 2:
-        years, rates = [], []
-        for item in gdp_growth_data:
-            try:
-                years.append(int(item.get("year")))
-                rates.append(float(item.get("rate")))
-            except (ValueError, TypeError):
-                continue
-        if len(years) >= 2:
-            m, c = np.polyfit(years, rates, 1)
-            next_year = max(years) + 1
-            projected_gdp_growth_rate = m * next_year + c
-            projections["projected_gdp_growth"] = {"year": str(next_year), "rate": round(projected_gdp_growth_rate, 2)}
-            print(f"GDP Growth projected for year {next_year} is {projected_gdp_growth_rate:.2f} using linear regression.")
+        amounts = _input_amounts(columns)
+    totals = projection.totals()
+    print(f"{label}: {len(projection.base_amounts)} items projected from {projection.base_amounts.sum():.2f} "
+          f"to {totals[0]:.2f}" + (f" ({totals[-1]:.2f} after {projection.horizon} years)." if projection.horizon > 1 else "."))
+    items = projection.to_items(amounts)
+    if level is None and columns.path_codes is not None:
+        paths = [json.loads(path) for path in columns.path_labels.tolist()]
+        for item, code in zip(items, columns.path_codes.tolist()):
+            if code >= 0:
+                item[PATH_FIELD] = paths[code]
+    return items
+
+def _project_indicators(dataset: FiscalDataset, horizon: int = 1, method: str = "linear") -> dict:
+    """
+    Forecasts every registered indicator present in the data (see trend_forecasting) with one
+    batch forecast. Returns {projection_key: {"year", "rate"}} for next year, plus a
+    "forecast" list of yearly {"year", "rate"} entries when horizon > 1.
+    """
+    specs, series_list = [], []
+    projections = {}
+    for spec in INDICATOR_REGISTRY.values():
+        record_count = dataset.section_length(spec.section)
+        if record_count is None and not spec.always_project:
+            continue
+        if not record_count or record_count < 2:
+            print(f"Insufficient {spec.label} data for projection.")
+            projections[spec.projection_key] = {}
+            continue
+        series = dataset.indicator_series(spec.section)
+        specs.append(spec)
+        series_list.append((series.years, series.rates))
+
+    if not specs:
+        return projections
+
+    forecast = forecast_batch(series_list, horizon=horizon, method=method)
+    for row, spec in enumerate(specs):
+        used = forecast["methods"][row]
+        years = [str(year) if year >= 0 else "Unknown" for year in forecast["years"][row].tolist()]
+        rates = [round(rate, 2) if rate == rate else 0 for rate in forecast["values"][row].tolist()]
+        if used in ("linear", "ses"):
+            how = "linear regression" if used == "linear" else "exponential smoothing"
+            print(f"{spec.title} projected for year {years[0]} is {forecast['values'][row][0]:.2f} using {how}.")
         else:
-            avg_rate = np.mean(rates) if rates else 0
-            next_year = max(years) + 1 if years else "Unknown"
-            projections["projected_gdp_growth"] = {"year": str(next_year), "rate": round(avg_rate, 2)}
-            print(f"Not enough data for regression. Using average GDP growth rate {avg_rate:.2f} for year {next_year}.")
-    else:
-        print("Insufficient GDP growth data for projection.")
-        projections["projected_gdp_growth"] = {}
-    
+            print(f"Not enough data for regression. Using average {spec.label} rate {rates[0]:.2f} for year {years[0]}.")
+        projections[spec.projection_key] = {"year": years[0], "rate": rates[0]}
+        if horizon > 1:
+            projections[spec.projection_key]["forecast"] = [{"year": year, "rate": rate}
+                                                             for year, rate in zip(years, rates)]
+    return projections
+
+def _compute_projections(dataset: FiscalDataset, matrices: dict, level: int = None) -> dict:
+    """
+    Computes the projections dictionary from the dataset's columnar arrays and the
+    revenue/expenditure projection matrices, optionally rolled up to a category level.
+    """
+    projections = {}
+
+    # 1. Project revenue
+    projections["projected_revenue"] = _project_section(dataset, "revenue", matrices["revenue"], "Revenue", level)
+
+    # 2. Project expenditure
+    projections["projected_expenditure"] = _project_section(
+        dataset, "expenditure", matrices["expenditure"], "Expenditure", level)
+
+    # 3. Project inflation, GDP growth and any other registered indicator with linear regression
+    projections.update(_project_indicators(dataset, horizon=matrices["revenue"].horizon))
+
     print("Budget projection completed.")
-    print(projections)
-    return projections
\ No newline at end of file
+    return projections
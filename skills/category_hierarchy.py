@@ -0,0 +1,175 @@
+import numpy as np
+
+# Optional record field listing a line item's ancestors, e.g.
+#   {"name": "Vaccines", "amount": 1200, "path": ["Health", "Public Health", "Immunization"]}
+# A string path uses PATH_INPUT_SEPARATOR: "Health/Public Health/Immunization".
+PATH_FIELD = "path"
+PATH_INPUT_SEPARATOR = "/"
+PATH_LABEL_SEPARATOR = " / "
+
+def item_path(item) -> tuple:
+    """
+    Returns the full category path of a record: its ancestors from 'path' followed by its name.
+    Records without a usable path are top-level categories.
+    """
+    if not isinstance(item, dict):
+        return ("Unknown",)
+    parents = item.get(PATH_FIELD)
+    if isinstance(parents, str):
+        parents = [part.strip() for part in parents.split(PATH_INPUT_SEPARATOR) if part.strip()]
+    elif not isinstance(parents, list):
+        parents = []
+    return tuple(str(part) for part in parents) + (str(item.get("name", "Unknown")),)
+
+def path_label(path) -> str:
+    return PATH_LABEL_SEPARATOR.join(path)
+
+class CategoryHierarchy:
+    """
+    Prefix-aggregate index over the category paths of a line-item section.
+
+    Every prefix of every path is a node holding the total of all line items below it,
+    so a subtotal at any level is one dictionary lookup. Changing one line item's amount
+    adjusts only the nodes on its path (O(depth)). Node 0 is the root (the section total).
+
+    The index owns the line items' current amounts: 'version' counts the updates, and
+    'on_update' (when set) is called as on_update(row, amount) after each one, so the
+    owner (FiscalDataset) can keep its records and cached results in step.
+    """
+
+    def __init__(self, paths: list, amounts):
+        self.amounts = np.nan_to_num(np.asarray(amounts, dtype=np.float64)).copy()
+        self.version = 0
+        self.on_update = None
+        self.node_index = {(): 0}
+        self.node_paths = [()]
+        # Child node ids of every node, so listing them doesn't scan the whole index
+        self.child_nodes = {}
+        depth = max((len(path) for path in paths), default=0)
+        # Node id of every row's ancestor at depths 1..depth, -1 past the row's own depth
+        self.row_nodes = np.full((len(paths), depth), -1, dtype=np.int32)
+        for row, path in enumerate(paths):
+            for level in range(1, len(path) + 1):
+                prefix = path[:level]
+                node = self.node_index.get(prefix)
+                if node is None:
+                    node = self.node_index[prefix] = len(self.node_paths)
+                    self.node_paths.append(prefix)
+                    self.child_nodes.setdefault(self.node_index[prefix[:-1]], []).append(node)
+                self.row_nodes[row, level - 1] = node
+        self.depths = np.fromiter((len(path) for path in paths), dtype=np.int32, count=len(paths))
+
+        on_path = self.row_nodes >= 0
+        self.totals = np.bincount(self.row_nodes[on_path],
+                                  weights=np.broadcast_to(self.amounts[:, None], self.row_nodes.shape)[on_path],
+                                  minlength=len(self.node_paths))
+        self.totals[0] = self.amounts.sum()
+        self._rollups = {}
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    @property
+    def depth(self) -> int:
+        return self.row_nodes.shape[1]
+
+    def subtotal(self, path=()) -> float:
+        """
+        Returns the total of the line items under a path (a tuple/list of names or a
+        PATH_INPUT_SEPARATOR-separated string); the empty path gives the section total
+        and unknown paths give 0.
+        """
+        if isinstance(path, str):
+            path = [part.strip() for part in path.split(PATH_INPUT_SEPARATOR) if part.strip()]
+        node = self.node_index.get(tuple(path))
+        return 0.0 if node is None else float(self.totals[node])
+
+    def children(self, path=()) -> dict:
+        """
+        Returns {child label: subtotal} for the nodes directly below a path.
+        """
+        parent = self.node_index.get(tuple(path))
+        return {self.node_paths[node][-1]: float(self.totals[node]) for node in self.child_nodes.get(parent, [])}
+
+    def leaf_path(self, row: int) -> tuple:
+        """
+        Returns the full category path of one line item.
+        """
+        return self.node_paths[self.row_nodes[row, self.depths[row] - 1]] if self.depths[row] else ()
+
+    def update_leaf(self, row: int, amount: float) -> float:
+        """
+        Sets the amount of one line item and updates every subtotal on its path, then
+        notifies on_update. Returns the change applied.
+        """
+        delta = float(amount) - self.amounts[row]
+        self.amounts[row] = amount
+        nodes = self.row_nodes[row, :self.depths[row]]
+        self.totals[nodes] += delta
+        self.totals[0] += delta
+        self.version += 1
+        if self.on_update is not None:
+            self.on_update(row, amount)
+        return delta
+
+    def rollup(self, level: int):
+        """
+        Maps every line item to its ancestor at 'level' (1 = top level); items with a
+        shorter path keep their own category. Returns (labels, codes) like
+        fiscal_dataset.encode_labels, with one label per roll-up category.
+        """
+        if level < 1:
+            raise ValueError("roll-up level must be at least 1")
+        if level not in self._rollups:
+            if len(self):
+                columns = np.minimum(self.depths, level) - 1
+                nodes = self.row_nodes[np.arange(len(self)), columns]
+                unique_nodes, codes = np.unique(nodes, return_inverse=True)
+            else:
+                unique_nodes, codes = np.array([], dtype=np.int32), np.array([], dtype=np.int64)
+            labels = np.empty(len(unique_nodes), dtype=object)
+            labels[:] = [path_label(self.node_paths[node]) for node in unique_nodes.tolist()]
+            self._rollups[level] = (labels, codes.astype(np.int32))
+        return self._rollups[level]
+
+    def rollup_totals(self, level: int) -> dict:
+        """
+        Returns {label: current total} of every roll-up category at a level.
+        """
+        labels, codes = self.rollup(level)
+        totals = np.bincount(codes, weights=self.amounts, minlength=len(labels))
+        return dict(zip(labels.tolist(), totals.tolist()))
+
+    def rollup_sums(self, level: int, values) -> np.ndarray:
+        """
+        Sums per-line-item values (shape (items,) or (items, years)) into the roll-up
+        categories of a level, in the order of rollup(level)'s labels.
+        """
+        labels, codes = self.rollup(level)
+        values = np.asarray(values, dtype=np.float64)
+        sums = np.zeros((len(labels),) + values.shape[1:])
+        np.add.at(sums, codes, values)
+        return sums
+
+ROLLUP_FIELDS = ("amount", "projected_amount", "projected_amounts")
+
+def rollup_items(items: list, level: int) -> list:
+    """
+    Sums projection records (as returned by project_budget) up to a level of their
+    category paths. Every numeric field of ROLLUP_FIELDS present in the records is
+    summed (missing amounts count as 0); records without a 'path' are top-level
+    categories, so already rolled-up records are returned unchanged.
+    """
+    if not any(isinstance(item, dict) and PATH_FIELD in item for item in items):
+        return items
+    hierarchy = CategoryHierarchy([item_path(item) for item in items], np.zeros(len(items)))
+    labels = hierarchy.rollup(level)[0].tolist()
+    columns = {}
+    for name in ROLLUP_FIELDS:
+        if items and all(isinstance(item, dict) and name in item for item in items):
+            values = [item[name] for item in items]
+            if name == "amount":
+                values = [value if isinstance(value, (int, float)) else 0 for value in values]
+            columns[name] = hierarchy.rollup_sums(level, values).tolist()
+    return [{"name": label, **{name: column[index] for name, column in columns.items()}}
+            for index, label in enumerate(labels)]
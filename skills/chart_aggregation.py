@@ -0,0 +1,107 @@
+import heapq
+import math
+from dataclasses import replace
+import numpy as np
+from skills.plot_rendering import PlotJob
+
+# Most slices/bars/points drawn per chart kind; a job can override its own limit with
+# style["max_items"]. Larger inputs are aggregated or downsampled before rendering.
+CHART_LIMITS = {
+    "pie": 15,
+    "bar": 30,
+    "scatter": 1000,
+}
+OTHER_LABEL = "Other"
+
+def top_n_with_other(labels: list, values: list, n: int, other_label: str = OTHER_LABEL):
+    """
+    Keeps the n largest categories (values of repeated labels are summed first) in
+    descending order and folds the rest into one 'other_label' entry.
+    Returns (labels, values). Inputs with at most n entries are returned unchanged.
+    """
+    if len(labels) <= n:
+        return list(labels), list(values)
+    totals = {}
+    for label, value in zip(labels, values):
+        totals[label] = totals.get(label, 0) + (value or 0)
+    if len(totals) <= n:
+        return list(totals), list(totals.values())
+    top = heapq.nlargest(n, totals.items(), key=lambda item: item[1])
+    rest = math.fsum(totals.values()) - math.fsum(value for _, value in top)
+    top_labels = [label for label, _ in top] + [other_label]
+    return top_labels, [value for _, value in top] + [rest]
+
+def _numeric_axis(values: list):
+    """
+    Converts axis values (e.g. year strings) to floats, falling back to positions if
+    any value isn't numeric. Returns (array, whether the values were numeric).
+    """
+    try:
+        return np.array([float(value) for value in values], dtype=np.float64), True
+    except (TypeError, ValueError):
+        return np.arange(len(values), dtype=np.float64), False
+
+def lttb_indices(x, y, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling: returns the indices of 'threshold'
+    points (always including the smallest and largest x) that best preserve the visual
+    shape of the series. The points are taken in x order (a stable sort, so unsorted
+    input works) and the indices refer to the original arrays, in x order. Each bucket of
+    the middle points keeps the point forming the largest triangle with the previously
+    kept point and the next bucket's average.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    order = np.argsort(x, kind="stable")
+    if threshold >= n or n <= 2:
+        return order
+    if threshold < 3:
+        return order[[0, n - 1][:max(threshold, 1)]]
+    x, y = x[order], y[order]
+
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, n)
+        average_x = x[end:next_end].mean()
+        average_y = y[end:next_end].mean()
+        areas = np.abs((x[anchor] - average_x) * (y[start:end] - y[anchor])
+                       - (x[anchor] - x[start:end]) * (average_y - y[anchor]))
+        anchor = start + int(np.argmax(areas))
+        selected[bucket + 1] = anchor
+    return order[selected]
+
+def reduce_plot_job(job: PlotJob, limits: dict = None) -> PlotJob:
+    """
+    Returns the job with its data bounded by the chart kind's limit: categorical charts
+    keep their top categories plus an "Other" bucket, scatter series are downsampled
+    with LTTB. Jobs within their limit, or of kinds without one, are returned as is, and
+    so are scatter series with non-numeric y values, which LTTB cannot measure.
+    """
+    limits = {**CHART_LIMITS, **(limits or {})}
+    limit = job.style.get("max_items", limits.get(job.kind))
+    if limit is None:
+        return job
+    if job.kind in ("pie", "bar") and len(job.data["labels"]) > limit:
+        # One of the 'limit' slices or bars is the "Other" bucket
+        labels, values = top_n_with_other(job.data["labels"], job.data["values"], max(limit - 1, 1))
+        print(f"{job.title}: reduced {len(job.data['labels'])} categories to {len(labels)}.")
+        return replace(job, data={**job.data, "labels": labels, "values": values})
+    if job.kind == "scatter" and len(job.data["x"]) > limit:
+        x, numeric = _numeric_axis(job.data["x"])
+        y, y_numeric = _numeric_axis(job.data["y"])
+        if not y_numeric:
+            print(f"{job.title}: y values are not numeric; drawing all {len(job.data['x'])} points.")
+            return job
+        keep = lttb_indices(x, y, limit).tolist()
+        print(f"{job.title}: downsampled {len(job.data['x'])} points to {len(keep)}.")
+        # Numeric x values (e.g. year strings) go on a numeric axis: a categorical axis with
+        # one tick per point costs more to draw than everything else in the chart
+        kept_x = x[keep].tolist() if numeric else [job.data["x"][i] for i in keep]
+        return replace(job, data={**job.data, "x": kept_x, "y": [job.data["y"][i] for i in keep]})
+    return job
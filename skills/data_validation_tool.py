@@ -1,60 +1,218 @@
+import heapq
 import json
-import os
+from itertools import islice
+from skills.dataset_snapshot import write_snapshot
+from skills.fiscal_dataset import STREAMING_EXTENSIONS, FiscalDataset, load_dataset
+from skills.projection_cache import content_hash
 
-def validate_data(file_path: str) -> bool:
+REQUIRED_KEYS = {
+    "revenue": ["name", "amount"],
+    "expenditure": ["name", "amount"],
+    "inflation": ["year", "rate"],
+    "gdp_growth": ["year", "rate"]
+}
+
+# Type rules for required fields; fields not listed here only need to be present.
+FIELD_RULES = {
+    "amount": ((int, float), "must be numeric"),
+    "rate": ((int, float), "must be numeric"),
+    "year": ((str,), "must be a string"),
+}
+
+# Bump when the validation logic changes in a way the tables above don't show.
+VALIDATION_RULES_VERSION = 2
+
+# Fingerprint of the rules a dataset is validated under. Snapshots record it, so data
+# validated under other rules is checked again (see dataset_snapshot).
+SCHEMA_VERSION = content_hash(json.dumps({
+    "logic": VALIDATION_RULES_VERSION,
+    "required_keys": REQUIRED_KEYS,
+    "field_rules": {field: [sorted(t.__name__ for t in types), reason] for field, (types, reason) in FIELD_RULES.items()},
+}, sort_keys=True).encode('utf-8'))[:16]
+
+def validate_data(file_path: str = "input_data.json", dataset: FiscalDataset = None, max_errors: int = 20,
+                  incremental: bool = False) -> bool:
     """
-    Validates the structure of the financial data JSON file.
+    Validates the structure of the financial data.
+    Uses the already loaded dataset when given, otherwise loads file_path.
+    Every violation is found in one pass and up to max_errors of them are printed.
+    The result is stored on the dataset so it is only computed once per load, and a
+    successful check writes a binary snapshot so later runs can skip parsing, then
+    compacts the dataset so the validated records are only held as columns.
+    With incremental=True only the records appended since the last successful run are
+    checked (see incremental_validation.validate_incremental); without a dataset the file
+    is then not loaded at all. NDJSON sources are always checked in full.
     Returns True if valid, False otherwise.
     """
-    # 1. Check if file exists
-    if not os.path.isfile(file_path):
-        print(f"Error: File not found: {file_path}")
-        return False
-
-    # 2. Load the JSON data
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)  
-    except json.JSONDecodeError:
-        print(f"Error: Invalid JSON in file: {file_path}")
-        return False
-
-    # 3. Rest of your validation logic below...
-    required_keys = {
-        "revenue": ["name", "amount"],
-        "expenditure": ["name", "amount"],
-        "inflation": ["year", "rate"],
-        "gdp_growth": ["year", "rate"]
-    }
-
-    for key, required_fields in required_keys.items():
-        if key not in data:
-            print(f"Error: Missing required field: '{key}'")
-            return False
+    source_path = file_path if dataset is None else dataset.source_path
+    if incremental and not source_path.lower().endswith(STREAMING_EXTENSIONS):
+        if dataset is not None and dataset.validation_result is not None:
+            print(f"Validation result for {dataset.source_path} already known: {dataset.validation_result}")
+            return dataset.validation_result
+        from skills.incremental_validation import validate_incremental
+        report = validate_incremental(source_path, dataset=dataset, max_errors=max_errors)
+        if report["valid"] and dataset is not None:
+            write_snapshot(dataset)
+            dataset.compact()
+        return report["valid"]
 
-        if not isinstance(data[key], list):
-            print(f"Error: The field '{key}' should be a list.")
+    # 1. Load the data (missing files and invalid JSON are reported by load_dataset)
+    if dataset is None:
+        dataset = load_dataset(file_path)
+        if dataset is None:
             return False
 
-        for index, item in enumerate(data[key]):
-            if not isinstance(item, dict):
-                print(f"Error: Item {index} in '{key}' is not a JSON object.")
-                return False
-
-            for field in required_fields:
-                if field not in item:
-                    print(f"Error: Missing field '{field}' in item {index} of '{key}'.")
-                    return False
-                
-                if field == "amount" and not isinstance(item[field], (int, float)):
-                    print(f"Error: Field 'amount' in item {index} of '{key}' must be numeric.")
-                    return False
-                if field == "rate" and not isinstance(item[field], (int, float)):
-                    print(f"Error: Field 'rate' in item {index} of '{key}' must be numeric.")
-                    return False
-                if field == "year" and not isinstance(item[field], str):
-                    print(f"Error: Field 'year' in item {index} of '{key}' must be a string.")
-                    return False
-
-    print("Validation succeeded! The input data structure is correct.")
-    return True
\ No newline at end of file
+    # 2. Reuse an earlier result for this dataset
+    if dataset.validation_result is not None:
+        print(f"Validation result for {dataset.source_path} already known: {dataset.validation_result}")
+        return dataset.validation_result
+
+    # 3. Check every section and field
+    report = SCHEMA_VALIDATOR.validate(dataset.data, max_errors=max_errors)
+    for violation in report["violations"]:
+        print(f"Error: {describe_violation(violation)}")
+    if report["valid"]:
+        print("Validation succeeded! The input data structure is correct.")
+    else:
+        print(f"Validation failed with {report['error_count']} errors ({len(report['violations'])} shown).")
+
+    dataset.validation_result = report["valid"]
+    if dataset.validation_result:
+        write_snapshot(dataset)
+        dataset.compact()
+    return dataset.validation_result
+
+def validation_report(file_path: str = "input_data.json", dataset: FiscalDataset = None, max_errors: int = 1000) -> dict:
+    """
+    Returns the structured validation report (see SchemaValidator.validate) instead of a bool,
+    so data owners can fix every problem after a single run.
+    """
+    if dataset is None:
+        dataset = load_dataset(file_path)
+        if dataset is None:
+            return {"valid": False, "error_count": 1, "truncated": False,
+                    "violations": [{"section": None, "row": None, "field": None,
+                                    "reason": f"file could not be loaded: {file_path}"}]}
+    return SCHEMA_VALIDATOR.validate(dataset.data, max_errors=max_errors)
+
+def describe_violation(violation: dict) -> str:
+    """
+    Turns a violation record into the message printed by validate_data.
+    """
+    section, row, field, reason = violation["section"], violation["row"], violation["field"], violation["reason"]
+    if row is None:
+        if reason == "missing":
+            return f"Missing required field: '{section}'"
+        if reason == "not a list":
+            return f"The field '{section}' should be a list."
+        return reason
+    if field is None:
+        return f"Item {row} in '{section}' is {reason}."
+    if reason == "missing":
+        return f"Missing field '{field}' in item {row} of '{section}'."
+    return f"Field '{field}' in item {row} of '{section}' {reason}."
+
+class SchemaValidator:
+    """
+    Validates parsed data against a required_keys table, one column at a time.
+
+    The table is compiled once into per-section field rules with exact-type lookup sets,
+    so each field of a section is checked in a single bulk pass over its column and
+    every violation is found, not just the first.
+    """
+    _MISSING = object()
+
+    def __init__(self, required_keys: dict = None, field_rules: dict = None):
+        required_keys = REQUIRED_KEYS if required_keys is None else required_keys
+        field_rules = FIELD_RULES if field_rules is None else field_rules
+        self.sections = {}
+        for section, fields in required_keys.items():
+            compiled = []
+            for field in fields:
+                if field in field_rules:
+                    types, reason = field_rules[field]
+                    allowed = set(types)
+                    if int in allowed:
+                        allowed.add(bool)  # bool subclasses int, matching isinstance
+                    compiled.append((field, frozenset(allowed), reason))
+                else:
+                    compiled.append((field, None, None))
+            self.sections[section] = compiled
+
+    def check_section(self, section: str, items: list, limit: int, row_offset: int = 0):
+        """
+        Returns (violation count, first 'limit' violations in row order) for the records of
+        one section. row_offset is added to reported rows when items is a slice of the section.
+        """
+        missing = self._MISSING
+        not_object = [row for row, item in enumerate(items) if item.__class__ is not dict]
+        if not_object:
+            records = [item for item in items if item.__class__ is dict]
+            rows = [row + row_offset for row, item in enumerate(items) if item.__class__ is dict]
+            not_object = [row + row_offset for row in not_object]
+        else:
+            rows, records = range(row_offset, row_offset + len(items)), items
+
+        count = len(not_object)
+        streams = [[(row, -1, None, "not a JSON object") for row in not_object[:limit]]]
+        for order, (field, allowed, reason) in enumerate(self.sections[section]):
+            values = [record.get(field, missing) for record in records]
+            if allowed is None:
+                bad = [i for i, value in enumerate(values) if value is missing]
+            else:
+                bad = [i for i, value in enumerate(values) if value.__class__ not in allowed]
+            count += len(bad)
+            streams.append([(rows[i], order, field, "missing" if values[i] is missing else reason)
+                            for i in bad[:limit]])
+
+        violations = [{"section": section, "row": row, "field": field, "reason": reason}
+                      for row, _, field, reason in islice(heapq.merge(*streams), limit)]
+        return count, violations
+
+    def validate(self, data: dict, max_errors: int = 1000) -> dict:
+        """
+        Validates parsed data and returns a report:
+            {"valid": bool, "error_count": int, "truncated": bool,
+             "violations": [{"section", "row", "field", "reason"}, ...]}
+        Section-level problems have row None and record-level ones have field None.
+        At most max_errors violations are listed, in section and row order;
+        error_count always holds the total.
+        """
+        violations = []
+        error_count = 0
+        for section in self.sections:
+            remaining = max(max_errors - len(violations), 0)
+            if section not in data or not isinstance(data[section], list):
+                error_count += 1
+                reason = "missing" if section not in data else "not a list"
+                violations.extend([{"section": section, "row": None, "field": None, "reason": reason}][:remaining])
+                continue
+            count, section_violations = self.check_section(section, data[section], remaining)
+            error_count += count
+            violations.extend(section_violations)
+
+        return {
+            "valid": error_count == 0,
+            "error_count": error_count,
+            "truncated": error_count > len(violations),
+            "violations": violations,
+        }
+
+SCHEMA_VALIDATOR = SchemaValidator()
+
+def item_error(key: str, index: int, item) -> str:
+    """
+    Checks one record of section 'key'. Returns the first error message, or None if the
+    record is valid. Used where records arrive one at a time (streaming ingestion).
+    """
+    if not isinstance(item, dict):
+        return f"Item {index} in '{key}' is not a JSON object."
+
+    for field in REQUIRED_KEYS[key]:
+        if field not in item:
+            return f"Missing field '{field}' in item {index} of '{key}'."
+        if field in FIELD_RULES:
+            types, reason = FIELD_RULES[field]
+            if not isinstance(item[field], types):
+                return f"Field '{field}' in item {index} of '{key}' {reason}."
+    return None
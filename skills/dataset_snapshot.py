@@ -0,0 +1,140 @@
+import json
+import os
+import shutil
+import tempfile
+from typing import Optional
+import numpy as np
+from skills.fiscal_dataset import CATEGORY_SECTIONS, INDICATOR_SECTIONS, CategoryColumns, FiscalDataset, IndicatorSeries
+from skills.projection_cache import file_content_hash
+
+SNAPSHOT_FORMAT_VERSION = 3
+SNAPSHOT_SUFFIX = ".snapshot"
+HEADER_FILE = "header.json"
+
+def snapshot_path(source_path: str) -> str:
+    """
+    Returns the snapshot directory that belongs to a source file (written next to it).
+    """
+    return source_path + SNAPSHOT_SUFFIX
+
+def write_snapshot(dataset: FiscalDataset) -> bool:
+    """
+    Writes the dataset's columns as .npy blocks plus a JSON header into the snapshot
+    directory next to the source. The directory is replaced atomically so concurrent
+    readers never see a partial snapshot. Datasets with line items updated in memory
+    (revision > 0) no longer match their source and are not written.
+    Returns True if a snapshot was written.
+    """
+    if dataset.validation_result is not True or dataset.raw_data is None or dataset.revision:
+        return False
+    # A snapshot only stores the columns, so the records must be rebuildable from them
+    if not dataset.columns_rebuild_records():
+        print(f"Skipping snapshot for {dataset.source_path}: records carry fields the snapshot cannot store.")
+        return False
+
+    # Imported here because data_validation_tool builds on this module
+    from skills.data_validation_tool import SCHEMA_VERSION
+
+    target = snapshot_path(dataset.source_path)
+    stat = os.stat(dataset.source_path)
+    header = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "schema_version": SCHEMA_VERSION,
+        "source_hash": dataset.content_hash,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "sections": {},
+    }
+
+    staging = None
+    try:
+        staging = tempfile.mkdtemp(prefix=".snapshot-", dir=os.path.dirname(os.path.abspath(target)))
+        for section in CATEGORY_SECTIONS:
+            columns = dataset.category_columns(section)
+            labels = np.array(columns.labels.tolist(), dtype=str) if len(columns.labels) else np.array([], dtype="U1")
+            np.save(os.path.join(staging, f"{section}.labels.npy"), labels)
+            np.save(os.path.join(staging, f"{section}.codes.npy"), columns.codes)
+            np.save(os.path.join(staging, f"{section}.amounts.npy"), columns.amounts)
+            if columns.path_codes is not None:
+                np.save(os.path.join(staging, f"{section}.path_labels.npy"), np.array(columns.path_labels.tolist(), dtype=str))
+                np.save(os.path.join(staging, f"{section}.path_codes.npy"), columns.path_codes)
+            header["sections"][section] = {"kind": "category", "rows": len(columns),
+                                           "paths": columns.path_codes is not None}
+        for section in INDICATOR_SECTIONS:
+            series = dataset.indicator_series(section)
+            np.save(os.path.join(staging, f"{section}.years.npy"), series.years)
+            np.save(os.path.join(staging, f"{section}.rates.npy"), series.rates)
+            header["sections"][section] = {"kind": "indicator", "rows": len(series)}
+        with open(os.path.join(staging, HEADER_FILE), 'w') as f:
+            json.dump(header, f, indent=2)
+
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        os.rename(staging, target)
+    except OSError as e:
+        print(f"Warning: Could not write snapshot for {dataset.source_path}: {e}")
+        if staging:
+            shutil.rmtree(staging, ignore_errors=True)
+        return False
+
+    print(f"Saved dataset snapshot to {target}")
+    return True
+
+def load_snapshot(source_path: str) -> Optional[FiscalDataset]:
+    """
+    Opens the snapshot of source_path with numpy memory maps, skipping JSON parsing.
+    Pages are shared through the OS page cache by every process opening the same snapshot.
+
+    The snapshot is only used if it was built from the current source content: the
+    size must match, and the source hash is recomputed whenever the modification
+    time differs from the one recorded. It must also have been validated under the
+    current validation rules (data_validation_tool.SCHEMA_VERSION), since opening it
+    skips validation. Returns None if there is no usable snapshot.
+    """
+    from skills.data_validation_tool import SCHEMA_VERSION
+
+    target = snapshot_path(source_path)
+    header_file = os.path.join(target, HEADER_FILE)
+    if not os.path.isfile(header_file) or not os.path.isfile(source_path):
+        return None
+
+    try:
+        with open(header_file, 'r') as f:
+            header = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if header.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        return None
+    if header.get("schema_version") != SCHEMA_VERSION:
+        print(f"Snapshot for {source_path} was validated under other rules; ignoring it.")
+        return None
+
+    stat = os.stat(source_path)
+    if stat.st_size != header.get("source_size"):
+        return None
+    if stat.st_mtime_ns != header.get("source_mtime_ns"):
+        if file_content_hash(source_path) != header.get("source_hash"):
+            print(f"Snapshot for {source_path} is stale; ignoring it.")
+            return None
+
+    columns = {}
+    try:
+        for section in CATEGORY_SECTIONS:
+            columns[section] = CategoryColumns(
+                labels=np.load(os.path.join(target, f"{section}.labels.npy")),
+                codes=np.load(os.path.join(target, f"{section}.codes.npy"), mmap_mode='r'),
+                amounts=np.load(os.path.join(target, f"{section}.amounts.npy"), mmap_mode='r'))
+            if header["sections"][section].get("paths"):
+                columns[section].path_labels = np.load(os.path.join(target, f"{section}.path_labels.npy"))
+                columns[section].path_codes = np.load(os.path.join(target, f"{section}.path_codes.npy"), mmap_mode='r')
+        for section in INDICATOR_SECTIONS:
+            columns[section] = IndicatorSeries(
+                years=np.load(os.path.join(target, f"{section}.years.npy"), mmap_mode='r'),
+                rates=np.load(os.path.join(target, f"{section}.rates.npy"), mmap_mode='r'))
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not open snapshot {target}: {e}")
+        return None
+
+    print(f"Opened dataset snapshot {target}")
+    return FiscalDataset(source_path=source_path, content_hash=header["source_hash"],
+                         validation_result=True, _columns=columns)
@@ -1,59 +1,308 @@
-import json
-import os
+from dataclasses import dataclass
+import numpy as np
 from skills.data_validation_tool import validate_data  # Import your validation tool
+from skills.fiscal_dataset import (CATEGORY_SECTIONS, STREAMING_EXTENSIONS, FiscalDataset, encode_labels, field_values,
+                                   load_dataset, numeric_column)
 
-def standardize_data(file_path: str) -> dict:
-    print(f"\n[DEBUG] Starting standardization for {file_path}")
+# Numeric field standardized in each section
+STANDARDIZED_FIELDS = {
+    "revenue": "amount",
+    "expenditure": "amount",
+    "inflation": "rate",
+    "gdp_growth": "rate"
+}
+
+# Record field used for each grouping option. Groups only apply to line-item sections
+# whose records carry the field (e.g. "year" needs per-year line items); indicator
+# sections hold one rate per year and are always filled from the whole series.
+GROUP_FIELDS = {
+    "category": "name",
+    "year": "year",
+}
+
+STRATEGIES = ("mean", "median")
+
+class RunningStats:
+    """
+    Per-group count, mean and variance accumulated chunk by chunk with the Welford/Chan
+    parallel update, so statistics come from a single streaming pass.
+
+    A streaming pass cannot give exact medians; approximate_median is the count-weighted
+    mean of per-chunk medians, which is exact whenever a group fits in one chunk but can
+    be far off for skewed chunks. Use group_medians when the whole column is at hand.
+    """
+    def __init__(self, n_groups: int):
+        self.count = np.zeros(n_groups)
+        self.mean = np.zeros(n_groups)
+        self.m2 = np.zeros(n_groups)
+        self._weighted_medians = np.zeros(n_groups)
+
+    def update(self, codes: np.ndarray, values: np.ndarray) -> None:
+        """
+        Folds a chunk of (group code, value) pairs into the statistics; NaN values are ignored.
+        """
+        present_values = ~np.isnan(values)
+        codes, values = codes[present_values], values[present_values]
+        if not len(values):
+            return
+
+        n_groups = len(self.count)
+        chunk_count = np.bincount(codes, minlength=n_groups).astype(np.float64)
+        has_rows = chunk_count > 0
+        chunk_mean = np.zeros(n_groups)
+        np.divide(np.bincount(codes, weights=values, minlength=n_groups), chunk_count, out=chunk_mean, where=has_rows)
+        chunk_m2 = np.bincount(codes, weights=(values - chunk_mean[codes]) ** 2, minlength=n_groups)
+
+        total = self.count + chunk_count
+        safe_total = np.where(total > 0, total, 1)
+        delta = chunk_mean - self.mean
+        self.mean = np.where(has_rows, self.mean + delta * chunk_count / safe_total, self.mean)
+        self.m2 = self.m2 + chunk_m2 + delta ** 2 * self.count * chunk_count / safe_total
+        self.count = total
+
+        # Chunk medians: sort by (group, value) and pick the middle of each group's run
+        sorted_values = values[np.lexsort((values, codes))]
+        run_lengths = chunk_count[has_rows].astype(np.int64)
+        starts = np.cumsum(run_lengths) - run_lengths
+        medians = (sorted_values[starts + (run_lengths - 1) // 2] + sorted_values[starts + run_lengths // 2]) / 2
+        self._weighted_medians[has_rows] += medians * run_lengths
+
+    def _per_row(self, totals: np.ndarray) -> np.ndarray:
+        out = np.full(len(self.count), np.nan)
+        np.divide(totals, self.count, out=out, where=self.count > 0)
+        return out
+
+    @property
+    def variance(self) -> np.ndarray:
+        return self._per_row(self.m2)
+
+    @property
+    def approximate_median(self) -> np.ndarray:
+        return self._per_row(self._weighted_medians)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the accumulated state as plain lists, e.g. for saving as JSON.
+        """
+        return {"count": self.count.tolist(), "mean": self.mean.tolist(), "m2": self.m2.tolist(),
+                "weighted_medians": self._weighted_medians.tolist()}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "RunningStats":
+        stats = cls(len(state["count"]))
+        stats.count = np.array(state["count"], dtype=np.float64)
+        stats.mean = np.array(state["mean"], dtype=np.float64)
+        stats.m2 = np.array(state["m2"], dtype=np.float64)
+        stats._weighted_medians = np.array(state["weighted_medians"], dtype=np.float64)
+        return stats
+
+    def fill_values(self, strategy: str) -> np.ndarray:
+        """
+        Returns the per-group fill value (NaN for groups without any values) for the
+        "mean" or "approximate_median" strategy.
+        """
+        if strategy == "approximate_median":
+            return self.approximate_median
+        if strategy != "mean":
+            raise ValueError(f"Running statistics cannot give the exact '{strategy}'.")
+        return np.where(self.count > 0, self.mean, np.nan)
+
+def group_medians(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Exact median of every group from a single sort by (group, value). NaN values and
+    rows with a negative code are ignored; groups without values get NaN.
+    """
+    present = ~np.isnan(values) & (codes >= 0)
+    codes, values = codes[present], values[present]
+    medians = np.full(n_groups, np.nan)
+    if not len(values):
+        return medians
+    sorted_values = values[np.lexsort((values, codes))]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    has_rows = counts > 0
+    low = starts[has_rows] + (counts[has_rows] - 1) // 2
+    high = starts[has_rows] + counts[has_rows] // 2
+    medians[has_rows] = (sorted_values[low] + sorted_values[high]) / 2
+    return medians
+
+@dataclass
+class ImputedColumn:
+    """
+    A standardized numeric column and the mask of rows whose value was imputed.
+    """
+    field: str
+    values: np.ndarray
+    imputed: np.ndarray
+
+def _group_codes(items: list, field: str):
     """
-    Loads the JSON file at file_path and standardizes it by filling missing numeric fields:
-      - For 'revenue' and 'expenditure', missing or invalid 'amount' values are filled with the mean amount.
-      - For 'inflation' and 'gdp_growth', missing or invalid 'rate' values are filled with the mean rate.
+    Dictionary-encodes the group field of every record. Records without the field get
+    code -1 and are filled from the section-wide statistic.
+    """
+    missing = object()
+    keys = field_values(items, field, missing)
+    present = [key is not missing for key in keys]
+    labels, codes = encode_labels([key for key in keys if key is not missing])
+    all_codes = np.full(len(items), -1, dtype=np.int32)
+    all_codes[np.flatnonzero(present)] = codes
+    return labels, all_codes
+
+def impute_columns(dataset: FiscalDataset, strategy: str = "mean", group_by: str = None,
+                   chunk_size: int = 1_000_000):
+    """
+    Fills missing or non-numeric values of every section's numeric field.
+
+    Means and variances come from one streaming pass over chunks of chunk_size rows;
+    medians are exact, from one sort of the column by (group, value). All gaps are then
+    filled with one vectorized assignment. With group_by="category" (or "year" for
+    line items that carry a year), line items are filled from their own group's
+    statistic; groups without any values and records without the group field fall back
+    to the section-wide statistic, and to 0 for sections without any values.
+
+    Returns (columns, summary): columns maps each section to an ImputedColumn, and
+    summary maps each section to its row count, imputed count, effective grouping and
+    section-wide mean, standard deviation and median.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown imputation strategy '{strategy}'. Expected one of {STRATEGIES}.")
+    if group_by is not None and group_by not in GROUP_FIELDS:
+        raise ValueError(f"Unknown group_by '{group_by}'. Expected one of {tuple(GROUP_FIELDS)} or None.")
+
+    data = dataset.data
+    columns, summary = {}, {}
+    for section, field in STANDARDIZED_FIELDS.items():
+        items = data.get(section)
+        if not isinstance(items, list):
+            continue
+
+        values = numeric_column(field_values(items, field)).astype(np.float64)
+        effective_group = group_by if section in CATEGORY_SECTIONS else None
+        if effective_group:
+            labels, codes = _group_codes(items, GROUP_FIELDS[effective_group])
+            if items and not len(labels):
+                raise ValueError(f"Cannot group section '{section}' by {effective_group}: "
+                                 f"its records have no '{GROUP_FIELDS[effective_group]}' field.")
+        else:
+            labels, codes = np.array(["all"], dtype=object), np.zeros(len(values), dtype=np.int32)
+
+        group_stats = RunningStats(len(labels))
+        section_stats = RunningStats(1)
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            chunk_codes = codes[start:start + chunk_size]
+            grouped = chunk_codes >= 0
+            group_stats.update(chunk_codes[grouped], chunk[grouped])
+            section_stats.update(np.zeros(len(chunk), dtype=np.int32), chunk)
+
+        section_median = group_medians(np.zeros(len(values), dtype=np.int32), values, 1)[0]
+        if strategy == "median":
+            section_fill = section_median
+            fill = group_medians(codes, values, len(labels))
+        else:
+            section_fill = section_stats.fill_values(strategy)[0]
+            fill = group_stats.fill_values(strategy)
+        if np.isnan(section_fill):
+            section_fill = 0  # Default if no valid numbers are present
+        fill = np.append(np.where(np.isnan(fill), section_fill, fill), section_fill)
+
+        imputed = np.isnan(values)
+        # Code -1 (no group) picks the section-wide fill appended last
+        values[imputed] = fill[codes[imputed]]
+        columns[section] = ImputedColumn(field=field, values=values, imputed=imputed)
+        summary[section] = {
+            "field": field,
+            "strategy": strategy,
+            "group_by": effective_group,
+            "groups": len(labels),
+            "rows": len(values),
+            "imputed": int(imputed.sum()),
+            "mean": float(section_stats.mean[0]) if section_stats.count[0] else None,
+            "std": float(np.sqrt(section_stats.variance[0])) if section_stats.count[0] else None,
+            "median": float(section_median) if section_stats.count[0] else None,
+        }
+    return columns, summary
+
+def standardize_data(file_path: str = "input_data.json", dataset: FiscalDataset = None,
+                     strategy: str = "mean", group_by: str = None, incremental: bool = False) -> dict:
+    """
+    Standardizes the financial data by filling missing numeric fields:
+      - For 'revenue' and 'expenditure', missing or invalid 'amount' values are filled with the mean
+        (or exact median) amount, optionally per category, or per year for line items that
+        carry a year (see impute_columns).
+      - For 'inflation' and 'gdp_growth', missing or invalid 'rate' values are filled with the mean
+        (or median) rate.
     
+    Uses the already loaded dataset when given, otherwise loads file_path.
     The function first checks the data using validate_data. If validation passes, no standardization is needed.
-    It prints out messages explaining its actions and returns the updated data dictionary.
-    """
-    # Check file existence and load JSON data
-    if not os.path.isfile(file_path):
-        print(f"Error: File not found: {file_path}")
-        return {}
-    try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-    except json.JSONDecodeError:
-        print(f"Error: Invalid JSON in file: {file_path}")
-        return {}
+    It prints a summary per section and returns the updated data dictionary, a copy the
+    caller may modify; the shared dataset is never changed.
+
+    With incremental=True only the records appended since the last successful validation
+    are checked and imputed, from running section statistics ("median" then means the
+    approximate median); group_by is not supported there.
+    """
+    if incremental and strategy not in STRATEGIES:
+        raise ValueError(f"Unknown imputation strategy '{strategy}'. Use one of {STRATEGIES}.")
+    if incremental and group_by is not None:
+        raise ValueError("Incremental standardization does not support group_by.")
+    # Load the data once (missing files and invalid JSON are reported by load_dataset)
+    if dataset is None:
+        dataset = load_dataset(file_path)
+        if dataset is None:
+            return {}
+    print(f"\n[DEBUG] Starting standardization for {dataset.source_path}")
+
+    if incremental and not dataset.source_path.lower().endswith(STREAMING_EXTENSIONS):
+        return _standardize_appended(dataset, strategy)
     
     # Validate the data using the data_validation_tool
-    if validate_data(file_path):
+    if validate_data(dataset=dataset):
         print("Data is valid. No standardization needed.")
-        return data
+        return dataset.copy_data()
     else:
         print("Data validation failed. Proceeding with data standardization...")
 
-    # Define sections and their numeric fields to check
-    sections = {
-        "revenue": "amount",
-        "expenditure": "amount",
-        "inflation": "rate",
-        "gdp_growth": "rate"
-    }
-
-    # For each section, compute mean and fill missing or invalid values
-    for section, field in sections.items():
-        if section in data and isinstance(data[section], list):
-            # Collect values that are present and numeric
-            present_values = [item[field] for item in data[section]
-                              if field in item and isinstance(item[field], (int, float))]
-            if present_values:
-                mean_value = sum(present_values) / len(present_values)
-            else:
-                mean_value = 0  # Default if no valid numbers are present
-
-            # Iterate through the section to standardize missing/invalid numeric fields
-            for index, item in enumerate(data[section]):
-                if field not in item or not isinstance(item[field], (int, float)):
-                    print(f"Standardizing: In section '{section}', record {index} missing or invalid '{field}'. Filling with mean value {mean_value:.2f}.")
-                    item[field] = mean_value
+    columns, summary = impute_columns(dataset, strategy=strategy, group_by=group_by)
+
+    data = dataset.copy_data()
+    for section, column in columns.items():
+        items = data[section]
+        filled = 0
+        for index in np.flatnonzero(column.imputed).tolist():
+            if isinstance(items[index], dict):
+                items[index][column.field] = column.values[index].item()
+                filled += 1
+        info = summary[section]
+        grouping = f" per {info['group_by']}" if info["group_by"] else ""
+        print(f"Standardizing: Filled {filled} of {info['rows']} '{column.field}' values in section "
+              f"'{section}' with the {strategy}{grouping}.")
     
     return data
 
+def _standardize_appended(dataset: FiscalDataset, strategy: str) -> dict:
+    """
+    The incremental path of standardize_data: fills only the appended rows.
+    """
+    if dataset.validation_result:
+        print("Data is valid. No standardization needed.")
+        return dataset.copy_data()
+    from skills.incremental_validation import validate_incremental
+    report = validate_incremental(dataset=dataset, strategy="mean" if strategy == "mean" else "approximate_median")
+    if report["valid"]:
+        print("Data is valid. No standardization needed.")
+        return dataset.copy_data()
+    print("Data validation failed. Proceeding with data standardization...")
+
+    data = dataset.copy_data()
+    for section, entry in report["imputed"].items():
+        start, column = entry["start"], entry["column"]
+        items = data[section]
+        filled = 0
+        for index in np.flatnonzero(column.imputed).tolist():
+            if isinstance(items[start + index], dict):
+                items[start + index][column.field] = column.values[index].item()
+                filled += 1
+        print(f"Standardizing: Filled {filled} of {len(column.values)} new '{column.field}' values in section "
+              f"'{section}' with the {strategy}.")
+    return data
@@ -0,0 +1,235 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from skills.tax_microsimulation import INCOME_COLUMN, TaxSchedule, income_chunk_jobs, load_income_chunk
+
+DEFAULT_RELATIVE_ACCURACY = 0.005
+
+class IncomeSketch:
+    """
+    Mergeable log-bucketed histogram of incomes and the tax paid on them.
+
+    Bucket k holds incomes in (gamma^(k-1), gamma^k] with gamma = (1 + a) / (1 - a), so any
+    quantile read from the sketch is within relative accuracy a of the true value (the
+    DDSketch bucketing). Every bucket keeps its taxpayer count, income sum and tax sum;
+    zero incomes have their own bucket. Sketches with the same accuracy merge by adding
+    buckets, so chunks can be sketched by separate workers in any order.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.income = np.zeros(0)
+        self.tax = np.zeros(0)
+        self.zero_count = 0
+        self.zero_tax = 0.0
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum()) + self.zero_count
+
+    def _ensure(self, low: int, high: int):
+        """
+        Grows the bucket arrays to cover keys low..high.
+        """
+        if not len(self.counts):
+            self.offset = low
+        new_offset = min(self.offset, low)
+        size = max(self.offset + len(self.counts), high + 1) - new_offset
+        if new_offset == self.offset and size == len(self.counts):
+            return
+        shift = self.offset - new_offset
+        for name in ("counts", "income", "tax"):
+            old = getattr(self, name)
+            grown = np.zeros(size, dtype=old.dtype)
+            grown[shift:shift + len(old)] = old
+            setattr(self, name, grown)
+        self.offset = new_offset
+
+    def add(self, incomes, taxes):
+        """
+        Adds a chunk of incomes and the tax each of them pays.
+        """
+        incomes = np.maximum(np.asarray(incomes, dtype=np.float64), 0)
+        taxes = np.asarray(taxes, dtype=np.float64)
+        positive = incomes > 0
+        self.zero_count += int((~positive).sum())
+        self.zero_tax += float(taxes[~positive].sum())
+        incomes, taxes = incomes[positive], taxes[positive]
+        if not len(incomes):
+            return
+        keys = np.ceil(np.log(incomes) / self.log_gamma).astype(np.int64)
+        low, high = int(keys.min()), int(keys.max())
+        self._ensure(low, high)
+        index = keys - self.offset
+        size = len(self.counts)
+        self.counts += np.bincount(index, minlength=size)
+        self.income += np.bincount(index, weights=incomes, minlength=size)
+        self.tax += np.bincount(index, weights=taxes, minlength=size)
+
+    def merge(self, other: "IncomeSketch") -> "IncomeSketch":
+        """
+        Adds another sketch with the same relative accuracy into this one.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("only sketches with the same relative accuracy can be merged")
+        self.zero_count += other.zero_count
+        self.zero_tax += other.zero_tax
+        if len(other.counts):
+            self._ensure(other.offset, other.offset + len(other.counts) - 1)
+            start = other.offset - self.offset
+            stop = start + len(other.counts)
+            self.counts[start:stop] += other.counts
+            self.income[start:stop] += other.income
+            self.tax[start:stop] += other.tax
+        return self
+
+    def bucket_values(self) -> np.ndarray:
+        """
+        Representative income of every bucket (within the relative accuracy of its members).
+        """
+        keys = np.arange(self.offset, self.offset + len(self.counts))
+        return 2 * self.gamma ** keys / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        total = self.count
+        if not total:
+            return math.nan
+        rank = q * (total - 1)
+        if rank < self.zero_count:
+            return 0.0
+        position = int(np.searchsorted(np.cumsum(self.counts), rank - self.zero_count, side="right"))
+        return float(self.bucket_values()[min(position, len(self.counts) - 1)])
+
+    def cumulative(self):
+        """
+        Returns cumulative (taxpayers, income, tax) at every bucket edge, starting from 0
+        and with the zero-income bucket first. Values between edges are interpolated, i.e.
+        incomes are assumed evenly spread inside a bucket.
+        """
+        counts = np.concatenate([[0, self.zero_count], self.counts]).astype(np.float64)
+        income = np.concatenate([[0.0, 0.0], self.income])
+        tax = np.concatenate([[0.0, self.zero_tax], self.tax])
+        return np.cumsum(counts), np.cumsum(income), np.cumsum(tax)
+
+def _gini(population: np.ndarray, amounts: np.ndarray) -> float:
+    """
+    Gini coefficient from a piecewise linear Lorenz curve given by cumulative population
+    and cumulative amounts at the same points.
+    """
+    if population[-1] <= 0 or amounts[-1] <= 0:
+        return 0.0
+    p = population / population[-1]
+    lorenz = amounts / amounts[-1]
+    area = np.sum(np.diff(p) * (lorenz[1:] + lorenz[:-1]) / 2)
+    return float(1 - 2 * area)
+
+def distribution_metrics(sketch: IncomeSketch, groups: int = 10, top_share: float = 0.01) -> dict:
+    """
+    Computes the distributional report from a (merged) sketch: income, tax and effective
+    rate per income group (deciles by default), the Gini coefficient before and after tax,
+    and the share of tax paid by the top 'top_share' of taxpayers.
+
+    Post-tax incomes are taken in pre-tax order, which holds for any schedule with
+    marginal rates below 100%.
+    """
+    population, income, tax = sketch.cumulative()
+    total = population[-1]
+    if not total:
+        return {}
+    edges = np.linspace(0, total, groups + 1)
+    group_income = np.diff(np.interp(edges, population, income))
+    group_tax = np.diff(np.interp(edges, population, tax))
+    bounds = [sketch.quantile(q) for q in np.linspace(0, 1, groups + 1)]
+    top_tax = tax[-1] - np.interp(total * (1 - top_share), population, tax)
+
+    return {
+        "taxpayers": int(total),
+        "total_income": float(income[-1]),
+        "total_tax": float(tax[-1]),
+        "groups": [
+            {
+                "group": index + 1,
+                "lower": bounds[index],
+                "upper": bounds[index + 1],
+                "income": float(group_income[index]),
+                "tax": float(group_tax[index]),
+                "effective_rate": float(group_tax[index] / group_income[index]) if group_income[index] else 0.0,
+            }
+            for index in range(groups)
+        ],
+        "gini_pre_tax": _gini(population, income),
+        "gini_post_tax": _gini(population, income - tax),
+        "top_share": top_share,
+        "top_threshold": sketch.quantile(1 - top_share),
+        "top_tax_share": float(top_tax / tax[-1]) if tax[-1] else 0.0,
+    }
+
+def _sketch_job(args) -> IncomeSketch:
+    """
+    Loads and sketches one chunk. Top-level so process pool workers can run it.
+    """
+    job, schedule, relative_accuracy = args
+    incomes = load_income_chunk(job)
+    incomes = incomes[~np.isnan(incomes)]
+    sketch = IncomeSketch(relative_accuracy)
+    sketch.add(incomes, schedule.liabilities(incomes))
+    return sketch
+
+def analyze_distribution(income_file: str, schedule, column: str = INCOME_COLUMN, workers: int = None,
+                         relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY, groups: int = 10,
+                         top_share: float = 0.01) -> dict:
+    """
+    Streams a taxpayer income file once and reports how a slab schedule (a TaxSchedule or
+    the slab list from create_tax_slabs) affects each income decile.
+
+    Each chunk (see tax_microsimulation.income_chunk_jobs) is reduced to an IncomeSketch,
+    on a process pool when workers > 1, and the sketches are merged; the population is
+    never held or sorted in memory. See distribution_metrics for the report.
+    """
+    if not isinstance(schedule, TaxSchedule):
+        schedule = TaxSchedule.from_slabs(schedule)
+    if not os.path.isfile(income_file):
+        print(f"Error: File not found: {income_file}")
+        return {}
+
+    jobs = [(job, schedule, relative_accuracy) for job in income_chunk_jobs(income_file, column)]
+    workers = workers or os.cpu_count() or 1
+    sketch = IncomeSketch(relative_accuracy)
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            for part in pool.map(_sketch_job, jobs):
+                sketch.merge(part)
+    else:
+        for job in jobs:
+            sketch.merge(_sketch_job(job))
+
+    report = distribution_metrics(sketch, groups, top_share)
+    if report:
+        print(f"Gini before tax {report['gini_pre_tax']:.4f}, after tax {report['gini_post_tax']:.4f}; "
+              f"top {top_share:.0%} pay {report['top_tax_share']:.1%} of tax.")
+        for group in report["groups"]:
+            print(f"Group {group['group']}: incomes {group['lower']:.2f} - {group['upper']:.2f}, "
+                  f"effective rate {group['effective_rate']:.2%}")
+    return report
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from skills.budget_projection_tool import project_budget
+    from skills.tax_slab_tool import create_tax_slabs
+
+    parser = argparse.ArgumentParser(description="Distributional impact of the recommended tax slabs")
+    parser.add_argument("income_file", help=".npy array or CSV/text file of taxpayer incomes")
+    parser.add_argument("--data", default="input_data.json", help="Budget data used to derive the slabs")
+    parser.add_argument("--column", default=INCOME_COLUMN, help="Income column of a CSV file with a header")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    slabs = create_tax_slabs(project_budget(args.data))
+    print(json.dumps(analyze_distribution(args.income_file, slabs, args.column, args.workers), indent=2))
@@ -0,0 +1,380 @@
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+from skills.category_hierarchy import PATH_FIELD, CategoryHierarchy, item_path
+from skills.projection_cache import LRUCache, content_hash, copy_result
+
+SECTIONS = ("revenue", "expenditure", "inflation", "gdp_growth")
+CATEGORY_SECTIONS = ("revenue", "expenditure")
+INDICATOR_SECTIONS = ("inflation", "gdp_growth")
+STREAMING_EXTENSIONS = (".ndjson", ".jsonl")
+
+@dataclass
+class CategoryColumns:
+    """
+    Columnar form of a revenue or expenditure section.
+
+    Attributes:
+        labels: Unique category names (interned strings), in order of first appearance.
+        codes: int32 index into labels for every line item.
+        amounts: int64 when every amount is an integer, otherwise float64 with NaN
+                 marking missing or non-numeric amounts.
+        path_labels: Unique values of the records' optional 'path' field, JSON-encoded,
+                     or None when no record has one.
+        path_codes: int32 index into path_labels for every line item, -1 for records
+                    without a path (None together with path_labels).
+    """
+    labels: np.ndarray
+    codes: np.ndarray
+    amounts: np.ndarray
+    path_labels: Optional[np.ndarray] = None
+    path_codes: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def names(self) -> np.ndarray:
+        return self.labels[self.codes]
+
+    def total(self) -> float:
+        return float(np.nansum(self.amounts))
+
+    def paths(self) -> list:
+        """
+        Returns the full category path of every line item (see category_hierarchy.item_path).
+        """
+        names = self.names.tolist()
+        if self.path_codes is None:
+            return [(name,) for name in names]
+        parents = [item_path({"name": "", PATH_FIELD: json.loads(label)})[:-1]
+                   for label in self.path_labels.tolist()]
+        parents.append(())  # code -1: no path
+        return [parents[code] + (name,) for code, name in zip(self.path_codes.tolist(), names)]
+
+@dataclass
+class IndicatorSeries:
+    """
+    Columnar form of an indicator section such as inflation or GDP growth.
+    Only records whose year parses as an integer and whose rate parses as a float are kept.
+    """
+    years: np.ndarray
+    rates: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+def field_values(items: list, field_name: str, default=None) -> list:
+    """
+    Extracts one field from every record; records that aren't objects give the default.
+    """
+    return [item.get(field_name, default) if isinstance(item, dict) else default for item in items]
+
+def encode_labels(values: list):
+    """
+    Dictionary-encodes values as (labels, codes): unique interned string labels in order
+    of first appearance, and an int32 code per value.
+    """
+    index = {}
+    codes = np.fromiter((index.setdefault(sys.intern(str(value)), len(index)) for value in values),
+                        dtype=np.int32, count=len(values))
+    labels = np.empty(len(index), dtype=object)
+    labels[:] = list(index)
+    return labels, codes
+
+def numeric_column(values: list) -> np.ndarray:
+    """
+    Converts values to an int64 array when all are integers, otherwise to float64
+    with NaN marking missing or non-numeric entries.
+    """
+    if all(type(value) is int for value in values):
+        return np.array(values, dtype=np.int64)
+    return np.fromiter((value if isinstance(value, (int, float)) else np.nan for value in values),
+                       dtype=np.float64, count=len(values))
+
+def build_category_columns(items: list) -> CategoryColumns:
+    """
+    Encodes a list of {"name", "amount"} items (with an optional "path") as category
+    codes plus an amount array, in a single pass over the records.
+    """
+    index, path_index = {}, {}
+    codes = np.empty(len(items), dtype=np.int32)
+    path_codes = np.full(len(items), -1, dtype=np.int32)
+    amounts = []
+    all_int = True
+    for row, item in enumerate(items):
+        if isinstance(item, dict):
+            name, amount = item.get("name", "Unknown"), item.get("amount")
+            if PATH_FIELD in item:
+                path_codes[row] = path_index.setdefault(json.dumps(item[PATH_FIELD]), len(path_index))
+        else:
+            name, amount = "Unknown", None
+        codes[row] = index.setdefault(sys.intern(str(name)), len(index))
+        if type(amount) is not int:
+            all_int = False
+            if not isinstance(amount, (int, float)):
+                amount = np.nan
+        amounts.append(amount)
+    labels = np.empty(len(index), dtype=object)
+    labels[:] = list(index)
+    amounts = np.array(amounts, dtype=np.int64 if all_int else np.float64)
+    if not path_index:
+        return CategoryColumns(labels=labels, codes=codes, amounts=amounts)
+    path_labels = np.empty(len(path_index), dtype=object)
+    path_labels[:] = list(path_index)
+    return CategoryColumns(labels=labels, codes=codes, amounts=amounts, path_labels=path_labels, path_codes=path_codes)
+
+def build_indicator_series(items: list) -> IndicatorSeries:
+    """
+    Parses a list of {"year", "rate"} items into parallel year and rate arrays.
+    """
+    years, rates = [], []
+    for item in items:
+        try:
+            year, rate = int(item.get("year")), float(item.get("rate"))
+        except (ValueError, TypeError):
+            continue
+        years.append(year)
+        rates.append(rate)
+    return IndicatorSeries(years=np.array(years, dtype=np.int64), rates=np.array(rates, dtype=np.float64))
+
+def data_from_columns(columns: dict) -> dict:
+    """
+    Rebuilds the regular input layout from columnar sections.
+    """
+    data = {}
+    for section in CATEGORY_SECTIONS:
+        if section in columns:
+            cols = columns[section]
+            data[section] = [{"name": str(name), "amount": amount}
+                             for name, amount in zip(cols.names.tolist(), cols.amounts.tolist())]
+            if cols.path_codes is not None:
+                paths = [json.loads(label) for label in cols.path_labels.tolist()]
+                for item, code in zip(data[section], cols.path_codes.tolist()):
+                    if code >= 0:
+                        item[PATH_FIELD] = paths[code]
+    for section in INDICATOR_SECTIONS:
+        if section in columns:
+            series = columns[section]
+            data[section] = [{"year": str(year), "rate": rate}
+                             for year, rate in zip(series.years.tolist(), series.rates.tolist())]
+    return data
+
+def column_total(items: list, field_name: str) -> float:
+    """
+    Sums a numeric field over a list of dicts in one vectorized pass; missing values count as 0.
+    """
+    return float(np.fromiter((item.get(field_name, 0) for item in items), dtype=np.float64, count=len(items)).sum())
+
+@dataclass
+class FiscalDataset:
+    """
+    The parsed contents of one financial data file, shared by every skill in a run.
+
+    Attributes:
+        source_path: Path the data was loaded from.
+        content_hash: SHA-256 of the raw file content, used as the dataset version (tagged
+                      for streams whose line items were summed, see streaming_ingest).
+        revision: Number of in-memory line-item updates (see category_hierarchy), which
+                  together with content_hash identifies the current data.
+        raw_data: The parsed JSON document, or None when the records are held only as
+                  columns (datasets opened from a binary snapshot, or compacted after
+                  validation); 'data' then rebuilds them from the columns when read.
+        validation_result: Set by validate_data the first time the dataset is checked,
+                           so later calls don't repeat the work.
+    """
+    source_path: str
+    content_hash: str
+    raw_data: Optional[dict] = field(default=None, repr=False)
+    validation_result: Optional[bool] = None
+    revision: int = 0
+    _columns: dict = field(default_factory=dict, repr=False, compare=False)
+    _hierarchies: dict = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def data(self) -> dict:
+        """
+        The dataset in the regular input layout. Skills must treat it as read-only.
+        Records held only as columns are rebuilt on every access and not kept, so a
+        compacted dataset stays compact; read it once per pass.
+        """
+        if self.raw_data is None:
+            return data_from_columns(self._columns)
+        return self.raw_data
+
+    def copy_data(self) -> dict:
+        """
+        A copy of 'data' that the caller owns and may modify without affecting the dataset.
+        """
+        if self.raw_data is None:
+            return data_from_columns(self._columns)
+        return copy_result(self.raw_data)
+
+    @property
+    def revenue(self) -> list:
+        return self.data.get("revenue", [])
+
+    @property
+    def expenditure(self) -> list:
+        return self.data.get("expenditure", [])
+
+    @property
+    def inflation(self) -> list:
+        return self.data.get("inflation", [])
+
+    @property
+    def gdp_growth(self) -> list:
+        return self.data.get("gdp_growth", [])
+
+    def section_length(self, section: str) -> Optional[int]:
+        """
+        Returns the number of records in a section, or None if the data has no such list.
+        Snapshot-backed datasets answer from their columns without rebuilding 'data'.
+        """
+        if self.raw_data is None:
+            return len(self._columns[section]) if section in self._columns else None
+        records = self.raw_data.get(section)
+        return len(records) if isinstance(records, list) else None
+
+    def category_columns(self, section: str) -> CategoryColumns:
+        """
+        Returns the columnar form of 'revenue' or 'expenditure', built on first use.
+        """
+        if section not in self._columns:
+            self._columns[section] = build_category_columns(self.data.get(section, []))
+        return self._columns[section]
+
+    def indicator_series(self, section: str) -> IndicatorSeries:
+        """
+        Returns the year/rate arrays of an indicator section, built on first use.
+        """
+        if section not in self._columns:
+            self._columns[section] = build_indicator_series(self.data.get(section, []))
+        return self._columns[section]
+
+    def columns_rebuild_records(self) -> bool:
+        """
+        True if the columns hold everything in the records, i.e. 'data' can be rebuilt
+        from them exactly: only the four sections, line items with just a string name, an
+        amount and optionally a path, and indicator records with just a year and rate whose
+        year parses.
+        """
+        data = self.data
+        if not data.keys() <= set(SECTIONS):
+            return False
+        for section in CATEGORY_SECTIONS:
+            for item in data.get(section, []):
+                if not isinstance(item, dict) or not item.keys() <= {"name", "amount", PATH_FIELD} \
+                        or not isinstance(item.get("name"), str):
+                    return False
+        for section in INDICATOR_SECTIONS:
+            items = data.get(section, [])
+            series = self.indicator_series(section)
+            if len(series) != len(items):
+                return False
+            for item, year in zip(items, series.years.tolist()):
+                if not item.keys() <= {"year", "rate"} or item["year"] != str(year):
+                    return False
+        return True
+
+    def compact(self) -> bool:
+        """
+        Builds the columns of every section and drops the parsed records when the columns
+        can rebuild them (see columns_rebuild_records), so a validated dataset holds each
+        value once. Returns True if the records were dropped.
+        """
+        if self.raw_data is None:
+            return True
+        if not self.columns_rebuild_records():
+            return False
+        for section in CATEGORY_SECTIONS:
+            self.category_columns(section)
+        for section in INDICATOR_SECTIONS:
+            self.indicator_series(section)
+        self.raw_data = None
+        return True
+
+    def category_hierarchy(self, section: str) -> CategoryHierarchy:
+        """
+        Returns the roll-up index of 'revenue' or 'expenditure' built from the records'
+        optional 'path' field (see category_hierarchy), built on first use.
+        The index is the source of the section's amounts: CategoryHierarchy.update_leaf
+        writes the new amount through to the columns and records and bumps 'revision',
+        so projections and everything computed from them see the change.
+        """
+        if section not in self._hierarchies:
+            columns = self.category_columns(section)
+            hierarchy = CategoryHierarchy(columns.paths(), columns.amounts)
+            hierarchy.on_update = lambda row, amount: self._line_item_updated(section, row, amount)
+            self._hierarchies[section] = hierarchy
+        return self._hierarchies[section]
+
+    def _line_item_updated(self, section: str, row: int, amount) -> None:
+        columns = self.category_columns(section)
+        if columns.amounts.dtype.kind == 'i' and type(amount) is not int:
+            columns.amounts = columns.amounts.astype(np.float64)
+        elif not columns.amounts.flags.writeable:
+            columns.amounts = np.array(columns.amounts)  # snapshot columns are read-only memory maps
+        columns.amounts[row] = amount
+        if self.raw_data is not None and isinstance(self.raw_data[section][row], dict):
+            items = self.raw_data[section]
+            items[row] = {**items[row], "amount": amount}
+        self.revision += 1
+
+# Loaded datasets keyed by (absolute path, mtime, size, summed stream), so a file is only parsed
+# again once it changes.
+_DATASET_CACHE = LRUCache(maxsize=8)
+
+def load_dataset(file_path: str = "input_data.json", aggregate_stream: bool = False) -> Optional[FiscalDataset]:
+    """
+    Reads and parses the JSON file at file_path once and returns a FiscalDataset.
+    A current binary snapshot (see dataset_snapshot) is opened instead of parsing, and
+    .ndjson/.jsonl files are read incrementally by streaming_ingest.ingest_stream.
+    With aggregate_stream=True the line items of such a stream are summed per category
+    path as they arrive, so memory stays bounded by the number of distinct categories and
+    years however many records the file holds; it has no effect on regular JSON files.
+    Repeated loads of an unchanged file return the same object.
+    Returns None if the file is missing or is not valid JSON.
+    """
+    if not os.path.isfile(file_path):
+        print(f"Error: File not found: {file_path}")
+        return None
+
+    stream = file_path.lower().endswith(STREAMING_EXTENSIONS)
+    aggregate_stream = aggregate_stream and stream
+    stat = os.stat(file_path)
+    cache_key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, aggregate_stream)
+    dataset = _DATASET_CACHE.get(cache_key)
+    if dataset is not None:
+        return dataset
+
+    # Imported here because both modules build on this one
+    from skills.dataset_snapshot import load_snapshot
+    from skills.streaming_ingest import ingest_stream
+
+    # Snapshots hold the per-record data, never the summed stream
+    dataset = None if aggregate_stream else load_snapshot(file_path)
+    if dataset is None and stream:
+        dataset = ingest_stream(file_path, aggregate=aggregate_stream)
+    if dataset is not None:
+        _DATASET_CACHE.put(cache_key, dataset)
+        return dataset
+
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    try:
+        data = json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        print(f"Error: Invalid JSON in file: {file_path}")
+        return None
+    if not isinstance(data, dict):
+        print(f"Error: The top-level JSON value in {file_path} must be an object.")
+        return None
+
+    dataset = FiscalDataset(source_path=file_path, content_hash=content_hash(raw), raw_data=data)
+    _DATASET_CACHE.put(cache_key, dataset)
+    print(f"Loaded dataset from {file_path}")
+    return dataset
@@ -0,0 +1,141 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from skills.fiscal_dataset import FiscalDataset, load_dataset
+from skills.trend_forecasting import FORECAST_METHODS, INDICATOR_REGISTRY, stack_series
+
+def _window_sums(stats: np.ndarray, window: int = None) -> np.ndarray:
+    """
+    For stats of shape (..., T), returns the sums over the columns before each column t:
+    all earlier columns (expanding window), or the 'window' columns before t taken from
+    a strided sliding-window view (rolling window).
+    """
+    if window is None:
+        prefix = np.cumsum(stats, axis=-1)
+        return np.concatenate([np.zeros(stats.shape[:-1] + (1,)), prefix[..., :-1]], axis=-1)
+    padded = np.concatenate([np.zeros(stats.shape[:-1] + (window,)), stats[..., :-1]], axis=-1)
+    return sliding_window_view(padded, window, axis=-1).sum(axis=-1)
+
+def _linear_backtest(x: np.ndarray, values: np.ndarray, weights: np.ndarray, window: int = None):
+    """
+    One-step-ahead linear trend forecasts for every (series, cutoff) cell at once.
+    Returns (forecasts, training counts), both of shape (K, T).
+    """
+    stats = np.stack([weights, weights * x, weights * values, weights * values * x, weights * x * x])
+    counts, sum_x, sum_y, sum_xy, sum_xx = _window_sums(stats, window)
+    denominator = counts * sum_xx - sum_x ** 2
+    fit = (counts >= 2) & (denominator > 0)
+    safe_counts = np.where(counts > 0, counts, 1)
+    slope = np.where(fit, (counts * sum_xy - sum_x * sum_y) / np.where(fit, denominator, 1), 0.0)
+    intercept = (sum_y - slope * sum_x) / safe_counts
+    return intercept + slope * x, counts
+
+def _ses_backtest(values: np.ndarray, mask: np.ndarray, alpha: float):
+    """
+    One-step-ahead simple exponential smoothing forecasts: the smoothed level before each
+    column is the forecast for that column. One pass over the T columns for all series.
+    """
+    k, t = values.shape
+    forecasts = np.full((k, t), np.nan)
+    level = np.full(k, np.nan)
+    for column in range(t):
+        forecasts[:, column] = level
+        observed = mask[:, column]
+        level = np.where(observed & np.isnan(level), values[:, column],
+                         np.where(observed, alpha * values[:, column] + (1 - alpha) * level, level))
+    counts = np.concatenate([np.zeros((k, 1)), np.cumsum(mask, axis=1)[:, :-1]], axis=1)
+    return forecasts, counts
+
+def backtest_batch(series_list: list, methods=FORECAST_METHODS, window: int = None, min_train: int = 2,
+                   alpha: float = 0.5) -> dict:
+    """
+    Replays every observed year of K year/value series as a cutoff and forecasts it from
+    the years before it, for all series, cutoffs and methods at once.
+
+    Training data is every earlier year (window=None) or only the 'window' grid years
+    before the cutoff (the window applies to linear fits; smoothing always runs over the
+    full history). Cutoffs with fewer than min_train training years are skipped.
+    Linear fits come from windowed sums of the masked regression statistics, so no model
+    is refitted per cutoff.
+
+    Returns {method: {"mae", "rmse", "bias", "forecasts"}} with one entry per series in
+    every array; bias is the mean of forecast minus actual and metrics of series without
+    any scored cutoff are NaN.
+    """
+    for method in methods:
+        if method not in FORECAST_METHODS:
+            raise ValueError(f"Unknown forecast method '{method}'. Expected one of {FORECAST_METHODS}.")
+    if window is not None and window < 1:
+        raise ValueError("window must be at least 1 year")
+    if min_train < 1:
+        raise ValueError("min_train must be at least 1")
+
+    grid, values, mask = stack_series(series_list)
+    x = (grid - grid[0]).astype(np.float64) if len(grid) else np.zeros(0)
+    weights = mask.astype(np.float64)
+
+    results = {}
+    for method in methods:
+        if method == "linear":
+            forecasts, counts = _linear_backtest(x, values, weights, window)
+        else:
+            forecasts, counts = _ses_backtest(values, mask, alpha)
+        scored = mask & (counts >= min_train)
+        errors = np.where(scored, forecasts - values, 0.0)
+        n = scored.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            results[method] = {
+                "mae": np.abs(errors).sum(axis=1) / n,
+                "rmse": np.sqrt((errors ** 2).sum(axis=1) / n),
+                "bias": errors.sum(axis=1) / n,
+                "forecasts": n,
+            }
+    return results
+
+def backtest_indicators(file_path: str = "input_data.json", dataset: FiscalDataset = None,
+                        methods=FORECAST_METHODS, window: int = None, min_train: int = 2) -> list:
+    """
+    Backtests the one-year-ahead forecasts of every registered indicator in the data
+    (see trend_forecasting) and prints a summary table.
+
+    Returns one row per indicator and method:
+        {"indicator", "method", "forecasts", "mae", "rmse", "bias"}
+    """
+    if dataset is None:
+        dataset = load_dataset(file_path)
+        if dataset is None:
+            return []
+
+    specs = [spec for spec in INDICATOR_REGISTRY.values() if dataset.section_length(spec.section)]
+    if not specs:
+        print("No indicator data to backtest.")
+        return []
+    series_list = [(dataset.indicator_series(spec.section).years, dataset.indicator_series(spec.section).rates)
+                   for spec in specs]
+    results = backtest_batch(series_list, methods=methods, window=window, min_train=min_train)
+
+    rows = []
+    for method, metrics in results.items():
+        for row, spec in enumerate(specs):
+            rows.append({
+                "indicator": spec.section,
+                "method": method,
+                "forecasts": int(metrics["forecasts"][row]),
+                "mae": float(metrics["mae"][row]),
+                "rmse": float(metrics["rmse"][row]),
+                "bias": float(metrics["bias"][row]),
+            })
+
+    print(f"{'Indicator':<16}{'Method':<8}{'Forecasts':>10}{'MAE':>8}{'RMSE':>8}{'Bias':>8}")
+    for row in rows:
+        print(f"{row['indicator']:<16}{row['method']:<8}{row['forecasts']:>10}"
+              f"{row['mae']:>8.3f}{row['rmse']:>8.3f}{row['bias']:>8.3f}")
+    return rows
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Backtest the indicator forecasts used by project_budget")
+    parser.add_argument("file_path", nargs="?", default="input_data.json")
+    parser.add_argument("--window", type=int, default=None, help="Train on only this many years before each cutoff")
+    parser.add_argument("--min-train", type=int, default=2, help="Skip cutoffs with fewer training years")
+    args = parser.parse_args()
+    backtest_indicators(args.file_path, window=args.window, min_train=args.min_train)
@@ -0,0 +1,325 @@
+import codecs
+import hashlib
+import json
+import os
+from json.decoder import WHITESPACE
+import numpy as np
+from skills.data_validation_tool import SCHEMA_VALIDATOR, SCHEMA_VERSION, describe_violation
+from skills.dataset_standardization_tool import STANDARDIZED_FIELDS, ImputedColumn, RunningStats
+from skills.fiscal_dataset import STREAMING_EXTENSIONS, FiscalDataset, field_values, numeric_column
+
+STATE_FORMAT_VERSION = 2
+STATE_SUFFIX = ".validation_state.json"
+INCREMENTAL_STRATEGIES = ("mean", "approximate_median")
+# Bytes hashed at each end of a history segment when verify_history is off
+EDGE_BYTES = 4096
+READ_BLOCK = 1 << 20
+
+def state_path(source_path: str) -> str:
+    """
+    Returns the validation state file that belongs to a source file (written next to it).
+    """
+    return source_path + STATE_SUFFIX
+
+def _load_state(file_path: str):
+    try:
+        with open(state_path(file_path), 'r') as f:
+            state = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if state.get("format_version") != STATE_FORMAT_VERSION or state.get("schema_version") != SCHEMA_VERSION:
+        return None
+    return state
+
+def _save_state(file_path: str, state: dict) -> None:
+    try:
+        with open(state_path(file_path), 'w') as f:
+            json.dump(state, f)
+    except OSError as e:
+        print(f"Warning: Could not save validation state for {file_path}: {e}")
+
+def _edges(f, start: int, size: int) -> str:
+    """
+    Hash of the first and last EDGE_BYTES of the bytes [start, start + size).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    f.seek(start)
+    digest.update(f.read(min(EDGE_BYTES, size)))
+    f.seek(max(start + size - EDGE_BYTES, start))
+    digest.update(f.read(min(EDGE_BYTES, size)))
+    return digest.hexdigest()
+
+def _piece_record(f, start: int, size: int) -> dict:
+    """
+    Fingerprints the bytes [start, start + size) of an open file: a hash of all of them
+    and a hash of just their edges.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    f.seek(start)
+    remaining = size
+    while remaining:
+        block = f.read(min(READ_BLOCK, remaining))
+        if not block:
+            break
+        digest.update(block)
+        remaining -= len(block)
+    return {"size": size, "hash": digest.hexdigest(), "edges": _edges(f, start, size)}
+
+def _segment_matches(f, start: int, segment: list, verify_history: bool) -> bool:
+    """
+    True if the file holds the pieces of a history segment from byte offset start on.
+    """
+    for piece in segment:
+        if verify_history:
+            if _piece_record(f, start, piece["size"])["hash"] != piece["hash"]:
+                return False
+        elif _edges(f, start, piece["size"]) != piece["edges"]:
+            return False
+        start += piece["size"]
+    return True
+
+def _scan_document(text: str):
+    """
+    Parses the top-level object of a JSON document field by field. Returns (data, ends):
+    ends maps each list-valued field to the text offset just past its last element (just
+    past '[' for an empty list), i.e. where appended elements are inserted.
+    """
+    decoder = json.JSONDecoder()
+    index = WHITESPACE.match(text, 0).end()
+    if text[index:index + 1] != '{':
+        raise ValueError("The top-level JSON value must be an object.")
+    index += 1
+    data, ends = {}, {}
+    while True:
+        index = WHITESPACE.match(text, index).end()
+        if text[index:index + 1] == '}':
+            break
+        if data:
+            if text[index:index + 1] != ',':
+                raise ValueError(f"Expected ',' at offset {index}.")
+            index = WHITESPACE.match(text, index + 1).end()
+        key, index = decoder.raw_decode(text, index)
+        index = WHITESPACE.match(text, index).end()
+        if not isinstance(key, str) or text[index:index + 1] != ':':
+            raise ValueError(f"Expected a field name at offset {index}.")
+        index = WHITESPACE.match(text, index + 1).end()
+        value, index = decoder.raw_decode(text, index)
+        data[key] = value
+        if isinstance(value, list):
+            last = index - 2
+            while text[last] in " \t\r\n":
+                last -= 1
+            ends[key] = last + 1
+        else:
+            ends.pop(key, None)
+    return data, ends
+
+def _read_appended(f, start: int, max_bytes: int, first: bool):
+    """
+    Decodes the elements appended to an array at byte offset 'start', reading at most
+    max_bytes of new content plus the closing bracket. 'first' means the array was empty,
+    so the first new element has no leading comma.
+    Returns (elements, bytes consumed), or None if the bytes are not a pure append.
+    """
+    if max_bytes == 0:
+        return [], 0
+    decoder = json.JSONDecoder()
+    f.seek(start)
+    raw = f.read(max_bytes + EDGE_BYTES)
+    text = codecs.getincrementaldecoder('utf-8')().decode(raw, final=False)
+    elements, index, end = [], 0, 0
+    try:
+        while True:
+            index = WHITESPACE.match(text, index).end()
+            if index >= len(text) or text[index] == ']':
+                break
+            if not (first and not elements):
+                if text[index] != ',':
+                    return None
+                index = WHITESPACE.match(text, index + 1).end()
+            value, index = decoder.raw_decode(text, index)
+            elements.append(value)
+            end = index
+    except (json.JSONDecodeError, IndexError):
+        return None
+    consumed = len(text[:end].encode('utf-8'))
+    return (elements, consumed) if consumed <= max_bytes else None
+
+def _read_delta(file_path: str, state: dict, verify_history: bool):
+    """
+    Checks that the file is the validated history with elements appended to its sections
+    and returns (appended elements, appended byte ranges) per section, reading only the
+    appended bytes (plus the history itself when verify_history is on). Returns None if
+    the history was edited.
+    """
+    growth = os.path.getsize(file_path) - state["size"]
+    if growth < 0:
+        return None
+    segments = state["segments"]
+    order = sorted(state["sections"], key=lambda section: state["sections"][section]["order"])
+    delta, ranges = {}, {}
+    with open(file_path, 'rb') as f:
+        position = 0
+        for section, segment in zip(order, segments):
+            if not _segment_matches(f, position, segment, verify_history):
+                return None
+            position += sum(piece["size"] for piece in segment)
+            appended = _read_appended(f, position, growth, first=state["sections"][section]["rows"] == 0)
+            if appended is None:
+                return None
+            delta[section], consumed = appended
+            ranges[section] = (position, consumed)
+            position += consumed
+            growth -= consumed
+        if growth or not _segment_matches(f, position, segments[-1], verify_history):
+            return None
+    return delta, ranges
+
+def _full_state(file_path: str, raw: bytes, text: str, ends: dict, stats: dict, rows: dict) -> dict:
+    """
+    Builds the state of a validated document: the history split into segments at the
+    insertion point of every section, in file order.
+    """
+    ascii_only = len(raw) == len(text)
+    offsets = {section: ends[section] if ascii_only else len(text[:ends[section]].encode('utf-8'))
+               for section in SCHEMA_VALIDATOR.sections}
+    order = sorted(offsets, key=offsets.get)
+    bounds = [0] + [offsets[section] for section in order] + [len(raw)]
+    with open(file_path, 'rb') as f:
+        segments = [[_piece_record(f, start, stop - start)] for start, stop in zip(bounds, bounds[1:])]
+    return {
+        "format_version": STATE_FORMAT_VERSION,
+        "schema_version": SCHEMA_VERSION,
+        "size": len(raw),
+        "segments": segments,
+        "sections": {section: {"order": position, "rows": rows[section], "stats": stats[section].to_dict()}
+                     for position, section in enumerate(order)},
+    }
+
+def _extended_state(file_path: str, state: dict, ranges: dict, stats: dict, rows: dict) -> dict:
+    """
+    Extends a state by the appended bytes: each section's new elements become a new
+    piece of the segment before its insertion point, which moves past them.
+    """
+    segments = [list(segment) for segment in state["segments"]]
+    with open(file_path, 'rb') as f:
+        for section, (start, size) in ranges.items():
+            if size:
+                segments[state["sections"][section]["order"]].append(_piece_record(f, start, size))
+    return {
+        **state,
+        "size": os.path.getsize(file_path),
+        "segments": segments,
+        "sections": {section: {**info, "rows": rows[section], "stats": stats[section].to_dict()}
+                     for section, info in state["sections"].items()},
+    }
+
+def _impute(items: list, field: str, stats: RunningStats, strategy: str, chunk_size: int) -> ImputedColumn:
+    """
+    Merges the rows' values into the running statistics and fills their gaps from them.
+    """
+    values = numeric_column(field_values(items, field)).astype(np.float64)
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size]
+        stats.update(np.zeros(len(chunk), dtype=np.int32), chunk)
+    fill = stats.fill_values(strategy)[0]
+    missing = np.isnan(values)
+    values[missing] = 0 if np.isnan(fill) else fill
+    return ImputedColumn(field=field, values=values, imputed=missing)
+
+def validate_incremental(file_path: str = "input_data.json", dataset: FiscalDataset = None, max_errors: int = 20,
+                         strategy: str = "mean", verify_history: bool = True, chunk_size: int = 1 << 16) -> dict:
+    """
+    Validates and imputes only the records appended since the last successful validation.
+
+    The state file next to the source stores the byte layout of the validated file: its
+    size, the insertion point of every section (just past its last element) and hashes of
+    the history bytes between them, plus each section's row count and running statistics
+    of its numeric field. When the file is that history with elements appended to its
+    sections, only the appended bytes are decoded, validated and imputed, so the cost
+    scales with the delta. The history bytes are re-hashed to catch edits (cheap next to
+    parsing); with verify_history=False only EDGE_BYTES at each end of every segment are
+    compared, so the I/O is independent of the history size too.
+
+    Anything else (no state, edited or shrunk history, other validation rules, NDJSON
+    input) runs a full pass. State is only saved when the data is valid. Gaps are filled
+    from the merged section statistics with the "mean" or "approximate_median" strategy.
+
+    Returns a report with "mode" ("incremental" or "full"), "valid", "error_count",
+    "violations", "new_rows" per section and "imputed": per section, the ImputedColumn
+    of the checked rows together with its "start" row.
+    """
+    if strategy not in INCREMENTAL_STRATEGIES:
+        raise ValueError(f"Incremental imputation supports {INCREMENTAL_STRATEGIES}, not '{strategy}'.")
+    if dataset is not None:
+        file_path = dataset.source_path
+    failed = {"mode": "full", "valid": False, "error_count": 1, "violations": [], "new_rows": {}, "imputed": {}}
+    if not os.path.isfile(file_path):
+        print(f"Error: File not found: {file_path}")
+        return failed
+
+    state = None if file_path.lower().endswith(STREAMING_EXTENSIONS) else _load_state(file_path)
+    appended = _read_delta(file_path, state, verify_history) if state is not None else None
+    if state is not None and appended is None:
+        print(f"History of {file_path} changed since the last validation; running a full pass.")
+
+    if appended is not None:
+        mode = "incremental"
+        data, ranges = appended
+        starts = {section: state["sections"][section]["rows"] for section in data}
+    else:
+        mode = "full"
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        try:
+            text = raw.decode('utf-8')
+            data, ends = _scan_document(text)
+        except (UnicodeDecodeError, ValueError) as e:
+            print(f"Error: Invalid JSON in file: {file_path} ({e})")
+            return failed
+        starts = {section: 0 for section in SCHEMA_VALIDATOR.sections}
+
+    violations, error_count = [], 0
+    new_rows, imputed, stats, rows = {}, {}, {}, {}
+    for section in SCHEMA_VALIDATOR.sections:
+        items = data.get(section)
+        if not isinstance(items, list):
+            error_count += 1
+            violations.append({"section": section, "row": None, "field": None,
+                               "reason": "missing" if section not in data else "not a list"})
+            continue
+        start = starts[section]
+        count, section_violations = SCHEMA_VALIDATOR.check_section(
+            section, items, max(max_errors - len(violations), 0), row_offset=start)
+        error_count += count
+        violations.extend(section_violations)
+        new_rows[section] = len(items)
+        rows[section] = start + len(items)
+
+        stats[section] = (RunningStats.from_dict(state["sections"][section]["stats"]) if mode == "incremental"
+                          else RunningStats(1))
+        column = _impute(items, STANDARDIZED_FIELDS[section], stats[section], strategy, chunk_size)
+        imputed[section] = {"start": start, "column": column}
+
+    valid = error_count == 0
+    for violation in violations:
+        print(f"Error: {describe_violation(violation)}")
+    print(f"{mode.capitalize()} validation of {file_path}: {sum(new_rows.values())} records checked, "
+          f"{error_count} errors.")
+
+    if valid:
+        if mode == "incremental":
+            _save_state(file_path, _extended_state(file_path, state, ranges, stats, rows))
+        else:
+            _save_state(file_path, _full_state(file_path, raw, text, ends, stats, rows))
+    if dataset is not None:
+        dataset.validation_result = valid
+
+    return {
+        "mode": mode,
+        "valid": valid,
+        "error_count": error_count,
+        "violations": violations,
+        "new_rows": new_rows,
+        "imputed": imputed,
+    }
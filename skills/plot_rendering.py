@@ -0,0 +1,285 @@
+import io
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from skills.projection_cache import content_hash
+
+# Bump when renderers change so cached images are drawn again
+RENDER_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+DEFAULT_MAX_CACHED_PLOTS = 64
+
+@dataclass
+class PlotJob:
+    """
+    Everything needed to render one chart, independent of any other chart or of global
+    pyplot state, so jobs can be rendered in any process.
+
+    Attributes:
+        kind: Renderer to use, a key of RENDERERS ("pie", "bar", "scatter", ...).
+        name: File name stem, e.g. "pie_chart_revenues".
+        title: Chart title.
+        data: Renderer-specific payload of plain lists, e.g. {"labels": [...], "values": [...]}.
+        style: Optional renderer settings such as "color", "xlabel" or "ylabel".
+    """
+    kind: str
+    name: str
+    title: str
+    data: dict
+    style: dict = field(default_factory=dict)
+
+@dataclass
+class PlotArtifact:
+    """
+    A rendered chart held in memory, ready to be embedded in a report.
+
+    Attributes:
+        name: Name of the job it was rendered from.
+        title: Chart title.
+        kind: Chart kind the job was rendered with.
+        insight_key: Key of the chart's paragraph in the report's insights["visual"].
+        image: The PNG image.
+        path: File the image is also stored in, or None if it was only rendered in memory.
+    """
+    name: str
+    title: str
+    kind: str
+    insight_key: str
+    image: io.BytesIO
+    path: str = None
+
+RENDERERS = {}
+
+def register_renderer(kind: str):
+    """
+    Decorator registering a function(figure, job) that draws a chart kind onto a Figure.
+    """
+    def register(renderer):
+        RENDERERS[kind] = renderer
+        return renderer
+    return register
+
+@register_renderer("pie")
+def render_pie(figure: Figure, job: PlotJob) -> None:
+    axes = figure.add_subplot()
+    axes.pie(job.data["values"], labels=job.data["labels"], autopct='%1.1f%%', startangle=140)
+    axes.set_title(job.title)
+
+@register_renderer("bar")
+def render_bar(figure: Figure, job: PlotJob) -> None:
+    axes = figure.add_subplot()
+    axes.bar(job.data["labels"], job.data["values"], color=job.style.get("color", "skyblue"))
+    axes.set_xlabel(job.style.get("xlabel", ""))
+    axes.set_ylabel(job.style.get("ylabel", ""))
+    axes.set_title(job.title)
+    for label in axes.get_xticklabels():
+        label.set_rotation(45)
+        label.set_horizontalalignment("right")
+    figure.tight_layout()
+
+@register_renderer("scatter")
+def render_scatter(figure: Figure, job: PlotJob) -> None:
+    axes = figure.add_subplot()
+    axes.scatter(job.data["x"], job.data["y"], color=job.style.get("color"))
+    axes.set_xlabel(job.style.get("xlabel", ""))
+    axes.set_ylabel(job.style.get("ylabel", ""))
+    axes.set_title(job.title)
+
+@register_renderer("heatmap")
+def render_heatmap(figure: Figure, job: PlotJob) -> None:
+    axes = figure.add_subplot()
+    image = axes.imshow(job.data["values"], origin='lower', aspect='auto', cmap=job.style.get("cmap", "viridis"))
+    figure.colorbar(image, ax=axes, label=job.style.get("colorbar", ""))
+    axes.set_xticks(range(len(job.data["x_labels"])))
+    axes.set_xticklabels(job.data["x_labels"], rotation=45, ha="right")
+    axes.set_yticks(range(len(job.data["y_labels"])))
+    axes.set_yticklabels(job.data["y_labels"])
+    axes.set_xlabel(job.style.get("xlabel", ""))
+    axes.set_ylabel(job.style.get("ylabel", ""))
+    axes.set_title(job.title)
+    figure.tight_layout()
+
+def render_figure(job: PlotJob) -> Figure:
+    """
+    Draws a job onto a new Figure with its own Agg canvas (no pyplot involved).
+    """
+    if job.kind not in RENDERERS:
+        raise ValueError(f"No renderer registered for chart kind '{job.kind}'.")
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    RENDERERS[job.kind](figure, job)
+    return figure
+
+def plot_cache_key(job: PlotJob) -> str:
+    """
+    Content address of a chart: a hash of its kind, title, data and style (and the
+    renderer version), so identical charts always map to the same file.
+    """
+    payload = json.dumps({"version": RENDER_FORMAT_VERSION, **asdict(job)}, sort_keys=True, default=str)
+    return content_hash(payload.encode('utf-8'))[:24]
+
+def plot_file_name(job: PlotJob) -> str:
+    return f"{job.name}_{plot_cache_key(job)}.png"
+
+def render_png(job: PlotJob) -> bytes:
+    """
+    Renders one job to PNG bytes in memory. Top-level so process pool workers can run it.
+    """
+    buffer = io.BytesIO()
+    render_figure(job).savefig(buffer, format="png")
+    return buffer.getvalue()
+
+def _write_image(image: bytes, output_path: str) -> str:
+    """
+    Writes image bytes to a temporary file first and moves it into place, so readers
+    never see a partial file.
+    """
+    directory = os.path.dirname(os.path.abspath(output_path))
+    handle, staging = tempfile.mkstemp(suffix=".png", prefix=".render-", dir=directory)
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            f.write(image)
+        os.replace(staging, output_path)
+    finally:
+        if os.path.exists(staging):
+            os.remove(staging)
+    return output_path
+
+def render_plot(job: PlotJob, output_path: str) -> str:
+    """
+    Renders one job to an image file and returns its path.
+    """
+    return _write_image(render_png(job), output_path)
+
+def _render_job(args) -> str:
+    """
+    Renders one (job, path) pair. Top-level so process pool workers can run it.
+    """
+    job, output_path = args
+    return render_plot(job, output_path)
+
+def _run_jobs(function, items: list, workers: int = None) -> list:
+    """
+    Applies function to every item, on a process pool when workers > 1 (default: all
+    cores) and there is more than one item, since matplotlib is not thread-safe.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(items) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(items))) as pool:
+            return list(pool.map(function, items))
+    return [function(item) for item in items]
+
+def read_plot_manifest(output_dir: str) -> dict:
+    """
+    Returns the manifest of a plot directory, or None if it has none:
+        {"format_version", "plots": [{"file", "name", "kind", "title"}, ...] of the latest run,
+         "entries": {file: {"name", "kind", "title", "last_used"}} of every cached image}
+    """
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), 'r') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return manifest if manifest.get("format_version") == RENDER_FORMAT_VERSION else None
+
+def _write_plot_manifest(output_dir: str, manifest: dict) -> None:
+    handle, staging = tempfile.mkstemp(suffix=".json", prefix=".manifest-", dir=output_dir)
+    with os.fdopen(handle, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(staging, os.path.join(output_dir, MANIFEST_FILE))
+
+def _evict_plots(output_dir: str, entries: dict, keep: set, max_entries: int) -> None:
+    """
+    Deletes the least recently used cached images beyond max_entries; the current run's
+    images are always kept.
+    """
+    evictable = sorted((file for file in entries if file not in keep), key=lambda file: entries[file]["last_used"])
+    for file in evictable[:max(len(entries) - max(max_entries, len(keep)), 0)]:
+        try:
+            os.remove(os.path.join(output_dir, file))
+        except FileNotFoundError:
+            pass
+        del entries[file]
+
+def _prepare_plot_dir(output_dir: str, jobs: list) -> list:
+    """
+    Creates output_dir if needed and returns the content-addressed path of every job.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        print(f"Created directory: {output_dir}")
+    return [os.path.join(output_dir, plot_file_name(job)) for job in jobs]
+
+def _record_plots(output_dir: str, jobs: list, paths: list, max_cached: int) -> None:
+    """
+    Lists this run's plots in the directory's manifest, in order, and evicts cached images
+    beyond max_cached, least recently used first.
+    """
+    manifest = read_plot_manifest(output_dir) or {"format_version": RENDER_FORMAT_VERSION, "entries": {}}
+    now = time.time()
+    current = []
+    for job, path in zip(jobs, paths):
+        entry = {"file": os.path.basename(path), "name": job.name, "kind": job.kind, "title": job.title}
+        current.append(entry)
+        manifest["entries"][entry["file"]] = {**{key: entry[key] for key in ("name", "kind", "title")},
+                                              "last_used": now}
+    manifest["plots"] = current
+    _evict_plots(output_dir, manifest["entries"], {entry["file"] for entry in current}, max_cached)
+    _write_plot_manifest(output_dir, manifest)
+
+def render_plots(jobs: list, output_dir: str = "visual plots", workers: int = None,
+                 max_cached: int = DEFAULT_MAX_CACHED_PLOTS) -> list:
+    """
+    Renders every job into output_dir as '<name>_<content hash>.png' and returns the
+    paths in job order.
+
+    Images are content-addressed (see plot_cache_key): a chart whose file already exists
+    is not rendered again. The remaining jobs run on a process pool when workers > 1
+    (default: all cores) and more than one job is left, since matplotlib is not
+    thread-safe. The directory's manifest then lists this run's plots in order, and
+    cached images beyond max_cached are evicted, least recently used first.
+    """
+    paths = _prepare_plot_dir(output_dir, jobs)
+    tasks = [(job, path) for job, path in zip(jobs, paths) if not os.path.exists(path)]
+    if len(tasks) < len(jobs):
+        print(f"Reusing {len(jobs) - len(tasks)} cached plot(s) in {output_dir}.")
+    _run_jobs(_render_job, tasks, workers)
+    _record_plots(output_dir, jobs, paths, max_cached)
+    return paths
+
+def render_plot_artifacts(jobs: list, output_dir: str = None, workers: int = None,
+                          max_cached: int = DEFAULT_MAX_CACHED_PLOTS) -> list:
+    """
+    Renders every job to an in-memory PNG and returns PlotArtifacts in job order, to be
+    handed straight to compile_report without a disk round trip.
+
+    Nothing touches the disk unless output_dir is given. Then the images are also
+    persisted as in render_plots: charts already cached there are read instead of
+    rendered, new ones are written from the rendered bytes, and the manifest is updated.
+    Workers return plain bytes; the buffers are created in the calling process.
+    """
+    paths = _prepare_plot_dir(output_dir, jobs) if output_dir else [None] * len(jobs)
+    images = [None] * len(jobs)
+    for index, path in enumerate(paths):
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                images[index] = f.read()
+    missing = [index for index, image in enumerate(images) if image is None]
+    if output_dir and len(missing) < len(jobs):
+        print(f"Reusing {len(jobs) - len(missing)} cached plot(s) in {output_dir}.")
+
+    for index, image in zip(missing, _run_jobs(render_png, [jobs[index] for index in missing], workers)):
+        images[index] = image
+        if paths[index]:
+            _write_image(image, paths[index])
+    if output_dir:
+        _record_plots(output_dir, jobs, paths, max_cached)
+
+    return [PlotArtifact(name=job.name, title=job.title, kind=job.kind, insight_key=job.name,
+                         image=io.BytesIO(image), path=path)
+            for job, image, path in zip(jobs, images, paths)]
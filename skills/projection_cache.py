@@ -0,0 +1,85 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+def content_hash(raw: bytes) -> str:
+    """
+    Returns the SHA-256 hex digest of raw file content.
+    """
+    return hashlib.sha256(raw).hexdigest()
+
+def file_content_hash(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Returns the SHA-256 hex digest of the file at file_path, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def copy_result(value):
+    """
+    Copies a result made of nested dicts and lists of plain values (the projections
+    layout). Much cheaper than copy.deepcopy, which tracks every object it visits.
+    """
+    if isinstance(value, dict):
+        return {key: copy_result(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_result(item) for item in value]
+    return value
+
+class LRUCache:
+    """
+    A small thread-safe LRU cache with hit/miss counters.
+    The least recently used entry is evicted once maxsize entries are stored.
+    """
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._entries), "maxsize": self.maxsize}
+
+# Process-wide cache of project_budget results, keyed by the input content hash and the
+# projection parameters. Entries are never handed out directly: every caller gets a copy.
+PROJECTION_CACHE = LRUCache(maxsize=32)
+
+def projection_cache_info() -> dict:
+    """
+    Returns hit/miss counters and the current size of the projection cache.
+    """
+    return PROJECTION_CACHE.info()
+
+def clear_projection_cache() -> None:
+    """
+    Drops every cached projection and resets the counters.
+    """
+    PROJECTION_CACHE.clear()
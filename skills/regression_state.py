@@ -0,0 +1,314 @@
+import heapq
+import json
+import math
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Optional
+from skills.fiscal_dataset import FiscalDataset, load_dataset
+from skills.trend_forecasting import INDICATOR_REGISTRY
+
+STATE_FORMAT_VERSION = 1
+STATE_SUFFIX = ".regression_state.json"
+
+def state_path(source_path: str) -> str:
+    """
+    Returns the regression state file that belongs to a source file (written next to it).
+    """
+    return source_path + STATE_SUFFIX
+
+@dataclass
+class RegressionState:
+    """
+    Sufficient statistics of a weighted least-squares line through one year/rate series.
+
+    Years are stored relative to 'origin' (the first year seen) for numerical stability.
+    Each observation carries weight decay ** (last_year - year), so decay=1.0 is an
+    ordinary fit and decay < 1 forgets old years exponentially. With a window of W years
+    only observations newer than last_year - W count. Appending, revising or removing a
+    year adjusts the sums in constant time; 'points' keeps the current values so a
+    revision can take the old value back out.
+
+    Attributes:
+        window: Number of most recent years kept, or None for the full history.
+        decay: Forgetting factor per year, in (0, 1].
+        origin: Year subtracted from every year before it enters the sums.
+        last_year: Latest year seen, or None for an empty state.
+        n, sum_x, sum_y, sum_xy, sum_xx: The weighted sums.
+        points: Current value of every year inside the window.
+    """
+    window: Optional[int] = None
+    decay: float = 1.0
+    origin: Optional[int] = None
+    last_year: Optional[int] = None
+    n: float = 0.0
+    sum_x: float = 0.0
+    sum_y: float = 0.0
+    sum_xy: float = 0.0
+    sum_xx: float = 0.0
+    points: dict = field(default_factory=dict)
+    _order: list = field(default_factory=list, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.window is not None and self.window < 1:
+            raise ValueError("window must be at least 1 year")
+        if not 0 < self.decay <= 1:
+            raise ValueError("decay must be in (0, 1]")
+        self._order = list(self.points)
+        heapq.heapify(self._order)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _weight(self, year: int) -> float:
+        return self.decay ** (self.last_year - year)
+
+    def _add(self, year: int, value: float, sign: float):
+        weight = sign * self._weight(year)
+        x = year - self.origin
+        self.n += weight
+        self.sum_x += weight * x
+        self.sum_y += weight * value
+        self.sum_xy += weight * x * value
+        self.sum_xx += weight * x * x
+
+    def _rescale(self, year: int):
+        """
+        Moves last_year to 'year', scaling the sums so every weight stays
+        decay ** (last_year - year).
+        """
+        if self.decay != 1.0:
+            scale = self.decay ** (year - self.last_year)
+            self.n *= scale
+            self.sum_x *= scale
+            self.sum_y *= scale
+            self.sum_xy *= scale
+            self.sum_xx *= scale
+        self.last_year = year
+
+    def _advance(self, year: int):
+        """
+        Moves last_year forward: scales the sums by the forgetting factor and drops years
+        that fell out of the window. Each year is dropped once, so this is amortized O(1).
+        """
+        self._rescale(year)
+        while self._order and not self.in_window(self._order[0]):
+            old_year = heapq.heappop(self._order)
+            if old_year in self.points:
+                self._add(old_year, self.points.pop(old_year), -1.0)
+
+    def in_window(self, year: int) -> bool:
+        return self.window is None or self.last_year is None or year > self.last_year - self.window
+
+    def update(self, year: int, value: float) -> bool:
+        """
+        Appends a new year or revises an existing one. Years older than the window are
+        ignored. Returns True if the state changed.
+        """
+        year, value = int(year), float(value)
+        if self.last_year is None:
+            self.origin = self.last_year = year
+        elif year > self.last_year:
+            self._advance(year)
+        if not self.in_window(year):
+            return False
+        if year in self.points:
+            if self.points[year] == value:
+                return False
+            self._add(year, self.points[year], -1.0)
+        else:
+            heapq.heappush(self._order, year)
+        self.points[year] = value
+        self._add(year, value, 1.0)
+        return True
+
+    def remove(self, year: int) -> bool:
+        """
+        Takes a year out of the fit. Returns True if it was present.
+
+        Removing the latest year moves last_year back to the latest remaining one and
+        scales the decayed sums up to match. Years that already fell out of the window are
+        not restored; rebuild the state from the series (from_series) when they matter.
+        """
+        if year not in self.points:
+            return False
+        self._add(year, self.points.pop(year), -1.0)
+        if not self.points:
+            self.origin = self.last_year = None
+            self.n = self.sum_x = self.sum_y = self.sum_xy = self.sum_xx = 0.0
+            self._order = []
+        elif year == self.last_year:
+            self._rescale(max(self.points))
+        return True
+
+    def refit(self):
+        """
+        Recomputes the sums from 'points', discarding any floating-point drift that
+        many revisions may have accumulated.
+        """
+        self.n = self.sum_x = self.sum_y = self.sum_xy = self.sum_xx = 0.0
+        for year, value in self.points.items():
+            self._add(year, value, 1.0)
+
+    def coefficients(self):
+        """
+        Returns (slope, intercept at 'origin'), or None when fewer than two distinct
+        years are in the fit.
+        """
+        if len(self.points) < 2:
+            return None
+        denominator = self.n * self.sum_xx - self.sum_x ** 2
+        if denominator <= 1e-12 * self.n * self.sum_xx:
+            return None
+        slope = (self.n * self.sum_xy - self.sum_x * self.sum_y) / denominator
+        return slope, (self.sum_y - slope * self.sum_x) / self.n
+
+    def forecast(self, horizon: int = 1):
+        """
+        Returns (method, years, values) for the 'horizon' years after last_year, with the
+        same fallbacks as trend_forecasting.forecast_batch: "linear" for a fitted trend,
+        "mean" for a single year and "none" (NaN values) for an empty state.
+        The projection entries built from it follow project_budget instead and are empty
+        for fewer than two years.
+        """
+        if not self.points:
+            return "none", [], [math.nan] * horizon
+        years = [self.last_year + step for step in range(1, horizon + 1)]
+        fit = self.coefficients()
+        if fit is None:
+            return "mean", years, [self.sum_y / self.n] * horizon
+        slope, intercept = fit
+        return "linear", years, [intercept + slope * (year - self.origin) for year in years]
+
+    def to_dict(self) -> dict:
+        return {"window": self.window, "decay": self.decay, "origin": self.origin, "last_year": self.last_year,
+                "sums": [self.n, self.sum_x, self.sum_y, self.sum_xy, self.sum_xx],
+                "points": [[year, value] for year, value in sorted(self.points.items())]}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "RegressionState":
+        n, sum_x, sum_y, sum_xy, sum_xx = state["sums"]
+        return cls(window=state["window"], decay=state["decay"], origin=state["origin"],
+                   last_year=state["last_year"], n=n, sum_x=sum_x, sum_y=sum_y, sum_xy=sum_xy, sum_xx=sum_xx,
+                   points={int(year): float(value) for year, value in state["points"]})
+
+    @classmethod
+    def from_series(cls, years, rates, window: int = None, decay: float = 1.0) -> "RegressionState":
+        """
+        Builds a state by feeding a series in year order.
+        """
+        state = cls(window=window, decay=decay)
+        for year, rate in sorted(zip(years, rates)):
+            state.update(year, rate)
+        return state
+
+def load_regression_states(source_path: str, window: int = None, decay: float = 1.0) -> dict:
+    """
+    Reads the saved states of a source file as {section: RegressionState}. Returns an
+    empty dict when nothing was saved or the saved window/decay settings differ.
+    """
+    try:
+        with open(state_path(source_path), 'r') as f:
+            saved = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if saved.get("format_version") != STATE_FORMAT_VERSION:
+        return {}
+    states = {section: RegressionState.from_dict(state) for section, state in saved.get("sections", {}).items()}
+    if any(state.window != window or state.decay != decay for state in states.values()):
+        return {}
+    return states
+
+def save_regression_states(source_path: str, states: dict):
+    try:
+        with open(state_path(source_path), 'w') as f:
+            json.dump({"format_version": STATE_FORMAT_VERSION,
+                       "sections": {section: state.to_dict() for section, state in states.items()}}, f)
+    except OSError as e:
+        print(f"Warning: Could not save regression state for {source_path}: {e}")
+
+def _projection_entry(state: RegressionState, horizon: int) -> dict:
+    # Like project_budget, a series needs two years before it is projected
+    if len(state) < 2:
+        return {}
+    method, years, values = state.forecast(horizon)
+    entry = {"year": str(years[0]), "rate": round(values[0], 2)}
+    if horizon > 1:
+        entry["forecast"] = [{"year": str(year), "rate": round(value, 2)} for year, value in zip(years, values)]
+    return entry
+
+def push_observation(source_path: str, section: str, year: int, rate: float, window: int = None,
+                     decay: float = 1.0, horizon: int = 1) -> dict:
+    """
+    Records one new or revised year of an indicator in the saved state of source_path
+    and returns its updated forecast entry ({"year", "rate"}, plus "forecast" when
+    horizon > 1) without touching the rest of the history.
+    """
+    states = load_regression_states(source_path, window, decay)
+    state = states.setdefault(section, RegressionState(window=window, decay=decay))
+    if state.update(year, rate):
+        save_regression_states(source_path, states)
+    return _projection_entry(state, horizon)
+
+def _series_changes(state: RegressionState, years: np.ndarray, rates: np.ndarray):
+    """
+    Compares a year/rate series with a state in bulk. Returns (years in the state but not
+    in the series, [(year, rate)] of new or revised years in year order). A year listed
+    twice in the series keeps its last rate.
+    """
+    years = np.asarray(years, dtype=np.int64)
+    rates = np.asarray(rates, dtype=np.float64)
+    order = np.argsort(years, kind="stable")
+    years, rates = years[order], rates[order]
+    last = np.append(years[1:] != years[:-1], True)
+    years, rates = years[last], rates[last]
+
+    known = np.fromiter(sorted(state.points), dtype=np.int64, count=len(state.points))
+    values = np.array([state.points[year] for year in known.tolist()], dtype=np.float64)
+    removed = known[~np.isin(known, years)].tolist()
+    index = np.minimum(np.searchsorted(known, years), max(len(known) - 1, 0))
+    same = (known[index] == years) & (values[index] == rates) if len(known) else np.zeros(len(years), dtype=bool)
+    return removed, list(zip(years[~same].tolist(), rates[~same].tolist()))
+
+def rolling_indicator_projections(file_path: str = "input_data.json", dataset: FiscalDataset = None,
+                                  horizon: int = 1, window: int = None, decay: float = 1.0) -> dict:
+    """
+    Forecasts every registered indicator from its saved regression state, bringing the
+    state up to date with the data first: the series is compared with the state in bulk
+    and only years that were added, revised or deleted since the last call are pushed.
+    With window=None and decay=1.0 the result matches project_budget's linear forecasts,
+    including the empty entry for series with fewer than two years.
+
+    Returns {projection_key: {"year", "rate"}} (plus "forecast" when horizon > 1), the
+    same shape as project_budget's indicator entries.
+    """
+    if dataset is None:
+        dataset = load_dataset(file_path)
+        if dataset is None:
+            return {}
+
+    states = load_regression_states(dataset.source_path, window, decay)
+    projections, changed = {}, 0
+    for spec in INDICATOR_REGISTRY.values():
+        if dataset.section_length(spec.section) is None:
+            if spec.always_project:
+                projections[spec.projection_key] = {}
+            continue
+        series = dataset.indicator_series(spec.section)
+        state = states.setdefault(spec.section, RegressionState(window=window, decay=decay))
+        removed, pushed = _series_changes(state, series.years, series.rates)
+        if window is not None and state.last_year in removed:
+            # Moving the window back would need years the state already dropped
+            states[spec.section] = state = RegressionState.from_series(series.years.tolist(), series.rates.tolist(),
+                                                                       window=window, decay=decay)
+            changed += len(removed) + len(pushed)
+        else:
+            for year in removed:
+                changed += state.remove(year)
+            for year, rate in pushed:
+                changed += state.update(year, rate)
+        projections[spec.projection_key] = _projection_entry(state, horizon)
+
+    print(f"Rolling indicator projections for {dataset.source_path}: {changed} year(s) updated.")
+    if changed:
+        save_regression_states(dataset.source_path, states)
+    return projections
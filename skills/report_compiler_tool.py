@@ -1,5 +1,7 @@
 from fpdf import FPDF
 import os
+from skills.category_hierarchy import rollup_items
+from skills.plot_rendering import read_plot_manifest
 
 class PDF(FPDF):
     def header(self):
@@ -18,7 +20,7 @@ class PDF(FPDF):
         self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
 
 def compile_report(projections: dict, risk_level: str, tax_slabs: list, visual_plots_dir: str = "visual plots", 
-                  output_pdf: str = "report.pdf", insights: dict = None):
+                  output_pdf: str = "report.pdf", insights: dict = None, plots: list = None, level: int = None):
     """
     Compile all data into a final PDF report with insights
     
@@ -26,7 +28,7 @@ def compile_report(projections: dict, risk_level: str, tax_slabs: list, visual_p
         projections: Dictionary containing budget projections data
         risk_level: Overall risk assessment level
         tax_slabs: List of tax brackets and rates
-        visual_plots_dir: Directory containing visualization plots
+        visual_plots_dir: Directory containing visualization plots, used when no plots are given
         output_pdf: Output PDF filename
         insights: Dictionary containing insight paragraphs for each section
             Expected format: {
@@ -39,7 +41,19 @@ def compile_report(projections: dict, risk_level: str, tax_slabs: list, visual_p
                     "plot_name": "Insight text for specific visual..."
                 }
             }
+        plots: Rendered PlotArtifacts (see plot_rendering.render_plot_artifacts) embedded
+            straight from memory; when given, visual_plots_dir is not read
+        level: Category roll-up level of the revenue and expenditure tables; line items
+            are summed up to that level of their paths (see category_hierarchy.rollup_items)
     """
+    revenue_items = projections.get("projected_revenue", [])
+    expenditure_items = projections.get("projected_expenditure", [])
+    level_note = ""
+    if level is not None:
+        revenue_items = rollup_items(revenue_items, level)
+        expenditure_items = rollup_items(expenditure_items, level)
+        level_note = f" (category level {level})"
+
     # Default insights if none provided
     if insights is None:
         insights = {
@@ -64,10 +78,10 @@ def compile_report(projections: dict, risk_level: str, tax_slabs: list, visual_p
     # Revenue Table
     pdf.set_font("Arial", 'B', 12)
     pdf.set_text_color(0)
-    pdf.cell(0, 10, "Projected Revenues", ln=1)
+    pdf.cell(0, 10, f"Projected Revenues{level_note}", ln=1)
     pdf.set_font("Arial", size=11)
     with pdf.table() as table:
-        for rev in projections.get("projected_revenue", []):
+        for rev in revenue_items:
             row = table.row()
             row.cell(rev.get("name", "Unknown"))
             row.cell(f"${rev.get('projected_amount', 0):,.2f}")
@@ -83,10 +97,10 @@ def compile_report(projections: dict, risk_level: str, tax_slabs: list, visual_p
     pdf.ln(8)
     pdf.set_font("Arial", 'B', 12)
     pdf.set_text_color(0)
-    pdf.cell(0, 10, "Projected Expenditures", ln=1)
+    pdf.cell(0, 10, f"Projected Expenditures{level_note}", ln=1)
     pdf.set_font("Arial", size=11)
     with pdf.table() as table:
-        for exp in projections.get("projected_expenditure", []):
+        for exp in expenditure_items:
             row = table.row()
             row.cell(exp.get("name", "Unknown"))
             row.cell(f"${exp.get('projected_amount', 0):,.2f}")
@@ -157,21 +171,36 @@ def compile_report(projections: dict, risk_level: str, tax_slabs: list, visual_p
         pdf.multi_cell(0, 6, insights["tax"])
     
     # Section 4: Visual Plots
-    if os.path.exists(visual_plots_dir):
-        for image_file in sorted(os.listdir(visual_plots_dir)):
-            if image_file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                pdf.add_page()
-                pdf.set_font("Arial", 'B', 12)
-                pdf.cell(0, 10, f"Visual Analysis: {image_file.split('.')[0]}", ln=1)
-                pdf.image(os.path.join(visual_plots_dir, image_file), x=20, w=pdf.w - 40, keep_aspect_ratio=True)
-                
-                # Visual-specific insights
-                image_name = image_file.split('.')[0]
-                if "visual" in insights and image_name in insights["visual"]:
-                    pdf.ln(5)
-                    pdf.set_font("Arial", 'I', 11)
-                    pdf.set_text_color(50, 50, 50)
-                    pdf.multi_cell(0, 6, insights["visual"][image_name])
+    # In-memory artifacts are used as is; otherwise a plot manifest lists exactly the
+    # current run's charts, and without one every image in the directory is used
+    if plots is not None:
+        images = [(plot.image, plot.name, plot.insight_key) for plot in plots]
+    else:
+        manifest = read_plot_manifest(visual_plots_dir)
+        if manifest is not None:
+            files = [(plot["file"], plot["name"]) for plot in manifest.get("plots", [])]
+        elif os.path.exists(visual_plots_dir):
+            files = [(image_file, image_file.split('.')[0]) for image_file in sorted(os.listdir(visual_plots_dir))
+                     if image_file.lower().endswith(('.png', '.jpg', '.jpeg'))]
+        else:
+            files = []
+        images = [(os.path.join(visual_plots_dir, image_file), image_name, image_name)
+                  for image_file, image_name in files]
+    if images:
+        for image, image_name, insight_key in images:
+            if hasattr(image, 'seek'):
+                image.seek(0)
+            pdf.add_page()
+            pdf.set_font("Arial", 'B', 12)
+            pdf.cell(0, 10, f"Visual Analysis: {image_name}", ln=1)
+            pdf.image(image, x=20, w=pdf.w - 40, keep_aspect_ratio=True)
+            
+            # Visual-specific insights
+            if "visual" in insights and insight_key in insights["visual"]:
+                pdf.ln(5)
+                pdf.set_font("Arial", 'I', 11)
+                pdf.set_text_color(50, 50, 50)
+                pdf.multi_cell(0, 6, insights["visual"][insight_key])
     else:
         pdf.add_page()
         pdf.cell(0, 10, "No visual plots found.", ln=1)
@@ -1,4 +1,95 @@
-def risk_identification(projections: dict) -> str:
+import numpy as np
+from skills.category_hierarchy import rollup_items
+from skills.fiscal_dataset import column_total
+
+RISK_RANKINGS = ("low", "medium", "high")
+
+# Factor thresholds of risk_identification; every value may also be an array broadcasting
+# against the inputs of score_risk_batch (e.g. for sensitivity sweeps).
+DEFAULT_RISK_THRESHOLDS = {
+    "deficit_high": 0.1,     # deficit ratio above this -> high deficit risk
+    "deficit_medium": 0.0,   # deficit ratio above this -> medium deficit risk
+    "inflation_high": 4.0,   # inflation above this -> high inflation risk
+    "inflation_medium": 3.0, # inflation at or above this -> medium inflation risk
+    "gdp_high": 2.5,         # GDP growth below this -> high GDP risk
+    "gdp_medium": 3.0,       # GDP growth below this -> medium GDP risk
+    "score_medium": 0.3,     # risk score at or above this -> "medium"
+    "score_high": 0.6,       # risk score at or above this -> "high"
+}
+
+# Weights of the deficit, inflation and GDP growth factors
+DEFAULT_RISK_WEIGHTS = (0.4, 0.3, 0.3)
+
+def deficit_ratios(total_revenue, total_expenditure) -> np.ndarray:
+    """
+    Returns (expenditure - revenue) / revenue elementwise, or 1 where revenue is zero.
+    """
+    total_revenue = np.asarray(total_revenue, dtype=np.float64)
+    total_expenditure = np.asarray(total_expenditure, dtype=np.float64)
+    shape = np.broadcast_shapes(total_revenue.shape, total_expenditure.shape)
+    return np.divide(total_expenditure - total_revenue, total_revenue,
+                     out=np.ones(shape), where=total_revenue != 0)
+
+def score_risk_batch(inflation_rate, gdp_growth_rate, total_revenue=None, total_expenditure=None,
+                     deficit_ratio=None, thresholds: dict = None, weights=DEFAULT_RISK_WEIGHTS) -> dict:
+    """
+    Scores any number of scenarios at once with the risk_identification rules.
+
+    Pass either deficit_ratio or total_revenue and total_expenditure. All inputs,
+    thresholds and weights broadcast against each other, so one call can cover a stack
+    of scenarios or a whole parameter grid. thresholds only needs the keys that differ
+    from DEFAULT_RISK_THRESHOLDS.
+
+    Returns a dict of arrays: "deficit_ratio", "deficit_risk", "inflation_risk",
+    "gdp_risk", "risk_score", "ranking_code" (index into RISK_RANKINGS) and "ranking".
+    """
+    limits = {**DEFAULT_RISK_THRESHOLDS, **(thresholds or {})}
+    if deficit_ratio is None:
+        deficit_ratio = deficit_ratios(total_revenue, total_expenditure)
+    deficit_ratio = np.asarray(deficit_ratio, dtype=np.float64)
+    inflation_rate = np.asarray(inflation_rate, dtype=np.float64)
+    gdp_growth_rate = np.asarray(gdp_growth_rate, dtype=np.float64)
+
+    deficit_risk = np.where(deficit_ratio > limits["deficit_high"], 1.0,
+                            np.where(deficit_ratio > limits["deficit_medium"], 0.5, 0.0))
+    inflation_risk = np.where(inflation_rate > limits["inflation_high"], 1.0,
+                              np.where(inflation_rate >= limits["inflation_medium"], 0.5, 0.0))
+    gdp_risk = np.where(gdp_growth_rate < limits["gdp_high"], 1.0,
+                        np.where(gdp_growth_rate < limits["gdp_medium"], 0.5, 0.0))
+
+    deficit_weight, inflation_weight, gdp_weight = (np.asarray(weight, dtype=np.float64) for weight in weights)
+    risk_score = deficit_weight * deficit_risk + inflation_weight * inflation_risk + gdp_weight * gdp_risk
+    ranking_code = np.where(risk_score < limits["score_medium"], 0,
+                            np.where(risk_score < limits["score_high"], 1, 2)).astype(np.int8)
+    return {
+        "deficit_ratio": deficit_ratio,
+        "deficit_risk": deficit_risk,
+        "inflation_risk": inflation_risk,
+        "gdp_risk": gdp_risk,
+        "risk_score": risk_score,
+        "ranking_code": ranking_code,
+        "ranking": np.array(RISK_RANKINGS)[ranking_code],
+    }
+
+def score_projections_batch(projections_list: list, thresholds: dict = None, weights=DEFAULT_RISK_WEIGHTS) -> dict:
+    """
+    Scores a stack of projection dictionaries (as returned by project_budget) in one call.
+    Scenarios missing revenue or expenditure projections get ranking "unknown".
+    """
+    total_revenue = np.array([column_total(p.get("projected_revenue", []), "projected_amount") for p in projections_list])
+    total_expenditure = np.array([column_total(p.get("projected_expenditure", []), "projected_amount")
+                                  for p in projections_list])
+    inflation = np.array([p.get("projected_inflation", {}).get("rate", 0) for p in projections_list], dtype=np.float64)
+    gdp_growth = np.array([p.get("projected_gdp_growth", {}).get("rate", 0) for p in projections_list], dtype=np.float64)
+
+    scores = score_risk_batch(inflation, gdp_growth, total_revenue, total_expenditure,
+                              thresholds=thresholds, weights=weights)
+    complete = np.array([bool(p.get("projected_revenue")) and bool(p.get("projected_expenditure"))
+                         for p in projections_list], dtype=bool)
+    scores["ranking"] = np.where(complete, scores["ranking"], "unknown")
+    return scores
+
+def risk_identification(projections: dict, level: int = None) -> str:
     """
     Computes a risk ranking ("low", "medium", or "high") based on projected values.
     The projections dictionary is expected to contain:
@@ -29,6 +120,12 @@ def risk_identification(projections: dict) -> str:
       - 0.3 <= risk_score < 0.6 -> "medium"
       - risk_score >= 0.6 -> "high"
     
+    The scoring itself is done by score_risk_batch, which applies the same rules to arrays.
+    
+    With a roll-up level, revenue and expenditure line items are first summed up to that
+    level of their category paths (category_hierarchy.rollup_items) and the projected
+    subtotal of every category is listed; the ranking itself uses the section totals.
+    
     Returns the overall risk ranking as a string.
     """
     
@@ -39,65 +136,30 @@ def risk_identification(projections: dict) -> str:
         print("Error: Missing revenue or expenditure projections.")
         return "unknown"
     
-    total_revenue = sum(item.get("projected_amount", 0) for item in revenue_items)
-    total_expenditure = sum(item.get("projected_amount", 0) for item in expenditure_items)
+    if level is not None:
+        revenue_items = rollup_items(revenue_items, level)
+        expenditure_items = rollup_items(expenditure_items, level)
+        for title, items in (("Revenue", revenue_items), ("Expenditure", expenditure_items)):
+            subtotals = ", ".join(f"{item.get('name', 'Unknown')}: {item.get('projected_amount', 0):.2f}"
+                                  for item in items)
+            print(f"Projected {title} at level {level}: {subtotals}")
+
+    total_revenue = column_total(revenue_items, "projected_amount")
+    total_expenditure = column_total(expenditure_items, "projected_amount")
     
     print(f"Total Projected Revenue: {total_revenue}")
     print(f"Total Projected Expenditure: {total_expenditure}")
     
-    # Calculate deficit ratio (if revenue is zero, set risk to high)
-    if total_revenue == 0:
-        deficit_ratio = 1
-    else:
-        deficit_ratio = (total_expenditure - total_revenue) / total_revenue
-    
-    # Define deficit risk factor
-    if deficit_ratio > 0.1:
-        deficit_risk = 1
-    elif deficit_ratio > 0:
-        deficit_risk = 0.5
-    else:
-        deficit_risk = 0
-    
-    print(f"Deficit Ratio: {deficit_ratio:.2f} (Risk Factor: {deficit_risk})")
-    
-    # 2. Inflation Risk Factor
-    projected_inflation = projections.get("projected_inflation", {})
-    inflation_rate = projected_inflation.get("rate", 0)
-    
-    if inflation_rate > 4:
-        inflation_risk = 1
-    elif inflation_rate >= 3:
-        inflation_risk = 0.5
-    else:
-        inflation_risk = 0
-    
-    print(f"Projected Inflation Rate: {inflation_rate} (Risk Factor: {inflation_risk})")
-    
-    # 3. GDP Growth Risk Factor
-    projected_gdp = projections.get("projected_gdp_growth", {})
-    gdp_growth_rate = projected_gdp.get("rate", 0)
-    
-    if gdp_growth_rate < 2.5:
-        gdp_risk = 1
-    elif gdp_growth_rate < 3:
-        gdp_risk = 0.5
-    else:
-        gdp_risk = 0
-    
-    print(f"Projected GDP Growth Rate: {gdp_growth_rate} (Risk Factor: {gdp_risk})")
-    
-    # 4. Compute overall risk score using weighted average
-    risk_score = 0.4 * deficit_risk + 0.3 * inflation_risk + 0.3 * gdp_risk
-    print(f"Overall Risk Score: {risk_score:.2f}")
+    # 2. Score all factors with the batch scorer
+    inflation_rate = projections.get("projected_inflation", {}).get("rate", 0)
+    gdp_growth_rate = projections.get("projected_gdp_growth", {}).get("rate", 0)
+    scores = score_risk_batch(inflation_rate, gdp_growth_rate, total_revenue, total_expenditure)
     
-    # 5. Determine overall risk ranking based on risk score
-    if risk_score < 0.3:
-        overall_risk = "low"
-    elif risk_score < 0.6:
-        overall_risk = "medium"
-    else:
-        overall_risk = "high"
+    print(f"Deficit Ratio: {scores['deficit_ratio']:.2f} (Risk Factor: {scores['deficit_risk']:g})")
+    print(f"Projected Inflation Rate: {inflation_rate} (Risk Factor: {scores['inflation_risk']:g})")
+    print(f"Projected GDP Growth Rate: {gdp_growth_rate} (Risk Factor: {scores['gdp_risk']:g})")
+    print(f"Overall Risk Score: {scores['risk_score']:.2f}")
     
+    overall_risk = str(scores["ranking"])
     print(f"Overall Risk Ranking: {overall_risk.upper()}")
-    return overall_risk
\ No newline at end of file
+    return overall_risk
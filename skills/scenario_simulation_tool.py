@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from skills.budget_projection_tool import project_budget
+from skills.fiscal_dataset import FiscalDataset, load_dataset
+from skills.risk_identification_tool import RISK_RANKINGS, deficit_ratios, score_risk_batch
+
+# Order of the shocked variables in every vector and matrix below
+SHOCK_VARIABLES = ("revenue_growth", "expenditure_growth", "inflation", "gdp_growth")
+
+# Standard deviation of each shock: growth rates as fractions, inflation/GDP in percentage points
+DEFAULT_SHOCK_STD = (0.02, 0.015, 0.5, 0.7)
+
+# Revenue moves with GDP, spending with inflation, and inflation weakly against GDP
+DEFAULT_SHOCK_CORRELATION = (
+    (1.0, 0.2, 0.1, 0.6),
+    (0.2, 1.0, 0.3, -0.1),
+    (0.1, 0.3, 1.0, -0.2),
+    (0.6, -0.1, -0.2, 1.0),
+)
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+def _simulate_batch(args) -> dict:
+    """
+    Draws and evaluates one batch of scenarios. Top-level so process pool workers can run it.
+    """
+    seed, size, base, covariance = args
+    rng = np.random.default_rng(seed)
+    shocks = rng.multivariate_normal(np.zeros(len(SHOCK_VARIABLES)), covariance, size=size, method="cholesky")
+
+    revenue_growth = base["revenue_growth"] + shocks[:, 0]
+    expenditure_growth = base["expenditure_growth"] + shocks[:, 1]
+    inflation = base["inflation"] + shocks[:, 2]
+    gdp_growth = base["gdp_growth"] + shocks[:, 3]
+
+    total_revenue = base["total_revenue"] * (1 + revenue_growth)
+    total_expenditure = base["total_expenditure"] * (1 + expenditure_growth)
+    deficit_ratio = deficit_ratios(total_revenue, total_expenditure)
+    scores = score_risk_batch(inflation, gdp_growth, deficit_ratio=deficit_ratio)
+    return {
+        "revenue_growth": revenue_growth,
+        "expenditure_growth": expenditure_growth,
+        "inflation": inflation,
+        "gdp_growth": gdp_growth,
+        "deficit_ratio": deficit_ratio,
+        "risk_score": scores["risk_score"],
+        "ranking": scores["ranking_code"],
+    }
+
+def shock_covariance(std=DEFAULT_SHOCK_STD, correlation=DEFAULT_SHOCK_CORRELATION) -> np.ndarray:
+    """
+    Builds the covariance matrix of the shocks from standard deviations and a correlation matrix.
+    """
+    std = np.asarray(std, dtype=np.float64)
+    return np.asarray(correlation, dtype=np.float64) * np.outer(std, std)
+
+def simulate_scenarios(file_path: str = "input_data.json", n_scenarios: int = 100_000, seed: int = 0,
+                       batch_size: int = 25_000, workers: int = None, revenue_growth_rate: float = 0.05,
+                       expenditure_growth_rate: float = 0.03, shock_std=DEFAULT_SHOCK_STD,
+                       shock_correlation=DEFAULT_SHOCK_CORRELATION, percentiles=DEFAULT_PERCENTILES,
+                       dataset: FiscalDataset = None) -> dict:
+    """
+    Runs a Monte Carlo simulation around the budget projection.
+
+    Each scenario draws correlated shocks to revenue growth, expenditure growth, projected
+    inflation and projected GDP growth (see SHOCK_VARIABLES), then evaluates the deficit
+    ratio and the risk_identification score for all scenarios of a batch at once.
+
+    Batches of batch_size scenarios get their own seed spawned from 'seed', so results
+    are identical for any number of workers. With workers > 1 (default: all cores) the
+    batches run in a process pool.
+
+    Returns percentiles of every simulated variable, the deficit ratio and the risk score,
+    the probability of each risk ranking and the base values used.
+    Raises ValueError unless n_scenarios and batch_size are positive.
+    """
+    if n_scenarios < 1:
+        raise ValueError(f"n_scenarios must be at least 1, got {n_scenarios}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    if dataset is None:
+        dataset = load_dataset(file_path)
+        if dataset is None:
+            return {}
+
+    projections = project_budget(revenue_growth_rate=revenue_growth_rate,
+                                 expenditure_growth_rate=expenditure_growth_rate, dataset=dataset)
+    base = {
+        "total_revenue": dataset.category_columns("revenue").total(),
+        "total_expenditure": dataset.category_columns("expenditure").total(),
+        "revenue_growth": revenue_growth_rate,
+        "expenditure_growth": expenditure_growth_rate,
+        "inflation": float(projections.get("projected_inflation", {}).get("rate", 0)),
+        "gdp_growth": float(projections.get("projected_gdp_growth", {}).get("rate", 0)),
+    }
+    covariance = shock_covariance(shock_std, shock_correlation)
+
+    sizes = [batch_size] * (n_scenarios // batch_size)
+    if n_scenarios % batch_size:
+        sizes.append(n_scenarios % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(batch_seed, size, base, covariance) for batch_seed, size in zip(seeds, sizes)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            batches = list(pool.map(_simulate_batch, jobs))
+    else:
+        batches = [_simulate_batch(job) for job in jobs]
+
+    results = {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+    ranking_counts = np.bincount(results.pop("ranking"), minlength=len(RISK_RANKINGS))
+
+    summary = {
+        "scenarios": n_scenarios,
+        "seed": seed,
+        "base": base,
+        "percentiles": {
+            key: {f"p{q}": float(value) for q, value in zip(percentiles, np.percentile(values, percentiles))}
+            for key, values in results.items()
+        },
+        "risk_ranking_probabilities": {
+            ranking: float(count) / n_scenarios for ranking, count in zip(RISK_RANKINGS, ranking_counts)
+        },
+    }
+    print(f"Simulated {n_scenarios} scenarios. Risk ranking probabilities: {summary['risk_ranking_probabilities']}")
+    return summary
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(simulate_scenarios(), indent=2))
@@ -0,0 +1,164 @@
+import csv
+import os
+import numpy as np
+from skills.budget_projection_tool import project_budget
+from skills.fiscal_dataset import FiscalDataset, load_dataset
+from skills.plot_rendering import PlotJob, render_plot
+from skills.risk_identification_tool import (DEFAULT_RISK_THRESHOLDS, DEFAULT_RISK_WEIGHTS, RISK_RANKINGS,
+                                             deficit_ratios, score_risk_batch)
+
+# Columns of the result table besides the swept parameters
+RESULT_COLUMNS = ("total_revenue", "total_expenditure", "deficit_ratio", "risk_score", "ranking")
+
+def sweep_axes(revenue_growth=(0.05,), expenditure_growth=(0.03,), thresholds: dict = None, weights=None) -> list:
+    """
+    Returns the grid axes as [(name, values)]: the two growth rates, one axis per swept
+    threshold key, and a "weights" axis of (deficit, inflation, GDP) weight triples.
+    """
+    axes = [("revenue_growth", np.asarray(revenue_growth, dtype=np.float64)),
+            ("expenditure_growth", np.asarray(expenditure_growth, dtype=np.float64))]
+    for key, values in (thresholds or {}).items():
+        if key not in DEFAULT_RISK_THRESHOLDS:
+            raise ValueError(f"Unknown risk threshold '{key}'. Expected one of {tuple(DEFAULT_RISK_THRESHOLDS)}.")
+        axes.append((key, np.atleast_1d(np.asarray(values, dtype=np.float64))))
+    weights = np.asarray(weights if weights is not None else [DEFAULT_RISK_WEIGHTS], dtype=np.float64)
+    if weights.ndim != 2 or weights.shape[1] != 3:
+        raise ValueError("weights must be a list of (deficit, inflation, GDP) weight triples")
+    axes.append(("weights", weights))
+    return axes
+
+def sweep_parameters(file_path: str = "input_data.json", revenue_growth=(0.05,), expenditure_growth=(0.03,),
+                     thresholds: dict = None, weights=None, horizon: int = 1, chunk_size: int = 250_000,
+                     dataset: FiscalDataset = None) -> dict:
+    """
+    Evaluates the deficit ratio and risk ranking over the full Cartesian grid of growth
+    rates, risk thresholds and factor weights.
+
+    revenue_growth and expenditure_growth are lists of uniform growth rates, thresholds
+    maps DEFAULT_RISK_THRESHOLDS keys to lists of values to try (other keys keep their
+    defaults) and weights is a list of (deficit, inflation, GDP) weight triples. Totals
+    are compounded over 'horizon' years; projected inflation and GDP growth come from
+    project_budget and do not depend on the swept parameters.
+
+    The grid is evaluated chunk_size points at a time with score_risk_batch, so memory
+    for the intermediate arrays stays bounded however large the grid is.
+
+    Returns a tidy table as a dict of equal-length column arrays: one column per swept
+    parameter (weights as "deficit_weight", "inflation_weight", "gdp_weight") followed by
+    RESULT_COLUMNS, plus "shape": the grid shape in axis order.
+    """
+    if dataset is None:
+        dataset = load_dataset(file_path)
+        if dataset is None:
+            return {}
+
+    projections = project_budget(dataset=dataset)
+    base_revenue = dataset.category_columns("revenue").total()
+    base_expenditure = dataset.category_columns("expenditure").total()
+    inflation = float(projections.get("projected_inflation", {}).get("rate", 0))
+    gdp_growth = float(projections.get("projected_gdp_growth", {}).get("rate", 0))
+
+    axes = sweep_axes(revenue_growth, expenditure_growth, thresholds, weights)
+    shape = tuple(len(values) for _, values in axes)
+    size = int(np.prod(shape))
+    columns = {name: np.empty(size) for name, _ in axes[:-1]}
+    columns.update({name: np.empty(size) for name in ("deficit_weight", "inflation_weight", "gdp_weight")})
+    columns.update({name: np.empty(size) for name in RESULT_COLUMNS[:-1]})
+    ranking_codes = np.empty(size, dtype=np.int8)
+
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        indices = np.unravel_index(np.arange(start, stop), shape)
+        point = {name: values[index] for (name, values), index in zip(axes, indices)}
+
+        total_revenue = base_revenue * (1 + point["revenue_growth"]) ** horizon
+        total_expenditure = base_expenditure * (1 + point["expenditure_growth"]) ** horizon
+        swept = {key: point[key] for key in (thresholds or {})}
+        scores = score_risk_batch(inflation, gdp_growth, deficit_ratio=deficit_ratios(total_revenue, total_expenditure),
+                                  thresholds=swept, weights=tuple(point["weights"].T))
+
+        for name, _ in axes[:-1]:
+            columns[name][start:stop] = point[name]
+        columns["deficit_weight"][start:stop], columns["inflation_weight"][start:stop], \
+            columns["gdp_weight"][start:stop] = point["weights"].T
+        columns["total_revenue"][start:stop] = total_revenue
+        columns["total_expenditure"][start:stop] = total_expenditure
+        columns["deficit_ratio"][start:stop] = scores["deficit_ratio"]
+        columns["risk_score"][start:stop] = scores["risk_score"]
+        ranking_codes[start:stop] = scores["ranking_code"]
+
+    columns["ranking"] = np.array(RISK_RANKINGS)[ranking_codes]
+    counts = np.bincount(ranking_codes, minlength=len(RISK_RANKINGS))
+    print(f"Evaluated {size} parameter combinations: " +
+          ", ".join(f"{ranking} {count}" for ranking, count in zip(RISK_RANKINGS, counts.tolist())) + ".")
+    return {**columns, "shape": shape}
+
+def write_sweep_csv(table: dict, output_path: str) -> None:
+    """
+    Writes the sweep table to a CSV file, one row per grid point.
+    """
+    names = [name for name in table if name != "shape"]
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        writer.writerows(zip(*(table[name].tolist() for name in names)))
+    print(f"Saved sensitivity table as: {output_path}")
+
+def plot_sweep_heatmap(table: dict, output_path: str = "sensitivity_heatmap.png",
+                       value: str = "risk_score") -> str:
+    """
+    Saves a heatmap of 'value' over revenue growth (x) and expenditure growth (y),
+    averaged over every other swept parameter. Returns the file path.
+    The chart is drawn as a "heatmap" plot job on its own Figure (see plot_rendering),
+    so it neither touches pyplot state nor switches the matplotlib backend.
+    """
+    revenue_axis = np.unique(table["revenue_growth"])
+    expenditure_axis = np.unique(table["expenditure_growth"])
+    cells = (np.searchsorted(expenditure_axis, table["expenditure_growth"]) * len(revenue_axis)
+             + np.searchsorted(revenue_axis, table["revenue_growth"]))
+    grid_shape = (len(expenditure_axis), len(revenue_axis))
+    sums = np.bincount(cells, weights=table[value], minlength=np.prod(grid_shape)).reshape(grid_shape)
+    counts = np.bincount(cells, minlength=np.prod(grid_shape)).reshape(grid_shape)
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    job = PlotJob(kind="heatmap", name="sensitivity_heatmap", title=f"Sensitivity of {value.replace('_', ' ')}",
+                  data={"values": (sums / np.maximum(counts, 1)).tolist(),
+                        "x_labels": [f"{rate:.1%}" for rate in revenue_axis],
+                        "y_labels": [f"{rate:.1%}" for rate in expenditure_axis]},
+                  style={"cmap": "RdYlGn_r", "colorbar": value.replace("_", " ").capitalize(),
+                         "xlabel": "Revenue Growth", "ylabel": "Expenditure Growth"})
+    render_plot(job, output_path)
+    print(f"Saved sensitivity heatmap as: {output_path}")
+    return output_path
+
+def _float_list(text: str) -> list:
+    return [float(value) for value in text.split(",") if value]
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Sweep growth rates, risk thresholds and weights")
+    parser.add_argument("file_path", nargs="?", default="input_data.json")
+    parser.add_argument("--revenue-growth", type=_float_list, default=[0.05],
+                        help="Comma-separated revenue growth rates, e.g. 0.03,0.04,0.05")
+    parser.add_argument("--expenditure-growth", type=_float_list, default=[0.03],
+                        help="Comma-separated expenditure growth rates")
+    parser.add_argument("--threshold", action="append", default=[], metavar="KEY=V1,V2",
+                        help=f"Values to try for a risk threshold; keys: {', '.join(DEFAULT_RISK_THRESHOLDS)}")
+    parser.add_argument("--weights", action="append", type=_float_list, default=None, metavar="D,I,G",
+                        help="A (deficit, inflation, GDP) weight triple; repeat to sweep several")
+    parser.add_argument("--horizon", type=int, default=1)
+    parser.add_argument("--csv", default="sensitivity_sweep.csv", help="Where to write the result table")
+    parser.add_argument("--heatmap", default="sensitivity_heatmap.png", help="Where to save the heatmap")
+    args = parser.parse_args()
+
+    swept_thresholds = {}
+    for option in args.threshold:
+        key, _, values = option.partition("=")
+        swept_thresholds[key] = _float_list(values)
+    table = sweep_parameters(args.file_path, args.revenue_growth, args.expenditure_growth,
+                             swept_thresholds, args.weights, args.horizon)
+    if table:
+        write_sweep_csv(table, args.csv)
+        plot_sweep_heatmap(table, args.heatmap)
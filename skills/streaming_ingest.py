@@ -0,0 +1,200 @@
+import codecs
+import hashlib
+import json
+import os
+from typing import Iterator, Optional
+from skills.data_validation_tool import REQUIRED_KEYS, item_error
+from skills.category_hierarchy import PATH_FIELD, item_path
+from skills.fiscal_dataset import CATEGORY_SECTIONS, INDICATOR_SECTIONS, FiscalDataset
+
+AGGREGATED_HASH_SUFFIX = "+aggregated"
+
+class StreamingAggregator:
+    """
+    Validates financial records one at a time and collects them in one of two modes:
+      - aggregate=True (bounded memory): line items are summed per category path (see
+        category_hierarchy; the name alone for records without a path) and indicator
+        rates are kept per year (the last one wins), so memory grows with the number of
+        distinct categories and years, not with the number of records.
+      - aggregate=False: every valid record is kept as is, in arrival order, exactly as
+        the regular JSON loader would hold it; memory grows with the number of records.
+    Validation errors are counted and the first max_errors are kept.
+    """
+    def __init__(self, max_errors: int = 100, aggregate: bool = False):
+        self.max_errors = max_errors
+        self.aggregate = aggregate
+        self.errors = []
+        self.error_count = 0
+        self.seen_sections = set()
+        self.row_counts = {key: 0 for key in REQUIRED_KEYS}
+        self.records = {key: [] for key in REQUIRED_KEYS}
+        self.category_totals = {key: {} for key in CATEGORY_SECTIONS}
+        self.indicator_rates = {key: {} for key in INDICATOR_SECTIONS}
+
+    def _error(self, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(message)
+
+    def add(self, section: str, item) -> None:
+        """
+        Validates one record of a section and keeps it, or folds it into the running
+        aggregates.
+        """
+        if section not in REQUIRED_KEYS:
+            self._error(f"Unknown section '{section}'.")
+            return
+        self.seen_sections.add(section)
+        index = self.row_counts[section]
+        self.row_counts[section] += 1
+
+        error = item_error(section, index, item)
+        if error:
+            self._error(error)
+            return
+
+        if not self.aggregate:
+            self.records[section].append(item)
+        elif section in CATEGORY_SECTIONS:
+            totals = self.category_totals[section]
+            path = item_path(item)
+            totals[path] = totals.get(path, 0) + item["amount"]
+        else:
+            self.indicator_rates[section][item["year"]] = item["rate"]
+
+    def add_value(self, value) -> None:
+        """
+        Accepts one decoded JSON value: either a record tagged with its section
+        ({"section": "revenue", "name": ..., "amount": ...}) or a chunk mapping
+        section names to lists of records ({"revenue": [...], "inflation": [...]}).
+        """
+        if not isinstance(value, dict):
+            self._error("Top-level stream values must be JSON objects.")
+            return
+        if "section" in value:
+            record = dict(value)
+            self.add(record.pop("section"), record)
+            return
+        for section, items in value.items():
+            if not isinstance(items, list):
+                self._error(f"The field '{section}' should be a list.")
+                continue
+            self.seen_sections.add(section)
+            for item in items:
+                self.add(section, item)
+
+    @property
+    def valid(self) -> bool:
+        return self.error_count == 0 and self.seen_sections >= set(REQUIRED_KEYS)
+
+    def finish(self) -> None:
+        """
+        Reports sections that never appeared in the stream.
+        """
+        for key in REQUIRED_KEYS:
+            if key not in self.seen_sections:
+                self._error(f"Missing required field: '{key}'")
+
+    def to_data(self) -> dict:
+        """
+        Returns the records in the regular input layout; when aggregating, one item per
+        category path (keeping the path) and per year.
+        """
+        if not self.aggregate:
+            return {section: list(records) for section, records in self.records.items()}
+        data = {}
+        for section, totals in self.category_totals.items():
+            data[section] = [{"name": path[-1], "amount": amount, PATH_FIELD: list(path[:-1])} if len(path) > 1
+                             else {"name": path[-1], "amount": amount} for path, amount in totals.items()]
+        for section, rates in self.indicator_rates.items():
+            data[section] = [{"year": year, "rate": rate} for year, rate in sorted(rates.items())]
+        return data
+
+def iter_json_values(file_path: str, block_size: int = 1 << 20, digest=None) -> Iterator:
+    """
+    Yields the top-level JSON values of a file one by one without reading it whole.
+    Handles NDJSON (one value per line) as well as concatenated multi-line values.
+    If a digest (e.g. hashlib.sha256()) is given, it is updated with the raw bytes.
+
+    When a value does not fit in the buffered text, the next read doubles in size,
+    so very large chunks are still decoded in linear time.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ""
+    read_size = block_size
+    with open(file_path, 'rb') as f:
+        while True:
+            block = f.read(read_size)
+            if digest is not None:
+                digest.update(block)
+            buffer += text_decoder.decode(block, final=not block)
+
+            pos = 0
+            length = len(buffer)
+            read_size = block_size
+            while True:
+                while pos < length and buffer[pos] in " \t\r\n":
+                    pos += 1
+                if pos == length:
+                    break
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if not block:
+                        raise
+                    read_size = max(block_size, length - pos)
+                    break
+                if end == length and block and not isinstance(value, (dict, list, str)):
+                    # A number (or literal) ending the buffer may continue in the next
+                    # block; only objects, arrays and strings carry their own delimiter
+                    break
+                pos = end
+                yield value
+            buffer = buffer[pos:]
+            if not block:
+                break
+
+def ingest_stream(file_path: str, block_size: int = 1 << 20, max_errors: int = 100,
+                  aggregate: bool = False) -> Optional[FiscalDataset]:
+    """
+    Reads an NDJSON or chunked JSON file incrementally, validating each record as it
+    arrives, without ever holding the whole file text (see StreamingAggregator for the modes).
+    With aggregate=True, line items with the same category path are summed and indicators
+    keep one rate per year, so peak memory is bounded by the block size, the largest single
+    chunk and the number of distinct categories/years, whatever the number of records.
+    This is the mode for inputs too large to hold record by record; load_dataset and
+    main.py select it with aggregate_stream / --aggregate-stream. With aggregate=False
+    every record is kept as the regular loader would, and memory grows with the records.
+
+    Returns a FiscalDataset of the data with validation_result already set,
+    ready for project_budget and risk_identification. Returns None if the file is
+    missing or cannot be decoded.
+    """
+    if not os.path.isfile(file_path):
+        print(f"Error: File not found: {file_path}")
+        return None
+
+    aggregator = StreamingAggregator(max_errors=max_errors, aggregate=aggregate)
+    digest = hashlib.sha256()
+    try:
+        for value in iter_json_values(file_path, block_size=block_size, digest=digest):
+            aggregator.add_value(value)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        print(f"Error: Invalid JSON stream in file: {file_path} ({e})")
+        return None
+    aggregator.finish()
+
+    records = sum(aggregator.row_counts.values())
+    if aggregator.valid:
+        print(f"Streaming validation succeeded for {file_path}: {records} records.")
+    else:
+        print(f"Streaming validation failed for {file_path}: {aggregator.error_count} errors in {records} records.")
+        for message in aggregator.errors:
+            print(f"Error: {message}")
+
+    # The summed data differs from the per-record data of the same file, so it must not share
+    # its version (projection cache keys, snapshots)
+    version = digest.hexdigest() + (AGGREGATED_HASH_SUFFIX if aggregate else "")
+    return FiscalDataset(source_path=file_path, content_hash=version,
+                         raw_data=aggregator.to_data(), validation_result=aggregator.valid)
@@ -0,0 +1,249 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+DEFAULT_CHUNK_ROWS = 2_000_000
+INCOME_COLUMN = "income"
+
+@dataclass
+class TaxSchedule:
+    """
+    A progressive slab schedule in array form.
+
+    Attributes:
+        lower: Lower bound of every slab, ascending and starting at 0.
+        rates: Marginal rate of every slab as a fraction.
+        base_tax: Tax owed on income exactly at each lower bound (the cumulative tax of
+                  all slabs below), so one lookup gives any liability.
+    """
+    lower: np.ndarray
+    rates: np.ndarray
+    base_tax: np.ndarray
+
+    @classmethod
+    def from_bounds(cls, lower, rates) -> "TaxSchedule":
+        lower = np.asarray(lower, dtype=np.float64)
+        rates = np.asarray(rates, dtype=np.float64)
+        if len(lower) == 0 or len(lower) != len(rates):
+            raise ValueError("a schedule needs one rate per slab and at least one slab")
+        if lower[0] != 0 or np.any(np.diff(lower) <= 0):
+            raise ValueError("slab lower bounds must start at 0 and increase")
+        base_tax = np.concatenate([[0.0], np.cumsum(rates[:-1] * np.diff(lower))])
+        return cls(lower=lower, rates=rates, base_tax=base_tax)
+
+    @classmethod
+    def from_slabs(cls, slabs: list) -> "TaxSchedule":
+        """
+        Parses the slab list returned by create_tax_slabs, e.g.
+            [{"slab": 1, "range": "0 - 4987500.00", "tax_rate": "10%"}, ...,
+             {"slab": 3, "range": "Above 17456250.00", "tax_rate": "30%"}]
+        """
+        lower, rates = [], []
+        for slab in sorted(slabs, key=lambda slab: slab["slab"]):
+            bounds = slab["range"].replace(",", "")
+            if bounds.startswith("Above"):
+                lower.append(float(bounds.split()[1]))
+            else:
+                lower.append(float(bounds.split("-")[0]))
+            rates.append(float(str(slab["tax_rate"]).rstrip("%")) / 100)
+        return cls.from_bounds(lower, rates)
+
+    def __len__(self) -> int:
+        return len(self.rates)
+
+    def slab_index(self, incomes: np.ndarray) -> np.ndarray:
+        """
+        Returns the index of the top slab each income reaches (negative incomes count as 0).
+        """
+        return np.searchsorted(self.lower, np.maximum(incomes, 0), side="right") - 1
+
+    def liabilities(self, incomes, index: np.ndarray = None) -> np.ndarray:
+        """
+        Returns the tax owed on every income: the cumulative tax up to the top slab
+        reached plus that slab's rate on the remainder. 'index' may pass the incomes'
+        slab_index when the caller already has it.
+        """
+        incomes = np.maximum(np.asarray(incomes, dtype=np.float64), 0)
+        if index is None:
+            index = self.slab_index(incomes)
+        return self.base_tax[index] + self.rates[index] * (incomes - self.lower[index])
+
+def aggregate_chunk(incomes: np.ndarray, schedule: TaxSchedule) -> dict:
+    """
+    Computes the mergeable per-slab sums of one chunk of incomes, grouped by the top
+    slab each taxpayer reaches: "count", "income" and "tax" arrays of length len(schedule).
+    """
+    incomes = np.asarray(incomes, dtype=np.float64)
+    incomes = incomes[~np.isnan(incomes)]
+    index = schedule.slab_index(incomes)
+    slabs = len(schedule)
+    return {
+        "count": np.bincount(index, minlength=slabs),
+        "income": np.bincount(index, weights=incomes, minlength=slabs),
+        "tax": np.bincount(index, weights=schedule.liabilities(incomes, index), minlength=slabs),
+    }
+
+def merge_aggregates(parts: list, slabs: int) -> dict:
+    merged = {"count": np.zeros(slabs, dtype=np.int64), "income": np.zeros(slabs), "tax": np.zeros(slabs)}
+    for part in parts:
+        for key in merged:
+            merged[key] += part[key]
+    return merged
+
+def _detect_header(file_path: str, column: str):
+    """
+    Returns (index of the income column, byte offset of the first data row) of a text
+    file. Files whose first line parses as a number have no header and use column 0.
+    Raises ValueError if the header has no column named 'column'.
+    """
+    with open(file_path, 'rb') as f:
+        first = f.readline()
+    fields = first.decode('utf-8').strip().split(",")
+    try:
+        float(fields[0])
+        return 0, 0
+    except ValueError:
+        names = [name.strip() for name in fields]
+        lowered = [name.lower() for name in names]
+        if column.lower() not in lowered:
+            raise ValueError(f"Income column '{column}' not found in {file_path}; "
+                             f"available columns: {', '.join(names)}")
+        return lowered.index(column.lower()), len(first)
+
+def _byte_ranges(file_path: str, start: int, chunk_bytes: int) -> list:
+    """
+    Splits a text file from 'start' into ranges of about chunk_bytes that begin and end
+    on line boundaries.
+    """
+    size = os.path.getsize(file_path)
+    bounds = [start]
+    with open(file_path, 'rb') as f:
+        while bounds[-1] + chunk_bytes < size:
+            f.seek(bounds[-1] + chunk_bytes)
+            f.readline()
+            if f.tell() >= size:
+                break
+            bounds.append(f.tell())
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def income_chunk_jobs(file_path: str, column: str = INCOME_COLUMN, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                      chunk_rows: int = DEFAULT_CHUNK_ROWS) -> list:
+    """
+    Describes the chunks of a taxpayer income file as (path, kind, start, stop, column)
+    jobs that any worker can load independently: row ranges of a .npy array (read through
+    a memory map) or line-aligned byte ranges of a CSV/text file with one taxpayer per line.
+    """
+    if file_path.lower().endswith(".npy"):
+        rows = len(np.load(file_path, mmap_mode="r"))
+        return [(file_path, "npy", start, min(start + chunk_rows, rows), 0) for start in range(0, rows, chunk_rows)]
+    column_index, data_start = _detect_header(file_path, column)
+    return [(file_path, "text", start, stop, column_index)
+            for start, stop in _byte_ranges(file_path, data_start, chunk_bytes)]
+
+def load_income_chunk(job) -> np.ndarray:
+    file_path, kind, start, stop, column_index = job
+    if kind == "npy":
+        return np.asarray(np.load(file_path, mmap_mode="r")[start:stop], dtype=np.float64)
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        text = f.read(stop - start).decode('utf-8')
+    if not text.strip():
+        return np.empty(0)
+    return np.loadtxt(io.StringIO(text), delimiter=",", usecols=column_index, ndmin=1, dtype=np.float64)
+
+def _simulate_job(args) -> dict:
+    """
+    Loads and aggregates one chunk. Top-level so process pool workers can run it.
+    """
+    job, schedule = args
+    return aggregate_chunk(load_income_chunk(job), schedule)
+
+def run_microsimulation(income_file: str, schedule, column: str = INCOME_COLUMN, workers: int = None,
+                        chunk_bytes: int = DEFAULT_CHUNK_BYTES, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> dict:
+    """
+    Computes every taxpayer's liability under a slab schedule (a TaxSchedule or the
+    slab list from create_tax_slabs) and aggregates the results.
+
+    The income file (.npy array, or CSV/text with an optional header naming the 'income'
+    column; a header without it raises ValueError) is processed in chunks that are never
+    all in memory at once. With workers > 1
+    (default: all cores) and more than one chunk, the chunks are split across a process
+    pool; each worker loads its own chunk from the file.
+
+    Returns the population totals and, per slab (taxpayers grouped by the top slab they
+    reach), the taxpayer count, income, tax paid, effective rate and the revenue the
+    slab's own bracket raises across all taxpayers.
+    """
+    if not isinstance(schedule, TaxSchedule):
+        schedule = TaxSchedule.from_slabs(schedule)
+    if not os.path.isfile(income_file):
+        print(f"Error: File not found: {income_file}")
+        return {}
+
+    jobs = [(job, schedule) for job in income_chunk_jobs(income_file, column, chunk_bytes, chunk_rows)]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            parts = list(pool.map(_simulate_job, jobs))
+    else:
+        parts = [_simulate_job(job) for job in jobs]
+    totals = merge_aggregates(parts, len(schedule))
+    return summarize_aggregates(totals, schedule)
+
+def summarize_aggregates(totals: dict, schedule: TaxSchedule) -> dict:
+    """
+    Turns merged per-slab sums into the microsimulation report.
+    """
+    count, income, tax = totals["count"], totals["income"], totals["tax"]
+    upper = np.append(schedule.lower[1:], np.inf)
+    # Income taxed inside bracket j: the part above its lower bound for taxpayers whose top
+    # slab is j, plus the full bracket width for everyone who reaches a higher slab
+    above = np.concatenate([np.cumsum(count[::-1])[::-1][1:], [0]])
+    bracket_base = (income - count * schedule.lower) + above * np.where(np.isfinite(upper), upper - schedule.lower, 0)
+    bracket_revenue = schedule.rates * bracket_base
+
+    total_income, total_tax = float(income.sum()), float(tax.sum())
+    report = {
+        "taxpayers": int(count.sum()),
+        "total_income": total_income,
+        "total_tax": total_tax,
+        "effective_rate": total_tax / total_income if total_income else 0.0,
+        "slabs": [],
+    }
+    for slab in range(len(schedule)):
+        report["slabs"].append({
+            "slab": slab + 1,
+            "lower": float(schedule.lower[slab]),
+            "upper": float(upper[slab]) if np.isfinite(upper[slab]) else None,
+            "rate": float(schedule.rates[slab]),
+            "taxpayers": int(count[slab]),
+            "income": float(income[slab]),
+            "tax": float(tax[slab]),
+            "effective_rate": float(tax[slab] / income[slab]) if income[slab] else 0.0,
+            "bracket_revenue": float(bracket_revenue[slab]),
+        })
+    print(f"Simulated {report['taxpayers']} taxpayers: revenue {total_tax:.2f}, "
+          f"effective rate {report['effective_rate']:.2%}.")
+    for slab in report["slabs"]:
+        print(f"Slab {slab['slab']}: {slab['taxpayers']} taxpayers, tax {slab['tax']:.2f}, "
+              f"effective rate {slab['effective_rate']:.2%}, bracket revenue {slab['bracket_revenue']:.2f}")
+    return report
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from skills.budget_projection_tool import project_budget
+    from skills.tax_slab_tool import create_tax_slabs
+
+    parser = argparse.ArgumentParser(description="Simulate the recommended tax slabs over taxpayer incomes")
+    parser.add_argument("income_file", help=".npy array or CSV/text file of taxpayer incomes")
+    parser.add_argument("--data", default="input_data.json", help="Budget data used to derive the slabs")
+    parser.add_argument("--column", default=INCOME_COLUMN, help="Income column of a CSV file with a header")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    slabs = create_tax_slabs(project_budget(args.data))
+    print(json.dumps(run_microsimulation(args.income_file, slabs, args.column, args.workers), indent=2))
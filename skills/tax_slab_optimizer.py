@@ -0,0 +1,214 @@
+import time
+from itertools import combinations, islice
+import numpy as np
+from skills.fiscal_dataset import column_total
+from skills.tax_microsimulation import INCOME_COLUMN, TaxSchedule, income_chunk_jobs, load_income_chunk
+
+DEFAULT_BOUNDARY_QUANTILES = tuple(np.round(np.arange(0.05, 1.0, 0.05), 2)) + (0.99,)
+DEFAULT_RATE_STEP = 0.05
+# Most revenue cells (boundary sets x rate sets) scored at once, bounding peak memory
+DEFAULT_BLOCK_CELLS = 1 << 22
+
+class IncomeDistribution:
+    """
+    Sorted incomes with suffix sums, so the total income above any threshold b,
+    sum(max(income - b, 0)), is one binary search.
+    """
+
+    def __init__(self, incomes):
+        incomes = np.asarray(incomes, dtype=np.float64)
+        self.incomes = np.sort(np.maximum(incomes[~np.isnan(incomes)], 0))
+        self.suffix = np.concatenate([np.cumsum(self.incomes[::-1])[::-1], [0.0]])
+
+    def __len__(self) -> int:
+        return len(self.incomes)
+
+    def excess_above(self, thresholds) -> np.ndarray:
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        index = np.searchsorted(self.incomes, thresholds, side="right")
+        return self.suffix[index] - (len(self.incomes) - index) * thresholds
+
+    def revenue(self, lower, rates) -> float:
+        """
+        Revenue of one schedule: each slab adds its rate increase on all income above its
+        lower bound.
+        """
+        increments = np.diff(np.asarray(rates, dtype=np.float64), prepend=0.0)
+        return float(increments @ self.excess_above(lower))
+
+    def quantiles(self, levels) -> np.ndarray:
+        return np.quantile(self.incomes, levels) if len(self.incomes) else np.zeros(len(levels))
+
+def load_incomes(income_file: str, column: str = INCOME_COLUMN) -> np.ndarray:
+    """
+    Reads every income of a taxpayer file (see tax_microsimulation.income_chunk_jobs).
+    """
+    chunks = [load_income_chunk(job) for job in income_chunk_jobs(income_file, column)]
+    return np.concatenate(chunks) if chunks else np.empty(0)
+
+def deficit_target(projections: dict, baseline_revenue: float) -> float:
+    """
+    Revenue the new schedule must raise: what the baseline schedule raises plus the
+    projected deficit (expenditure minus revenue), never below zero.
+    """
+    deficit = (column_total(projections.get("projected_expenditure", []), "projected_amount")
+               - column_total(projections.get("projected_revenue", []), "projected_amount"))
+    return max(baseline_revenue + deficit, 0.0)
+
+def format_slabs(lower, rates) -> list:
+    """
+    Returns a schedule in the create_tax_slabs format.
+    """
+    slabs = []
+    for index, (bound, rate) in enumerate(zip(lower, rates)):
+        if index + 1 < len(lower):
+            bounds = f"{bound:.2f} - {lower[index + 1]:.2f}" if index else f"0 - {lower[1]:.2f}"
+        else:
+            bounds = f"Above {bound:.2f}"
+        slabs.append({"slab": index + 1, "range": bounds, "tax_rate": f"{rate * 100:g}%"})
+    return slabs
+
+def _combination_blocks(values, size: int, block_rows: int):
+    """
+    Yields the combinations of 'size' values as arrays of at most block_rows rows,
+    without ever listing all of them.
+    """
+    iterator = combinations(values, size)
+    while True:
+        block = list(islice(iterator, block_rows))
+        if not block:
+            return
+        yield np.array(block, dtype=np.float64).reshape(len(block), size)
+
+def _block_best(revenue: np.ndarray, rate_sets: np.ndarray, slabs: int, target_revenue: float,
+                scale: float, tolerance: float):
+    """
+    Returns (key, boundary row, rate row, revenue, error) of the best cell of one scored
+    block. Keys compare lexicographically (see optimize_tax_slabs).
+    """
+    error = np.abs(revenue - target_revenue) / scale
+    rows, columns = np.nonzero(error <= tolerance)
+    if len(rows):
+        top_rates = rate_sets[columns, -1]
+        # np.lexsort sorts by its last key first: top rate, then error
+        best = np.lexsort((error[rows, columns], top_rates))[0]
+        row, column = int(rows[best]), int(columns[best])
+        key = (0, float(top_rates[best]), slabs, float(error[row, column]))
+    else:
+        row, column = np.unravel_index(int(np.argmin(error)), error.shape)
+        key = (1, float(error[row, column]), slabs, 0.0)
+    return key, row, column, float(revenue[row, column]), float(error[row, column])
+
+def optimize_tax_slabs(incomes, target_revenue: float, min_slabs: int = 3, max_slabs: int = 5,
+                       max_top_rate: float = 0.45, rate_step: float = DEFAULT_RATE_STEP,
+                       boundary_quantiles=DEFAULT_BOUNDARY_QUANTILES, tolerance: float = 0.005,
+                       block_cells: int = DEFAULT_BLOCK_CELLS) -> dict:
+    """
+    Searches slab schedules for the one whose revenue over the income distribution is
+    closest to target_revenue.
+
+    Candidates combine lower bounds drawn from the income quantiles in boundary_quantiles
+    (the first slab always starts at 0) with strictly increasing rates on a rate_step grid
+    up to max_top_rate, for every slab count from min_slabs to max_slabs. Because a
+    schedule's revenue is sum(rate increase * income above the bound), candidates are
+    scored by matrix products of the boundaries' income-above values and the rate
+    increments. The combinations are generated and scored in blocks of at most
+    block_cells candidates, keeping only a running best, so memory stays bounded however
+    fine the rate grid is.
+
+    Candidates are ranked lexicographically. Those within 'tolerance' (relative) of the
+    target come first, ordered by top rate, then slab count, then error. If none is that
+    close, the smallest error wins, then the fewest slabs.
+
+    Returns {"slabs" (create_tax_slabs format), "lower", "rates", "revenue",
+    "target_revenue", "relative_error", "candidates", "candidates_per_second"}.
+    """
+    if min_slabs < 1 or max_slabs < min_slabs:
+        raise ValueError("need 1 <= min_slabs <= max_slabs")
+    distribution = incomes if isinstance(incomes, IncomeDistribution) else IncomeDistribution(incomes)
+    started = time.perf_counter()
+
+    bounds = np.unique(distribution.quantiles(boundary_quantiles))
+    bounds = bounds[bounds > 0]
+    excess = distribution.excess_above(np.concatenate([[0.0], bounds]))
+    rate_grid = np.round(np.arange(0.0, max_top_rate + 1e-9, rate_step), 10)
+
+    best, evaluated = None, 0
+    scale = max(target_revenue, 1.0)
+    for slabs in range(min_slabs, max_slabs + 1):
+        if slabs - 1 > len(bounds) or slabs > len(rate_grid):
+            break
+        for boundary_block in _combination_blocks(range(1, len(bounds) + 1), slabs - 1, block_cells):
+            boundary_sets = np.column_stack([np.zeros(len(boundary_block), dtype=np.int64),
+                                             boundary_block.astype(np.int64)])
+            boundary_excess = excess[boundary_sets]
+            for rate_sets in _combination_blocks(rate_grid, slabs, max(block_cells // len(boundary_sets), 1)):
+                revenue = boundary_excess @ np.diff(rate_sets, axis=1, prepend=0.0).T
+                evaluated += revenue.size
+                key, row, column, block_revenue, error = _block_best(revenue, rate_sets, slabs, target_revenue,
+                                                                     scale, tolerance)
+                if best is None or key < best[0]:
+                    best = (key, slabs, boundary_sets[row], rate_sets[column], block_revenue, error)
+
+    elapsed = time.perf_counter() - started
+    if best is None:
+        print("No tax slab schedule satisfies the constraints.")
+        return {}
+    _, slabs, boundary_set, rates, revenue, error = best
+    lower = np.concatenate([[0.0], bounds])[boundary_set]
+    result = {
+        "slabs": format_slabs(lower.tolist(), rates.tolist()),
+        "lower": lower.tolist(),
+        "rates": rates.tolist(),
+        "revenue": revenue,
+        "target_revenue": float(target_revenue),
+        "relative_error": error,
+        "candidates": evaluated,
+        "candidates_per_second": evaluated / elapsed if elapsed else float(evaluated),
+    }
+    print(f"Scored {evaluated} candidate schedules in {elapsed:.3f}s. Best: {slabs} slabs raising {revenue:.2f} "
+          f"(target {target_revenue:.2f}, error {error:.2%}).")
+    for slab in result["slabs"]:
+        print(f"Slab {slab['slab']}: Range: {slab['range']}, Tax Rate: {slab['tax_rate']}")
+    return result
+
+def optimize_slabs_for_deficit(projections: dict, incomes, baseline_slabs: list, **options) -> dict:
+    """
+    Optimizer mode of create_tax_slabs: finds the schedule that raises what baseline_slabs
+    (e.g. the create_tax_slabs heuristic) raises over the incomes plus the projected deficit.
+    options are passed on to optimize_tax_slabs.
+    """
+    distribution = incomes if isinstance(incomes, IncomeDistribution) else IncomeDistribution(incomes)
+    baseline = TaxSchedule.from_slabs(baseline_slabs)
+    baseline_revenue = distribution.revenue(baseline.lower, baseline.rates)
+    target = deficit_target(projections, baseline_revenue)
+    print(f"Baseline slabs raise {baseline_revenue:.2f}; target revenue is {target:.2f}.")
+    result = optimize_tax_slabs(distribution, target, **options)
+    if result:
+        result["baseline_revenue"] = baseline_revenue
+    return result
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from skills.budget_projection_tool import project_budget
+    from skills.tax_slab_tool import create_tax_slabs
+
+    parser = argparse.ArgumentParser(description="Find tax slabs that cover the projected deficit")
+    parser.add_argument("income_file", help=".npy array or CSV/text file of taxpayer incomes")
+    parser.add_argument("--data", default="input_data.json", help="Budget data used for the projections")
+    parser.add_argument("--column", default=INCOME_COLUMN, help="Income column of a CSV file with a header")
+    parser.add_argument("--min-slabs", type=int, default=3)
+    parser.add_argument("--max-slabs", type=int, default=5)
+    parser.add_argument("--max-top-rate", type=float, default=0.45)
+    parser.add_argument("--target", type=float, default=None, help="Explicit revenue target instead of the deficit")
+    args = parser.parse_args()
+
+    projections = project_budget(args.data)
+    distribution = IncomeDistribution(load_incomes(args.income_file, args.column))
+    options = {"min_slabs": args.min_slabs, "max_slabs": args.max_slabs, "max_top_rate": args.max_top_rate}
+    if args.target is not None:
+        result = optimize_tax_slabs(distribution, args.target, **options)
+    else:
+        result = optimize_slabs_for_deficit(projections, distribution, create_tax_slabs(projections), **options)
+    print(json.dumps(result, indent=2))
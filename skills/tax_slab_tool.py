@@ -1,6 +1,7 @@
 import os
+from skills.fiscal_dataset import column_total
 
-def create_tax_slabs(projections: dict) -> list:
+def create_tax_slabs(projections: dict, income_file: str = None, **optimizer_options) -> list:
     """
     Creates tax slabs based on the projected revenue values from budget_projection_tool.
     The logic used is:
@@ -12,6 +13,11 @@ def create_tax_slabs(projections: dict) -> list:
     
     Prints the computed total revenue and details for each slab.
     
+    With an income_file of taxpayer incomes (.npy or CSV, see tax_microsimulation) the
+    three slabs only serve as the baseline: tax_slab_optimizer.optimize_slabs_for_deficit
+    searches for the schedule that raises what they raise plus the projected deficit,
+    passing on optimizer_options. If no schedule is found the baseline slabs are returned.
+    
     Returns a list of dictionaries representing each tax slab.
     """
     revenue_items = projections.get("projected_revenue", [])
@@ -19,7 +25,7 @@ def create_tax_slabs(projections: dict) -> list:
         print("No projected revenue data available to create tax slabs.")
         return []
 
-    total_revenue = sum(item.get("projected_amount", 0) for item in revenue_items)
+    total_revenue = column_total(revenue_items, "projected_amount")
     print(f"Total Projected Revenue: {total_revenue:.2f}")
 
     # Define slab limits based on total projected revenue
@@ -37,4 +43,14 @@ def create_tax_slabs(projections: dict) -> list:
     for slab in slabs:
         print(f"Slab {slab['slab']}: Range: {slab['range']}, Tax Rate: {slab['tax_rate']}")
 
+    if income_file is not None:
+        # Imported here because the optimizer's command line builds on this module
+        from skills.tax_slab_optimizer import load_incomes, optimize_slabs_for_deficit
+        if not os.path.isfile(income_file):
+            print(f"Error: File not found: {income_file}. Keeping the baseline slabs.")
+            return slabs
+        optimized = optimize_slabs_for_deficit(projections, load_incomes(income_file), slabs, **optimizer_options)
+        if optimized:
+            return optimized["slabs"]
+
     return slabs
\ No newline at end of file
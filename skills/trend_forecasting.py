@@ -0,0 +1,126 @@
+from dataclasses import astuple, dataclass
+import numpy as np
+
+FORECAST_METHODS = ("linear", "ses")
+
+@dataclass
+class IndicatorSpec:
+    """
+    Describes one year/rate indicator series in the input data.
+
+    Attributes:
+        section: Key of the series in the input data, e.g. "inflation".
+        projection_key: Key of its forecast in project_budget's output, e.g. "projected_inflation".
+        title: Capitalized name used at the start of log lines.
+        label: Name used inside log lines.
+        always_project: If True the projection key is present even when the data has no such section.
+    """
+    section: str
+    projection_key: str
+    title: str
+    label: str
+    always_project: bool = False
+
+INDICATOR_REGISTRY = {}
+
+def register_indicator(section: str, projection_key: str = None, title: str = None, label: str = None,
+                       always_project: bool = False) -> IndicatorSpec:
+    """
+    Adds a year/rate series (e.g. "unemployment", "debt_to_gdp") to the indicators that
+    project_budget forecasts. Returns the registered spec.
+    """
+    label = label or section.replace("_", " ")
+    spec = IndicatorSpec(section=section, projection_key=projection_key or f"projected_{section}",
+                         title=title or label[:1].upper() + label[1:], label=label, always_project=always_project)
+    INDICATOR_REGISTRY[section] = spec
+    return spec
+
+def indicator_registry_key() -> tuple:
+    """
+    The registered indicators as a hashable tuple, for the cache keys of results that
+    depend on which indicators are forecast (see project_budget).
+    """
+    return tuple(astuple(spec) for spec in INDICATOR_REGISTRY.values())
+
+register_indicator("inflation", title="Inflation", label="inflation", always_project=True)
+register_indicator("gdp_growth", title="GDP Growth", label="GDP growth", always_project=True)
+
+def stack_series(series_list: list):
+    """
+    Aligns K (years, values) series on the union of their years.
+    Returns (year grid of length T, values of shape (K, T), mask of observed entries).
+    Years observed more than once in a series keep their last value.
+    """
+    all_years = [np.asarray(years, dtype=np.int64) for years, _ in series_list]
+    grid = np.unique(np.concatenate(all_years)) if all_years else np.array([], dtype=np.int64)
+    values = np.zeros((len(series_list), len(grid)))
+    mask = np.zeros((len(series_list), len(grid)), dtype=bool)
+    for row, (years, rates) in enumerate(zip(all_years, (rates for _, rates in series_list))):
+        columns = np.searchsorted(grid, years)
+        values[row, columns] = rates
+        mask[row, columns] = True
+    return grid, values, mask
+
+def forecast_batch(series_list: list, horizon: int = 1, method: str = "linear", alpha: float = 0.5) -> dict:
+    """
+    Forecasts the next 'horizon' years of K year/value series at once.
+
+    The series are stacked on a common year grid with a mask for missing years, so ragged
+    series are handled together:
+      - "linear": ordinary least squares of value on year for every series, solved in closed
+        form from masked sums (one vectorized solve for all K fits).
+      - "ses": simple exponential smoothing with factor alpha, run across the grid for all
+        series at once; the forecast is the final smoothed level.
+    Series with a single observation are forecast by their mean, and empty series give NaN.
+
+    Returns a dict of arrays: "years" (K, horizon) forecast years counted from each series'
+    last observed year (-1 for empty series), "values" (K, horizon), "counts" (K,)
+    observations per series and "methods" (K,) the method actually used per series
+    ("linear", "ses", "mean" or "none").
+    """
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"Unknown forecast method '{method}'. Expected one of {FORECAST_METHODS}.")
+    grid, values, mask = stack_series(series_list)
+    k = len(series_list)
+    weights = mask.astype(np.float64)
+    counts = weights.sum(axis=1)
+    steps = np.arange(1, horizon + 1)
+
+    has_data = counts > 0
+    no_year = np.iinfo(np.int64).min
+    last_year = np.where(has_data, np.where(mask, grid, no_year).max(axis=1, initial=no_year), -1)
+    forecast_years = np.where(has_data[:, None], last_year[:, None] + steps, -1)
+
+    safe_counts = np.where(has_data, counts, 1)
+    means = (weights * values).sum(axis=1) / safe_counts
+
+    if method == "linear":
+        # Center the years for numerical stability, then solve the 2x2 normal equations per row
+        origin = grid[0] if len(grid) else 0
+        x = (grid - origin).astype(np.float64)
+        sum_x = weights @ x
+        sum_xx = weights @ (x * x)
+        sum_y = (weights * values).sum(axis=1)
+        sum_xy = (weights * values) @ x
+        denominator = counts * sum_xx - sum_x ** 2
+        fit = (counts >= 2) & (denominator > 0)
+        safe_denominator = np.where(fit, denominator, 1)
+        slope = np.where(fit, (counts * sum_xy - sum_x * sum_y) / safe_denominator, 0.0)
+        intercept = np.where(fit, (sum_y - slope * sum_x) / safe_counts, means)
+        trend = intercept[:, None] + slope[:, None] * (forecast_years - origin)
+        forecasts = np.where(fit[:, None], trend, means[:, None])
+        methods = np.where(fit, "linear", np.where(has_data, "mean", "none"))
+    else:
+        level = np.full(k, np.nan)
+        for column in range(len(grid)):
+            observed = mask[:, column]
+            first = observed & np.isnan(level)
+            level = np.where(first, values[:, column], level)
+            update = observed & ~first
+            level = np.where(update, alpha * values[:, column] + (1 - alpha) * level, level)
+        smoothed = counts >= 2
+        forecasts = np.repeat(np.where(smoothed, level, means)[:, None], horizon, axis=1)
+        methods = np.where(smoothed, "ses", np.where(has_data, "mean", "none"))
+
+    forecasts = np.where(has_data[:, None], forecasts, np.nan)
+    return {"years": forecast_years, "values": forecasts, "counts": counts.astype(np.int64), "methods": methods}
@@ -1,102 +1,125 @@
-import os
-import uuid
-import json
-import matplotlib
-# Force matplotlib to use a non-interactive backend that doesn't require a GUI
-matplotlib.use('Agg')  # Add this line before importing pyplot
-import matplotlib.pyplot as plt
+from skills.chart_aggregation import reduce_plot_job
+import numpy as np
+from skills.fiscal_dataset import CATEGORY_SECTIONS, FiscalDataset, load_dataset
+from skills.plot_rendering import PlotJob, render_plot_artifacts, render_plots
 
-def create_visual_plots(data: dict, output_dir: str = "visual plots") -> None:
+def _section_series(data, section: str, label_field: str, value_field: str):
     """
-    Creates visualizations for:
+    Returns the (labels, values) lists charted for a section. A FiscalDataset whose
+    records are only held as columns is read from its arrays without rebuilding them.
+    """
+    if isinstance(data, FiscalDataset):
+        if data.raw_data is None:
+            if section in CATEGORY_SECTIONS:
+                columns = data.category_columns(section)
+                return columns.names.tolist(), np.nan_to_num(columns.amounts).tolist()
+            series = data.indicator_series(section)
+            return [str(year) for year in series.years.tolist()], series.rates.tolist()
+        data = data.data
+    items = data.get(section, [])
+    return [item.get(label_field, "Unknown") for item in items], [item.get(value_field, 0) for item in items]
+
+def build_plot_jobs(data) -> list:
+    """
+    Builds the render jobs of the standard charts from a data dict or a FiscalDataset:
       1. Revenues (pie chart)
       2. Expenditure (bar plot)
       3. GDP Growth (scatter plot)
       4. Inflation (scatter plot)
-    
-    Saves each image in the 'output_dir' with a unique filename.
+    Charts whose section is empty are skipped with a message.
     """
-    # Create the output directory if it does not exist
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"Created directory: {output_dir}")
+    jobs = []
 
     # 1. Pie chart for revenues
-    revenue_data = data.get("revenue", [])
-    if revenue_data:
-        labels = [item.get("name", "Unknown") for item in revenue_data]
-        sizes = [item.get("amount", 0) for item in revenue_data]
-        plt.figure()
-        plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140)
-        plt.title("Revenues")
-        pie_file = os.path.join(output_dir, f"pie_chart_revenues_{uuid.uuid4().hex}.png")
-        plt.savefig(pie_file)
-        plt.close()
-        print(f"Saved pie chart for revenues as: {pie_file}")
+    labels, values = _section_series(data, "revenue", "name", "amount")
+    if labels:
+        jobs.append(PlotJob(kind="pie", name="pie_chart_revenues", title="Revenues", data={
+            "labels": labels,
+            "values": values,
+        }))
     else:
         print("No revenue data available for visualization.")
 
     # 2. Bar plot for expenditure
-    expenditure_data = data.get("expenditure", [])
-    if expenditure_data:
-        labels = [item.get("name", "Unknown") for item in expenditure_data]
-        amounts = [item.get("amount", 0) for item in expenditure_data]
-        plt.figure()
-        plt.bar(labels, amounts, color='skyblue')
-        plt.xlabel("Expenditure Category")
-        plt.ylabel("Amount")
-        plt.title("Expenditure")
-        plt.xticks(rotation=45, ha="right")
-        bar_file = os.path.join(output_dir, f"bar_plot_expenditure_{uuid.uuid4().hex}.png")
-        plt.tight_layout()
-        plt.savefig(bar_file)
-        plt.close()
-        print(f"Saved bar plot for expenditure as: {bar_file}")
+    labels, values = _section_series(data, "expenditure", "name", "amount")
+    if labels:
+        jobs.append(PlotJob(kind="bar", name="bar_plot_expenditure", title="Expenditure", data={
+            "labels": labels,
+            "values": values,
+        }, style={"color": "skyblue", "xlabel": "Expenditure Category", "ylabel": "Amount"}))
     else:
         print("No expenditure data available for visualization.")
 
     # 3. Scatter plot for GDP Growth
-    gdp_growth_data = data.get("gdp_growth", [])
-    if gdp_growth_data:
-        years = [item.get("year", "Unknown") for item in gdp_growth_data]
-        rates = [item.get("rate", 0) for item in gdp_growth_data]
-        plt.figure()
-        plt.scatter(years, rates, color='green')
-        plt.xlabel("Year")
-        plt.ylabel("GDP Growth Rate")
-        plt.title("GDP Growth")
-        scatter_gdp_file = os.path.join(output_dir, f"scatter_plot_gdp_growth_{uuid.uuid4().hex}.png")
-        plt.savefig(scatter_gdp_file)
-        plt.close()
-        print(f"Saved scatter plot for GDP growth as: {scatter_gdp_file}")
+    years, rates = _section_series(data, "gdp_growth", "year", "rate")
+    if years:
+        jobs.append(PlotJob(kind="scatter", name="scatter_plot_gdp_growth", title="GDP Growth", data={
+            "x": years,
+            "y": rates,
+        }, style={"color": "green", "xlabel": "Year", "ylabel": "GDP Growth Rate"}))
     else:
         print("No GDP growth data available for visualization.")
 
     # 4. Scatter plot for Inflation
-    inflation_data = data.get("inflation", [])
-    if inflation_data:
-        years = [item.get("year", "Unknown") for item in inflation_data]
-        rates = [item.get("rate", 0) for item in inflation_data]
-        plt.figure()
-        plt.scatter(years, rates, color='red')
-        plt.xlabel("Year")
-        plt.ylabel("Inflation Rate")
-        plt.title("Inflation")
-        scatter_inflation_file = os.path.join(output_dir, f"scatter_plot_inflation_{uuid.uuid4().hex}.png")
-        plt.savefig(scatter_inflation_file)
-        plt.close()
-        print(f"Saved scatter plot for Inflation as: {scatter_inflation_file}")
+    years, rates = _section_series(data, "inflation", "year", "rate")
+    if years:
+        jobs.append(PlotJob(kind="scatter", name="scatter_plot_inflation", title="Inflation", data={
+            "x": years,
+            "y": rates,
+        }, style={"color": "red", "xlabel": "Year", "ylabel": "Inflation Rate"}))
     else:
         print("No inflation data available for visualization.")
 
-def create_visual_plots_from_json(file_path: str = "input_data.json", output_dir: str = "visual plots") -> None:
+    return jobs
+
+def create_visual_plots(data, output_dir: str = "visual plots", workers: int = None,
+                        limits: dict = None) -> None:
+    """
+    Creates visualizations for:
+      1. Revenues (pie chart)
+      2. Expenditure (bar plot)
+      3. GDP Growth (scatter plot)
+      4. Inflation (scatter plot)
+    
+    Saves each image in the 'output_dir' as '<chart name>_<content hash>.png', so an
+    unchanged chart keeps its file and is not rendered again, and lists the run's charts
+    in the directory's manifest.json (see plot_rendering.render_plots). Each chart is an
+    independent render job, so the charts are rendered in parallel on a process pool
+    when more than one worker is available.
+    
+    Before rendering, charts with more categories or points than their limit (see
+    chart_aggregation.CHART_LIMITS, overridable per chart kind through 'limits') keep
+    their top categories plus "Other" or are downsampled, so render time stays bounded.
+    """
+    jobs = [reduce_plot_job(job, limits) for job in build_plot_jobs(data)]
+    for job, path in zip(jobs, render_plots(jobs, output_dir, workers)):
+        print(f"Saved {job.kind} chart for {job.title} as: {path}")
+
+def create_plot_artifacts(data, output_dir: str = None, workers: int = None,
+                          limits: dict = None) -> list:
+    """
+    Creates the same charts as create_visual_plots(), but rendered into memory: returns a
+    list of PlotArtifacts (PNG buffer, title and insight key) for compile_report(plots=...).
+    The images are also saved to 'output_dir' when one is given.
+    """
+    jobs = [reduce_plot_job(job, limits) for job in build_plot_jobs(data)]
+    artifacts = render_plot_artifacts(jobs, output_dir, workers)
+    for artifact in artifacts:
+        location = f"saved as: {artifact.path}" if artifact.path else "kept in memory"
+        print(f"Rendered {artifact.kind} chart for {artifact.title}, {location}")
+    return artifacts
+
+def create_visual_plots_from_json(file_path: str = "input_data.json", output_dir: str = "visual plots",
+                                  dataset: FiscalDataset = None) -> None:
     """
-    Reads a JSON file, converts it into a dictionary, and then passes it to create_visual_plots().
+    Takes the loaded dataset (or loads the JSON file at file_path) and passes it to create_visual_plots().
     """
     try:
-        with open(file_path, "r") as f:
-            data = json.load(f)
-        print(f"Loaded data from {file_path}")
-        create_visual_plots(data, output_dir)
+        if dataset is None:
+            dataset = load_dataset(file_path)
+            if dataset is None:
+                return
+        print(f"Using data from {dataset.source_path}")
+        create_visual_plots(dataset, output_dir)
     except Exception as e:
-        print(f"Error: {e}")
\ No newline at end of file
+        print(f"Error: {e}")
@@ -0,0 +1,50 @@
+import json
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skills import fiscal_dataset
+from skills.projection_cache import clear_projection_cache
+
+SAMPLE_DATA = {
+    "revenue": [
+        {"name": "Tax Revenue", "amount": 5000},
+        {"name": "Grants", "amount": 1000},
+        {"name": "Oil Revenue", "amount": 3000},
+    ],
+    "expenditure": [
+        {"name": "Health", "amount": 4000},
+        {"name": "Education", "amount": 3500},
+        {"name": "Defense", "amount": 2500},
+    ],
+    "inflation": [{"year": str(year), "rate": rate} for year, rate in
+                  [(2019, 2.1), (2020, 2.4), (2021, 2.9), (2022, 3.3)]],
+    "gdp_growth": [{"year": str(year), "rate": rate} for year, rate in
+                   [(2019, 3.5), (2020, 3.1), (2021, 2.8), (2022, 2.6)]],
+}
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    """
+    Every test starts without cached datasets or projections.
+    """
+    clear_projection_cache()
+    fiscal_dataset._DATASET_CACHE.clear()
+    yield
+    clear_projection_cache()
+    fiscal_dataset._DATASET_CACHE.clear()
+
+@pytest.fixture
+def sample_data():
+    return json.loads(json.dumps(SAMPLE_DATA))
+
+@pytest.fixture
+def data_file(tmp_path, sample_data):
+    """
+    Writes the sample data to a JSON file and returns its path.
+    """
+    path = tmp_path / "input_data.json"
+    path.write_text(json.dumps(sample_data, indent=2))
+    return str(path)
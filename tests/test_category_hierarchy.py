@@ -0,0 +1,86 @@
+import json
+import pytest
+from skills.budget_projection_tool import project_budget
+from skills.category_hierarchy import CategoryHierarchy, rollup_items
+from skills.data_validation_tool import validate_data
+from skills.dataset_snapshot import load_snapshot
+from skills.fiscal_dataset import load_dataset
+from skills.projection_cache import projection_cache_info
+from skills.risk_identification_tool import risk_identification
+from skills.streaming_ingest import ingest_stream
+
+@pytest.fixture
+def path_data(sample_data):
+    sample_data["expenditure"] = [
+        {"name": "Vaccines", "amount": 1200, "path": ["Health", "Public Health"]},
+        {"name": "Hospitals", "amount": 2800, "path": "Health/Care"},
+        {"name": "Schools", "amount": 3500, "path": ["Education"]},
+        {"name": "Defense", "amount": 2500},
+    ]
+    return sample_data
+
+@pytest.fixture
+def path_file(tmp_path, path_data):
+    path = tmp_path / "input_data.json"
+    path.write_text(json.dumps(path_data, indent=2))
+    return str(path)
+
+def test_children_and_subtotals():
+    hierarchy = CategoryHierarchy([("A", "x"), ("A", "y"), ("B",), ("A", "x", "z")], [1, 2, 4, 8])
+    assert hierarchy.children() == {"A": 11.0, "B": 4.0}
+    assert hierarchy.children(("A",)) == {"x": 9.0, "y": 2.0}
+    assert hierarchy.children(("missing",)) == {}
+    hierarchy.update_leaf(3, 10)
+    assert hierarchy.subtotal("A/x") == 11.0
+    assert hierarchy.leaf_path(3) == ("A", "x", "z")
+
+def test_leaf_updates_reach_projections(path_file):
+    dataset = load_dataset(path_file)
+    before = project_budget(dataset=dataset, level=1)
+    hierarchy = dataset.category_hierarchy("expenditure")
+    hierarchy.update_leaf(0, 2200.5)
+    assert dataset.revision == 1
+    assert dataset.data["expenditure"][0]["amount"] == 2200.5
+
+    line_items = project_budget(dataset=dataset)
+    after = project_budget(dataset=dataset, level=1)
+    assert projection_cache_info()["hits"] == 0
+    assert line_items["projected_expenditure"][0]["amount"] == 2200.5
+    health = {item["name"]: item for item in after["projected_expenditure"]}["Health"]
+    old_health = {item["name"]: item for item in before["projected_expenditure"]}["Health"]
+    assert health["amount"] == hierarchy.subtotal(("Health",)) == 5000.5
+    assert health["projected_amount"] == pytest.approx(old_health["projected_amount"] + 1000.5 * 1.03)
+
+def test_line_items_keep_paths_for_later_rollup(path_file, path_data):
+    projections = project_budget(path_file, horizon=2)
+    expenditure = projections["projected_expenditure"]
+    assert [item.get("path") for item in expenditure] == [item.get("path") for item in path_data["expenditure"]]
+    rolled = rollup_items(expenditure, 1)
+    assert rolled == project_budget(path_file, horizon=2, level=1)["projected_expenditure"]
+    assert rollup_items(rolled, 1) == rolled
+
+def test_risk_level_matches_line_items(path_file):
+    projections = project_budget(path_file)
+    assert risk_identification(projections, level=1) == risk_identification(projections)
+
+def test_snapshot_keeps_paths(path_file, path_data):
+    assert validate_data(dataset=load_dataset(path_file))
+    dataset = load_snapshot(path_file)
+    assert dataset is not None
+    assert dataset.data == path_data
+    assert dataset.category_hierarchy("expenditure").children() == {
+        "Health": 4000.0, "Education": 3500.0, "Defense": 2500.0}
+
+def test_streaming_aggregation_keeps_paths(tmp_path, path_data):
+    path_data["expenditure"].append({"name": "Vaccines", "amount": 300, "path": ["Health", "Public Health"]})
+    path_data["expenditure"].append({"name": "Vaccines", "amount": 50})
+    path = tmp_path / "input.ndjson"
+    with open(path, 'w') as f:
+        for section, items in path_data.items():
+            for item in items:
+                f.write(json.dumps({"section": section, **item}) + "\n")
+    expenditure = ingest_stream(str(path), aggregate=True).data["expenditure"]
+    assert {"name": "Vaccines", "amount": 1500, "path": ["Health", "Public Health"]} in expenditure
+    assert {"name": "Vaccines", "amount": 50} in expenditure
+    dataset = ingest_stream(str(path))
+    assert dataset.category_hierarchy("expenditure").subtotal(("Health",)) == 4300.0
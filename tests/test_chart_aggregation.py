@@ -0,0 +1,39 @@
+import numpy as np
+from skills.chart_aggregation import lttb_indices, reduce_plot_job, top_n_with_other
+from skills.plot_rendering import PlotJob
+
+def test_lttb_keeps_endpoints_and_threshold():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 40)
+    keep = lttb_indices(x, y, 50)
+    assert len(keep) == 50
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+
+def test_lttb_sorts_unsorted_input():
+    rng = np.random.default_rng(5)
+    x = np.arange(500, dtype=float)
+    y = rng.normal(size=500)
+    shuffle = rng.permutation(500)
+    keep = lttb_indices(x[shuffle], y[shuffle], 40)
+    assert x[shuffle][keep].tolist() == x[lttb_indices(x, y, 40)].tolist()
+    assert x[shuffle][keep][0] == 0 and x[shuffle][keep][-1] == 499
+
+def test_scatter_job_is_downsampled_in_x_order():
+    years = [str(year) for year in range(2500, 1000, -1)]
+    job = PlotJob(kind="scatter", name="rates", title="Rates",
+                  data={"x": years, "y": [float(i % 7) for i in range(len(years))]})
+    reduced = reduce_plot_job(job, {"scatter": 100})
+    assert len(reduced.data["x"]) == 100
+    assert reduced.data["x"][0] == 1001.0 and reduced.data["x"][-1] == 2500.0
+    assert reduced.data["x"] == sorted(reduced.data["x"])
+
+def test_non_numeric_y_is_not_downsampled():
+    job = PlotJob(kind="scatter", name="labels", title="Labels",
+                  data={"x": list(range(50)), "y": [f"level {i}" for i in range(50)]})
+    assert reduce_plot_job(job, {"scatter": 10}) is job
+
+def test_top_n_with_other_sums_the_rest():
+    labels, values = top_n_with_other(["a", "b", "c", "a", "d"], [1, 5, 3, 4, 2], 2)
+    assert labels == ["a", "b", "Other"]
+    assert values == [5, 5, 5]
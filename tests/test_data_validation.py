@@ -0,0 +1,55 @@
+import json
+import pytest
+from skills.data_validation_tool import SCHEMA_VALIDATOR, item_error, validate_data
+
+def bad_data(sample_data):
+    revenue = sample_data["revenue"]
+    revenue[1]["amount"] = "1000"
+    revenue[2] = "Oil Revenue"
+    revenue.append({"amount": None})
+    sample_data["expenditure"] = "none this year"
+    sample_data["inflation"][1]["year"] = 2020
+    del sample_data["inflation"][2]["rate"]
+    del sample_data["gdp_growth"]
+    return sample_data
+
+EXPECTED = [
+    {"section": "revenue", "row": 1, "field": "amount", "reason": "must be numeric"},
+    {"section": "revenue", "row": 2, "field": None, "reason": "not a JSON object"},
+    {"section": "revenue", "row": 3, "field": "name", "reason": "missing"},
+    {"section": "revenue", "row": 3, "field": "amount", "reason": "must be numeric"},
+    {"section": "expenditure", "row": None, "field": None, "reason": "not a list"},
+    {"section": "inflation", "row": 1, "field": "year", "reason": "must be a string"},
+    {"section": "inflation", "row": 2, "field": "rate", "reason": "missing"},
+    {"section": "gdp_growth", "row": None, "field": None, "reason": "missing"},
+]
+
+def test_every_error_is_reported_in_document_order(sample_data):
+    report = SCHEMA_VALIDATOR.validate(bad_data(sample_data))
+    assert report == {"valid": False, "error_count": len(EXPECTED), "truncated": False, "violations": EXPECTED}
+
+@pytest.mark.parametrize("max_errors", [0, 1, 3, 5, 7])
+def test_error_cap_keeps_the_first_errors_and_the_total(sample_data, max_errors):
+    report = SCHEMA_VALIDATOR.validate(bad_data(sample_data), max_errors=max_errors)
+    assert report["violations"] == EXPECTED[:max_errors]
+    assert report["error_count"] == len(EXPECTED)
+    assert report["truncated"] is True
+
+def test_rows_match_the_per_record_checks(sample_data):
+    data = bad_data(sample_data)
+    report = SCHEMA_VALIDATOR.validate(data)
+    for section in ("revenue", "inflation"):
+        flagged = sorted({v["row"] for v in report["violations"] if v["section"] == section})
+        assert flagged == [row for row, item in enumerate(data[section]) if item_error(section, row, item)]
+
+def test_valid_data_has_no_violations(sample_data):
+    assert SCHEMA_VALIDATOR.validate(sample_data) == {"valid": True, "error_count": 0, "truncated": False,
+                                                      "violations": []}
+
+def test_validate_data_prints_the_capped_errors(tmp_path, sample_data, capsys):
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps(bad_data(sample_data)))
+    assert validate_data(str(path), max_errors=2) is False
+    out = capsys.readouterr().out
+    assert out.count("Error: ") == 2
+    assert f"Validation failed with {len(EXPECTED)} errors (2 shown)." in out
@@ -0,0 +1,41 @@
+import json
+import os
+from skills import data_validation_tool
+from skills.data_validation_tool import validate_data
+from skills.dataset_snapshot import load_snapshot, snapshot_path
+from skills.fiscal_dataset import load_dataset
+
+def make_snapshot(data_file):
+    assert validate_data(dataset=load_dataset(data_file))
+    assert os.path.isdir(snapshot_path(data_file))
+
+def test_snapshot_round_trip(data_file, sample_data):
+    make_snapshot(data_file)
+    dataset = load_snapshot(data_file)
+    assert dataset is not None
+    assert dataset.validation_result is True
+    assert dataset.data == sample_data
+
+def test_changed_source_invalidates_the_snapshot(data_file, sample_data):
+    make_snapshot(data_file)
+    sample_data["revenue"][0]["amount"] = 5001  # same size, different content
+    with open(data_file, 'w') as f:
+        json.dump(sample_data, f, indent=2)
+    stat = os.stat(data_file)
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load_snapshot(data_file) is None
+
+def test_new_validation_rules_invalidate_the_snapshot(data_file, monkeypatch):
+    make_snapshot(data_file)
+    monkeypatch.setattr(data_validation_tool, "SCHEMA_VERSION", "other-rules")
+    assert load_snapshot(data_file) is None
+
+def test_old_format_is_ignored(data_file):
+    make_snapshot(data_file)
+    header_file = os.path.join(snapshot_path(data_file), "header.json")
+    with open(header_file) as f:
+        header = json.load(f)
+    header["format_version"] = 1
+    with open(header_file, 'w') as f:
+        json.dump(header, f)
+    assert load_snapshot(data_file) is None
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+import json
+from skills.dataset_standardization_tool import RunningStats, group_medians, impute_columns, standardize_data
+from skills.fiscal_dataset import FiscalDataset, load_dataset
+
+def make_dataset(revenue, expenditure=None):
+    data = {"revenue": revenue, "expenditure": expenditure or [{"name": "X", "amount": 1}],
+            "inflation": [], "gdp_growth": []}
+    return FiscalDataset(source_path="memory.json", content_hash="test", raw_data=data)
+
+def test_group_medians_are_exact():
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 5, size=1001).astype(np.int32)
+    values = rng.lognormal(size=1001)
+    values[::17] = np.nan
+    medians = group_medians(codes, values, 6)
+    for group in range(5):
+        assert medians[group] == pytest.approx(np.nanmedian(values[codes == group]))
+    assert np.isnan(medians[5])
+
+def test_median_imputation_is_exact_across_skewed_chunks():
+    # The first chunk is all small values, the second all large: chunk medians average to 50.5
+    amounts = [1, 1, 1, 100, 100, 100, 100, None]
+    dataset = make_dataset([{"name": "A", "amount": amount} for amount in amounts])
+    stats = RunningStats(1)
+    values = np.array([np.nan if a is None else a for a in amounts], dtype=np.float64)
+    for start in range(0, len(values), 3):
+        stats.update(np.zeros(len(values[start:start + 3]), dtype=np.int32), values[start:start + 3])
+    assert stats.approximate_median[0] != 100
+
+    columns, summary = impute_columns(dataset, strategy="median", chunk_size=3)
+    assert columns["revenue"].values[-1] == 100
+    assert summary["revenue"]["median"] == 100
+
+def test_grouped_mean_uses_each_categorys_values():
+    dataset = make_dataset([{"name": "A", "amount": 10}, {"name": "A", "amount": None},
+                            {"name": "B", "amount": 1000}, {"name": "C", "amount": None}])
+    columns, _ = impute_columns(dataset, strategy="mean", group_by="category")
+    assert columns["revenue"].values.tolist() == [10, 10, 1000, 505]
+
+def test_group_by_a_field_the_records_lack_is_rejected():
+    dataset = make_dataset([{"name": "A", "amount": 10}, {"name": "B", "amount": None}])
+    with pytest.raises(ValueError, match="year"):
+        impute_columns(dataset, group_by="year")
+
+def test_group_by_year_for_yearly_line_items():
+    revenue = [{"name": "A", "year": "2020", "amount": 10}, {"name": "A", "year": "2020", "amount": None},
+               {"name": "A", "year": "2021", "amount": 30}, {"name": "A", "amount": None}]
+    expenditure = [{"name": "X", "year": "2020", "amount": 5}]
+    columns, summary = impute_columns(make_dataset(revenue, expenditure), group_by="year")
+    assert columns["revenue"].values.tolist() == [10, 10, 30, 20]
+    assert summary["revenue"]["group_by"] == "year"
+
+@pytest.mark.parametrize("valid", [True, False])
+def test_standardized_data_is_the_callers_copy(data_file, sample_data, valid):
+    if not valid:
+        sample_data["revenue"][1]["amount"] = None
+        with open(data_file, 'w') as f:
+            json.dump(sample_data, f)
+    data = standardize_data(data_file)
+    data["revenue"][0]["amount"] = -1
+    data["inflation"].clear()
+    dataset = load_dataset(data_file)
+    assert dataset.data["revenue"][0]["amount"] == 5000
+    assert len(dataset.data["inflation"]) == 4
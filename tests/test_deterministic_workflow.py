@@ -0,0 +1,34 @@
+import asyncio
+import os
+import orchestrator
+from orchestrator import build_workflow_stages, run_stages, run_workflow
+from skills.budget_projection_tool import project_budget
+from skills.fiscal_dataset import load_dataset
+from skills.risk_identification_tool import risk_identification
+from skills.tax_slab_tool import create_tax_slabs
+
+def offline(monkeypatch, tmp_path):
+    """
+    Runs from tmp_path, where data_file lives, with no model credentials.
+    """
+    for key in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "GEMINI_API_KEY", "GROQ_API_KEY", "LOGFIRE_TOKEN"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(orchestrator, "INPUT_DATA_PATH", "input_data.json")
+
+def test_no_llm_workflow_writes_a_report(monkeypatch, tmp_path, data_file):
+    offline(monkeypatch, tmp_path)
+    result = asyncio.run(run_workflow(deterministic=True))
+    assert result["status"] == "success"
+    assert os.path.getsize(tmp_path / result["report_path"]) > 0
+    assert result["workflow_summary"]["data_validation"] == {"data_valid": True}
+
+def test_no_llm_stages_match_the_skill_chain(monkeypatch, tmp_path, data_file):
+    offline(monkeypatch, tmp_path)
+    context = asyncio.run(run_stages(build_workflow_stages(deterministic=True, plots_dir=None),
+                                     {"dataset": load_dataset(data_file)}))
+    projections = project_budget(data_file)
+    assert context["projections"] == projections
+    assert context["risk_level"] == risk_identification(projections)
+    assert context["tax_slabs"] == create_tax_slabs(projections)
+    assert [plot.path for plot in context["plots"]] == [None] * len(context["plots"])
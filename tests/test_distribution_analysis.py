@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from skills.distribution_analysis import IncomeSketch, analyze_distribution, distribution_metrics
+from skills.tax_microsimulation import TaxSchedule
+
+SCHEDULE = TaxSchedule.from_bounds([0, 10_000, 40_000, 100_000], [0.0, 0.1, 0.2, 0.35])
+
+@pytest.fixture
+def incomes():
+    rng = np.random.default_rng(11)
+    values = rng.lognormal(10.5, 1.0, 20_000)
+    values[:50] = 0
+    return values
+
+def sketch_of(incomes, relative_accuracy=0.005):
+    sketch = IncomeSketch(relative_accuracy)
+    sketch.add(incomes, SCHEDULE.liabilities(incomes))
+    return sketch
+
+def test_merged_sketch_equals_a_single_sketch(incomes):
+    whole = sketch_of(incomes)
+    merged = IncomeSketch(0.005)
+    # Shuffled chunks of different sizes cover different bucket ranges
+    for chunk in np.split(np.sort(incomes)[::-1], [3, 700, 9_000]):
+        merged.merge(sketch_of(chunk))
+    assert merged.count == whole.count == len(incomes)
+    assert merged.offset == whole.offset
+    assert merged.counts.tolist() == whole.counts.tolist()
+    assert merged.income == pytest.approx(whole.income)
+    assert merged.tax == pytest.approx(whole.tax)
+    assert merged.zero_count == 50
+
+@pytest.mark.parametrize("q", [0.01, 0.1, 0.5, 0.9, 0.99])
+def test_quantiles_within_relative_accuracy(incomes, q):
+    merged = IncomeSketch(0.005)
+    for chunk in np.array_split(incomes, 7):
+        merged.merge(sketch_of(chunk))
+    exact = np.sort(incomes)[int(q * (len(incomes) - 1))]
+    assert merged.quantile(q) == pytest.approx(exact, rel=0.005)
+
+def test_merge_rejects_different_accuracy():
+    with pytest.raises(ValueError):
+        IncomeSketch(0.005).merge(IncomeSketch(0.01))
+
+def test_metrics_match_exact_totals(incomes):
+    report = distribution_metrics(sketch_of(incomes))
+    taxes = SCHEDULE.liabilities(incomes)
+    assert report["taxpayers"] == len(incomes)
+    assert report["total_income"] == pytest.approx(incomes.sum())
+    assert report["total_tax"] == pytest.approx(taxes.sum())
+    assert sum(group["tax"] for group in report["groups"]) == pytest.approx(taxes.sum())
+    order = np.argsort(incomes)
+    top = order[-len(incomes) // 100:]
+    assert report["top_tax_share"] == pytest.approx(taxes[top].sum() / taxes.sum(), rel=0.01)
+    assert report["gini_post_tax"] < report["gini_pre_tax"]
+
+def test_file_analysis_matches_in_memory_sketch(tmp_path, incomes):
+    path = tmp_path / "incomes.npy"
+    np.save(path, incomes)
+    report = analyze_distribution(str(path), SCHEDULE, workers=1)
+    assert report == distribution_metrics(sketch_of(incomes))
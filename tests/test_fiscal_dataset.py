@@ -0,0 +1,46 @@
+import json
+import numpy as np
+from skills.budget_projection_tool import project_budget
+from skills.data_validation_tool import validate_data
+from skills.dataset_standardization_tool import standardize_data
+from skills.visualization_tool import build_plot_jobs
+from skills.fiscal_dataset import build_category_columns, load_dataset
+
+def test_category_columns_are_built_in_one_pass():
+    columns = build_category_columns([{"name": "A", "amount": 1}, {"name": "B", "amount": 2.5},
+                                      {"name": "A"}, "not a record"])
+    assert columns.labels.tolist() == ["A", "B", "Unknown"]
+    assert columns.codes.tolist() == [0, 1, 0, 2]
+    assert columns.amounts[:2].tolist() == [1.0, 2.5]
+    assert np.isnan(columns.amounts[2:]).all()
+    assert build_category_columns([{"name": "A", "amount": 3}]).amounts.dtype == np.int64
+
+def test_validated_dataset_is_compacted_and_rebuilds_its_records(data_file, sample_data):
+    dataset = load_dataset(data_file)
+    assert validate_data(dataset=dataset)
+    assert dataset.raw_data is None
+    assert dataset.section_length("revenue") == len(sample_data["revenue"])
+    assert dataset.data == sample_data
+
+def test_reading_a_compacted_dataset_keeps_it_compact(data_file, sample_data):
+    dataset = load_dataset(data_file)
+    assert validate_data(dataset=dataset)
+    assert dataset.revenue == sample_data["revenue"]
+    assert standardize_data(dataset=dataset) == sample_data
+    build_plot_jobs(dataset)
+    assert dataset.raw_data is None
+
+def test_records_with_extra_fields_are_kept(data_file, sample_data, tmp_path):
+    sample_data["revenue"][0]["note"] = "kept"
+    path = tmp_path / "extra.json"
+    path.write_text(json.dumps(sample_data))
+    dataset = load_dataset(str(path))
+    assert validate_data(dataset=dataset)
+    assert not dataset.compact()
+    assert dataset.raw_data["revenue"][0]["note"] == "kept"
+
+def test_projection_from_columns_matches_per_item_growth(data_file, sample_data):
+    projections = project_budget(data_file)
+    for item, projected in zip(sample_data["revenue"], projections["projected_revenue"]):
+        assert projected == {"name": item["name"], "amount": item["amount"],
+                             "projected_amount": item["amount"] * 1.05}
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from skills.forecast_backtest import backtest_batch
+
+SERIES = [
+    ([2015, 2016, 2017, 2018, 2019, 2020], [1.2, 1.9, 2.1, 2.8, 3.0, 3.9]),
+    ([2017, 2019, 2020, 2022], [5.0, 4.1, 4.4, 3.2]),  # ragged, with gaps
+    ([2021], [2.5]),
+    ([], []),
+]
+
+def polyfit_forecast(years, values, target):
+    slope, intercept = np.polyfit(years, values, 1)
+    return slope * target + intercept
+
+@pytest.mark.parametrize("window", [None, 3])
+def test_linear_backtest_matches_polyfit_per_cutoff(window):
+    results = backtest_batch(SERIES, methods=("linear",), window=window)["linear"]
+    for row, (years, values) in enumerate(SERIES[:2]):
+        errors = []
+        for cutoff, actual in zip(years, values):
+            train = [(year, value) for year, value in zip(years, values)
+                     if year < cutoff and (window is None or year >= cutoff - window)]
+            if len(train) < 2:
+                continue
+            train_years, train_values = zip(*train)
+            errors.append(polyfit_forecast(train_years, train_values, cutoff) - actual)
+        errors = np.array(errors)
+        assert results["forecasts"][row] == len(errors)
+        assert results["mae"][row] == pytest.approx(np.abs(errors).mean())
+        assert results["rmse"][row] == pytest.approx(np.sqrt((errors ** 2).mean()))
+        assert results["bias"][row] == pytest.approx(errors.mean())
+    assert results["forecasts"][2] == results["forecasts"][3] == 0
+    assert np.isnan(results["mae"][2])
@@ -0,0 +1,92 @@
+import json
+import pytest
+from skills.data_validation_tool import validate_data, validation_report
+from skills.dataset_standardization_tool import standardize_data
+from skills.fiscal_dataset import load_dataset
+from skills.incremental_validation import validate_incremental
+
+def write(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+def append_records(sample_data):
+    sample_data["revenue"].append({"name": "Customs", "amount": 700})
+    sample_data["revenue"].append({"name": "Fees", "amount": None})
+    sample_data["gdp_growth"].append({"year": "2023", "rate": 2.4})
+
+def test_full_pass_matches_the_validator(data_file, sample_data):
+    sample_data["revenue"][1]["amount"] = "1000"
+    del sample_data["inflation"][2]["rate"]
+    write(data_file, sample_data)
+    report = validate_incremental(data_file)
+    expected = validation_report(data_file)
+    assert report["mode"] == "full"
+    assert report["valid"] is False
+    assert report["error_count"] == expected["error_count"]
+    assert report["violations"] == expected["violations"]
+
+def test_rerun_checks_no_rows(data_file):
+    assert validate_incremental(data_file)["mode"] == "full"
+    report = validate_incremental(data_file)
+    assert report["mode"] == "incremental"
+    assert report["valid"] is True
+    assert sum(report["new_rows"].values()) == 0
+
+@pytest.mark.parametrize("verify_history", [True, False])
+def test_appended_rows_match_a_full_pass(data_file, sample_data, verify_history):
+    assert validate_incremental(data_file)["valid"]
+    append_records(sample_data)
+    write(data_file, sample_data)
+
+    report = validate_incremental(data_file, verify_history=verify_history)
+    expected = validation_report(data_file)
+    assert report["mode"] == "incremental"
+    assert report["new_rows"] == {"revenue": 2, "expenditure": 0, "inflation": 0, "gdp_growth": 1}
+    assert report["error_count"] == expected["error_count"] == 1
+    assert report["violations"] == expected["violations"]
+
+    revenue = report["imputed"]["revenue"]
+    assert revenue["start"] == 3
+    assert revenue["column"].imputed.tolist() == [False, True]
+    assert revenue["column"].values[1] == pytest.approx((5000 + 1000 + 3000 + 700) / 4)
+
+def test_state_follows_successive_appends(data_file, sample_data):
+    assert validate_incremental(data_file)["valid"]
+    for amount in (700, 800):
+        sample_data["revenue"].append({"name": "Customs", "amount": amount})
+        sample_data["inflation"].append({"year": str(2023 + amount // 800), "rate": 3.0})
+        write(data_file, sample_data)
+        report = validate_incremental(data_file)
+        assert report["mode"] == "incremental"
+        assert report["valid"] is True
+        assert report["new_rows"]["revenue"] == 1
+    assert validate_incremental(data_file)["new_rows"]["revenue"] == 0
+
+def test_edited_history_runs_a_full_pass(data_file, sample_data):
+    assert validate_incremental(data_file)["valid"]
+    sample_data["expenditure"][0]["amount"] = 4001
+    append_records(sample_data)
+    write(data_file, sample_data)
+    report = validate_incremental(data_file)
+    assert report["mode"] == "full"
+    assert report["new_rows"]["revenue"] == 5
+
+def test_validate_data_incremental_option(data_file, sample_data):
+    assert validate_data(data_file, incremental=True)
+    append_records(sample_data)
+    write(data_file, sample_data)
+    assert validate_data(data_file, incremental=True) is False
+    assert validate_data(data_file) is False
+
+def test_standardize_fills_only_appended_rows(data_file, sample_data):
+    assert validate_incremental(data_file)["valid"]
+    append_records(sample_data)
+    write(data_file, sample_data)
+    data = standardize_data(dataset=load_dataset(data_file), incremental=True)
+    assert data["revenue"][:4] == sample_data["revenue"][:4]
+    assert data["revenue"][4] == {"name": "Fees", "amount": (5000 + 1000 + 3000 + 700) / 4}
+    assert sample_data["revenue"][4]["amount"] is None
+
+def test_incremental_standardization_rejects_groups(data_file):
+    with pytest.raises(ValueError):
+        standardize_data(data_file, group_by="category", incremental=True)
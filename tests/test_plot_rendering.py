@@ -0,0 +1,66 @@
+import itertools
+import os
+from skills import plot_rendering
+from skills.plot_rendering import (MANIFEST_FILE, PlotJob, plot_file_name, read_plot_manifest,
+                                   render_plot_artifacts, render_plots)
+
+def bar_job(name, values):
+    return PlotJob(kind="bar", name=name, title=name.title(), data={"labels": ["a", "b"], "values": values})
+
+def png_files(directory):
+    return sorted(file for file in os.listdir(directory) if file.endswith(".png"))
+
+def test_manifest_lists_the_latest_run(tmp_path):
+    jobs = [bar_job("revenues", [1, 2]), bar_job("expenditures", [3, 4])]
+    paths = render_plots(jobs, str(tmp_path), workers=1)
+    assert [os.path.basename(path) for path in paths] == [plot_file_name(job) for job in jobs]
+    manifest = read_plot_manifest(str(tmp_path))
+    assert [entry["file"] for entry in manifest["plots"]] == [plot_file_name(job) for job in jobs]
+    assert manifest["plots"][0] == {"file": plot_file_name(jobs[0]), "name": "revenues", "kind": "bar",
+                                    "title": "Revenues"}
+    assert set(manifest["entries"]) == set(png_files(tmp_path))
+
+def test_unchanged_plots_are_not_rendered_again(tmp_path, capsys):
+    job = bar_job("revenues", [1, 2])
+    path, = render_plots([job], str(tmp_path), workers=1)
+    modified = os.path.getmtime(path)
+    capsys.readouterr()
+    assert render_plots([job], str(tmp_path), workers=1) == [path]
+    assert "Reusing 1 cached plot(s)" in capsys.readouterr().out
+    assert os.path.getmtime(path) == modified
+    changed, = render_plots([bar_job("revenues", [1, 3])], str(tmp_path), workers=1)
+    assert changed != path
+
+def test_least_recently_used_plots_are_evicted(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(plot_rendering.time, "time", lambda: float(next(clock)))
+    jobs = [bar_job(f"chart{index}", [index, 1]) for index in range(4)]
+    for job in jobs[:3]:
+        render_plots([job], str(tmp_path), workers=1, max_cached=3)
+    render_plots([jobs[0]], str(tmp_path), workers=1, max_cached=3)  # chart0 is used again
+    render_plots([jobs[3]], str(tmp_path), workers=1, max_cached=3)
+    expected = sorted(plot_file_name(job) for job in (jobs[0], jobs[2], jobs[3]))
+    assert png_files(tmp_path) == expected
+    assert sorted(read_plot_manifest(str(tmp_path))["entries"]) == expected
+
+def test_current_run_is_kept_beyond_the_limit(tmp_path):
+    jobs = [bar_job(f"chart{index}", [index, 1]) for index in range(3)]
+    render_plots(jobs, str(tmp_path), workers=1, max_cached=1)
+    assert png_files(tmp_path) == sorted(plot_file_name(job) for job in jobs)
+
+def test_artifacts_reuse_the_cache(tmp_path):
+    job = bar_job("revenues", [1, 2])
+    path, = render_plots([job], str(tmp_path), workers=1)
+    artifact, = render_plot_artifacts([job], str(tmp_path), workers=1)
+    with open(path, 'rb') as f:
+        assert artifact.image.getvalue() == f.read()
+    assert artifact.path == path
+    in_memory, = render_plot_artifacts([bar_job("other", [5, 6])], workers=1)
+    assert in_memory.path is None
+    assert png_files(tmp_path) == [os.path.basename(path)]
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    (tmp_path / MANIFEST_FILE).write_text("{not json")
+    assert read_plot_manifest(str(tmp_path)) is None
+    render_plots([bar_job("revenues", [1, 2])], str(tmp_path), workers=1)
+    assert len(read_plot_manifest(str(tmp_path))["plots"]) == 1
@@ -0,0 +1,79 @@
+import json
+import os
+import numpy as np
+import pytest
+from skills.budget_projection_tool import project_budget
+from skills.fiscal_dataset import load_dataset
+from skills.projection_cache import projection_cache_info
+from skills.trend_forecasting import INDICATOR_REGISTRY, register_indicator
+
+def test_repeated_projection_is_a_cache_hit(data_file):
+    first = project_budget(data_file)
+    second = project_budget(data_file)
+    assert first == second
+    info = projection_cache_info()
+    assert info["hits"] == 1
+    assert info["misses"] == 1
+
+def test_parameters_are_part_of_the_key(data_file):
+    base = project_budget(data_file)
+    faster = project_budget(data_file, revenue_growth_rate=0.1)
+    assert projection_cache_info()["misses"] == 2
+    assert faster["projected_revenue"][0]["projected_amount"] > base["projected_revenue"][0]["projected_amount"]
+
+def test_changed_content_invalidates_the_entry(data_file, sample_data):
+    before = project_budget(data_file)
+    sample_data["revenue"][0]["amount"] = 9000
+    with open(data_file, 'w') as f:
+        json.dump(sample_data, f)
+    # Make sure the dataset loader sees a new file version even on coarse mtime clocks
+    stat = os.stat(data_file)
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    after = project_budget(data_file)
+    assert projection_cache_info()["hits"] == 0
+    assert after["projected_revenue"][0]["projected_amount"] == 9000 * 1.05
+    assert before["projected_revenue"][0]["projected_amount"] == 5000 * 1.05
+
+def test_callers_cannot_corrupt_cached_results(data_file):
+    dataset = load_dataset(data_file)
+    first = project_budget(dataset=dataset)
+    first["projected_revenue"][0]["projected_amount"] = -1
+    first["projected_inflation"]["rate"] = 99
+    first["extra"] = True
+    second = project_budget(dataset=dataset)
+    assert second["projected_revenue"][0]["projected_amount"] == 5000 * 1.05
+    assert second["projected_inflation"]["rate"] != 99
+    assert "extra" not in second
+
+def test_numpy_growth_rates_share_the_key_of_plain_ones(data_file):
+    plain = project_budget(data_file, horizon=3, growth_rates={"revenue": {"Grants": [0.1, 0.2]}})
+    arrays = project_budget(data_file, horizon=3, growth_rates={"revenue": {"Grants": np.array([0.1, 0.2])}})
+    assert plain == arrays
+    assert projection_cache_info()["hits"] == 1
+    project_budget(data_file, horizon=3, growth_rates={"revenue": {"Grants": np.float32(0.5)}})
+
+def test_empty_growth_rate_list_is_rejected(data_file):
+    with pytest.raises(ValueError, match="Grants"):
+        project_budget(data_file, horizon=2, growth_rates={"revenue": {"Grants": []}})
+
+@pytest.mark.parametrize("growth_rates, match", [
+    ({"revenue": {"Grnats": 0.1}}, "Grnats"),
+    ({"expenditure": {"Grants": 0.1}}, "Grants"),
+    ({"revenues": {"Grants": 0.1}}, "revenues"),
+])
+def test_unknown_growth_table_entries_are_rejected(data_file, growth_rates, match):
+    with pytest.raises(ValueError, match=match):
+        project_budget(data_file, horizon=2, growth_rates=growth_rates)
+
+def test_registering_an_indicator_refreshes_cached_projections(tmp_path, sample_data):
+    sample_data["unemployment"] = [{"year": str(year), "rate": rate} for year, rate in [(2020, 6.0), (2021, 5.5)]]
+    path = tmp_path / "with_unemployment.json"
+    path.write_text(json.dumps(sample_data))
+    assert "projected_unemployment" not in project_budget(str(path))
+    try:
+        register_indicator("unemployment")
+        assert project_budget(str(path))["projected_unemployment"]["rate"] == 5.0
+    finally:
+        INDICATOR_REGISTRY.pop("unemployment", None)
+    assert "projected_unemployment" not in project_budget(str(path))
+    assert projection_cache_info()["hits"] == 1
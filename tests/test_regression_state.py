@@ -0,0 +1,60 @@
+import json
+import numpy as np
+import pytest
+from skills.budget_projection_tool import project_budget
+from skills.fiscal_dataset import load_dataset
+from skills.regression_state import RegressionState, rolling_indicator_projections
+
+def weighted_fit(points: dict, decay: float):
+    years = np.array(sorted(points), dtype=np.float64)
+    values = np.array([points[year] for year in sorted(points)])
+    weights = decay ** (years.max() - years)
+    # np.polyfit weights the residuals, so pass the square root of the observation weights
+    return np.polyfit(years - years.min(), values, 1, w=np.sqrt(weights))
+
+def assert_matches_refit(state: RegressionState):
+    fresh = RegressionState.from_series(list(state.points), list(state.points.values()),
+                                        window=state.window, decay=state.decay)
+    assert state.last_year == fresh.last_year
+    assert state.forecast(3)[2] == pytest.approx(fresh.forecast(3)[2])
+    slope, _ = state.coefficients()
+    assert slope == pytest.approx(weighted_fit(state.points, state.decay)[0])
+
+@pytest.mark.parametrize("decay", [1.0, 0.8])
+def test_updates_and_removals_match_a_refit(decay):
+    state = RegressionState.from_series(range(2010, 2020), [1.5, 2.0, 2.2, 1.9, 2.8, 3.1, 2.9, 3.5, 3.4, 4.0],
+                                        decay=decay)
+    state.update(2015, 2.5)
+    state.remove(2012)
+    assert_matches_refit(state)
+    state.remove(2019)  # the latest year
+    assert state.last_year == 2018
+    assert_matches_refit(state)
+    state.update(2020, 4.4)
+    assert_matches_refit(state)
+
+def test_removing_every_year_empties_the_state():
+    state = RegressionState.from_series([2020, 2021], [1.0, 2.0])
+    state.remove(2021)
+    state.remove(2020)
+    assert state.forecast(1)[0] == "none"
+    state.update(2030, 5.0)
+    assert state.origin == 2030
+
+def test_rolling_projections_match_project_budget(data_file, sample_data):
+    expected = project_budget(data_file)
+    assert rolling_indicator_projections(data_file) == {
+        "projected_inflation": expected["projected_inflation"],
+        "projected_gdp_growth": expected["projected_gdp_growth"],
+    }
+    # Drop the latest year and revise another; the saved state must follow
+    del sample_data["inflation"][-1]
+    sample_data["inflation"][0]["rate"] = 1.8
+    sample_data["gdp_growth"] = sample_data["gdp_growth"][:1]
+    with open(data_file, 'w') as f:
+        json.dump(sample_data, f)
+    dataset = load_dataset(data_file)
+    expected = project_budget(dataset=dataset)
+    rolling = rolling_indicator_projections(dataset=dataset)
+    assert rolling["projected_inflation"] == expected["projected_inflation"]
+    assert rolling["projected_gdp_growth"] == expected["projected_gdp_growth"] == {}
@@ -0,0 +1,38 @@
+import os
+from skills.budget_projection_tool import project_budget
+from skills.fiscal_dataset import load_dataset
+from skills.report_compiler_tool import compile_report
+from skills.risk_identification_tool import risk_identification
+from skills.tax_slab_tool import create_tax_slabs
+from skills.visualization_tool import create_plot_artifacts
+
+def files_under(directory):
+    return sorted(os.path.relpath(os.path.join(root, name), directory)
+                  for root, _, names in os.walk(directory) for name in names)
+
+def compile_from(data_file, output_pdf, plots):
+    projections = project_budget(data_file)
+    compile_report(projections, risk_identification(projections), create_tax_slabs(projections),
+                   output_pdf=str(output_pdf), plots=plots)
+    with open(output_pdf, 'rb') as f:
+        return f.read()
+
+def test_in_memory_plots_are_embedded_without_touching_disk(monkeypatch, tmp_path, data_file):
+    monkeypatch.chdir(tmp_path)
+    before = files_under(tmp_path)
+    artifacts = create_plot_artifacts(load_dataset(data_file))
+    assert [artifact.path for artifact in artifacts] == [None] * 4
+    assert files_under(tmp_path) == before
+
+    pdf = compile_from(data_file, tmp_path / "report.pdf", artifacts)
+    assert pdf.count(b"/Subtype /Image") == len(artifacts)
+    assert files_under(tmp_path) == sorted(before + ["report.pdf"])
+    assert not os.path.exists(tmp_path / "visual plots")
+
+def test_empty_plot_list_reads_no_directory(monkeypatch, tmp_path, data_file):
+    # A stale plots directory from an earlier run must not end up in the report
+    monkeypatch.chdir(tmp_path)
+    create_plot_artifacts(load_dataset(data_file), output_dir="visual plots")
+    assert os.path.exists(tmp_path / "visual plots" / "manifest.json")
+    pdf = compile_from(data_file, tmp_path / "report.pdf", [])
+    assert b"/Subtype /Image" not in pdf
@@ -0,0 +1,48 @@
+import itertools
+import numpy as np
+import pytest
+from skills.risk_identification_tool import risk_identification, score_risk_batch
+
+def scalar_rules(total_revenue, total_expenditure, inflation_rate, gdp_growth_rate):
+    """
+    The original one-scenario implementation of risk_identification's rules.
+    """
+    deficit_ratio = 1 if total_revenue == 0 else (total_expenditure - total_revenue) / total_revenue
+    deficit_risk = 1 if deficit_ratio > 0.1 else 0.5 if deficit_ratio > 0 else 0
+    inflation_risk = 1 if inflation_rate > 4 else 0.5 if inflation_rate >= 3 else 0
+    gdp_risk = 1 if gdp_growth_rate < 2.5 else 0.5 if gdp_growth_rate < 3 else 0
+    risk_score = 0.4 * deficit_risk + 0.3 * inflation_risk + 0.3 * gdp_risk
+    ranking = "low" if risk_score < 0.3 else "medium" if risk_score < 0.6 else "high"
+    return deficit_risk, inflation_risk, gdp_risk, risk_score, ranking
+
+# Values on and next to every cut-off: deficit ratios -0.01, 0, 0.05, 0.1, 0.10001 and 1 for
+# a revenue of 100, plus a zero revenue; inflation around 3 and 4; GDP growth around 2.5 and 3
+TOTALS = [(100, 99), (100, 100), (100, 105), (100, 110), (100, 110.001), (100, 200), (0, 50)]
+INFLATION = [2.999, 3.0, 3.5, 4.0, 4.001]
+GDP_GROWTH = [2.499, 2.5, 2.75, 2.999, 3.0, 3.001]
+GRID = [(revenue, expenditure, inflation, gdp) for (revenue, expenditure), inflation, gdp
+        in itertools.product(TOTALS, INFLATION, GDP_GROWTH)]
+
+def test_batch_matches_the_scalar_rules_at_every_threshold():
+    revenue, expenditure, inflation, gdp = (np.array(column, dtype=np.float64) for column in zip(*GRID))
+    scores = score_risk_batch(inflation, gdp, revenue, expenditure)
+    expected = [scalar_rules(*cell) for cell in GRID]
+    deficit_risk, inflation_risk, gdp_risk, risk_score, ranking = zip(*expected)
+    assert scores["deficit_risk"].tolist() == list(deficit_risk)
+    assert scores["inflation_risk"].tolist() == list(inflation_risk)
+    assert scores["gdp_risk"].tolist() == list(gdp_risk)
+    assert scores["risk_score"].tolist() == list(risk_score)
+    assert scores["ranking"].tolist() == list(ranking)
+    # The score cut-offs themselves are reached exactly
+    assert {0.3, 0.6} <= set(risk_score)
+
+@pytest.mark.parametrize("cell", GRID[::7] + [GRID[-1]])
+def test_risk_identification_matches_the_scalar_rules(cell):
+    revenue, expenditure, inflation, gdp = cell
+    projections = {
+        "projected_revenue": [{"name": "Tax", "projected_amount": revenue}],
+        "projected_expenditure": [{"name": "Health", "projected_amount": expenditure}],
+        "projected_inflation": {"year": 2023, "rate": inflation},
+        "projected_gdp_growth": {"year": 2023, "rate": gdp},
+    }
+    assert risk_identification(projections) == scalar_rules(*cell)[-1]
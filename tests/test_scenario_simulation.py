@@ -0,0 +1,14 @@
+import pytest
+from skills.scenario_simulation_tool import simulate_scenarios
+
+def test_results_do_not_depend_on_the_workers(data_file):
+    serial = simulate_scenarios(data_file, n_scenarios=2_500, seed=42, batch_size=1_000, workers=1)
+    parallel = simulate_scenarios(data_file, n_scenarios=2_500, seed=42, batch_size=1_000, workers=3)
+    assert serial == parallel
+    assert sum(serial["risk_ranking_probabilities"].values()) == pytest.approx(1)
+    assert simulate_scenarios(data_file, n_scenarios=2_500, seed=43, batch_size=1_000, workers=1) != serial
+
+@pytest.mark.parametrize("options", [{"n_scenarios": 0}, {"batch_size": 0}, {"batch_size": -5}])
+def test_non_positive_sizes_are_rejected(data_file, options):
+    with pytest.raises(ValueError, match=next(iter(options))):
+        simulate_scenarios(data_file, **options)
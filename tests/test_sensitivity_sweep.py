@@ -0,0 +1,50 @@
+import itertools
+import pytest
+from skills.budget_projection_tool import project_budget
+from skills.risk_identification_tool import score_risk_batch
+from skills.sensitivity_sweep import sweep_parameters
+
+REVENUE_GROWTH = [0.0, 0.05, 0.3]
+EXPENDITURE_GROWTH = [0.02, 0.2]
+INFLATION_MEDIUM = [2.5, 3.9]
+WEIGHTS = [(0.4, 0.3, 0.3), (0.6, 0.2, 0.2)]
+
+def direct_cell(data_file, revenue_growth, expenditure_growth, inflation_medium, weights, horizon):
+    """
+    One grid point evaluated the slow way: a full projection, then the scorer on its totals.
+    """
+    projections = project_budget(data_file, revenue_growth_rate=revenue_growth,
+                                 expenditure_growth_rate=expenditure_growth, horizon=horizon)
+    totals = [sum(item.get("projected_amounts", [item["projected_amount"]])[-1] for item in projections[key])
+              for key in ("projected_revenue", "projected_expenditure")]
+    return score_risk_batch(projections["projected_inflation"]["rate"], projections["projected_gdp_growth"]["rate"],
+                            *totals, thresholds={"inflation_medium": inflation_medium}, weights=weights), totals
+
+@pytest.mark.parametrize("chunk_size", [5, 24, 1000])
+@pytest.mark.parametrize("horizon", [1, 3])
+def test_chunked_sweep_matches_per_cell_evaluation(data_file, chunk_size, horizon):
+    table = sweep_parameters(data_file, REVENUE_GROWTH, EXPENDITURE_GROWTH,
+                             thresholds={"inflation_medium": INFLATION_MEDIUM}, weights=WEIGHTS,
+                             horizon=horizon, chunk_size=chunk_size)
+    assert table["shape"] == (3, 2, 2, 2)
+    cells = list(itertools.product(REVENUE_GROWTH, EXPENDITURE_GROWTH, INFLATION_MEDIUM, WEIGHTS))
+    assert len(table["risk_score"]) == len(cells) == 24
+    for row, cell in enumerate(cells):
+        scores, (total_revenue, total_expenditure) = direct_cell(data_file, *cell, horizon)
+        assert (table["revenue_growth"][row], table["expenditure_growth"][row],
+                table["inflation_medium"][row]) == cell[:3]
+        assert (table["deficit_weight"][row], table["inflation_weight"][row], table["gdp_weight"][row]) == cell[3]
+        assert table["total_revenue"][row] == pytest.approx(total_revenue)
+        assert table["total_expenditure"][row] == pytest.approx(total_expenditure)
+        assert table["deficit_ratio"][row] == pytest.approx(float(scores["deficit_ratio"]))
+        assert table["risk_score"][row] == pytest.approx(float(scores["risk_score"]))
+        assert table["ranking"][row] == scores["ranking"]
+
+def test_the_grid_reaches_every_ranking(data_file):
+    table = sweep_parameters(data_file, REVENUE_GROWTH, EXPENDITURE_GROWTH,
+                             thresholds={"inflation_medium": INFLATION_MEDIUM}, weights=WEIGHTS, chunk_size=7)
+    assert set(table["ranking"].tolist()) == {"low", "medium", "high"}
+
+def test_unknown_threshold_is_rejected(data_file):
+    with pytest.raises(ValueError, match="inflation_mid"):
+        sweep_parameters(data_file, thresholds={"inflation_mid": [3.0]})
@@ -0,0 +1,75 @@
+import json
+import pytest
+from skills.budget_projection_tool import project_budget
+from skills.fiscal_dataset import load_dataset
+from skills.streaming_ingest import StreamingAggregator, ingest_stream, iter_json_values
+
+def write_ndjson(path, sample_data):
+    with open(path, 'w') as f:
+        for section, items in sample_data.items():
+            for item in items:
+                f.write(json.dumps({"section": section, **item}) + "\n")
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 5, 7, 16, 64])
+def test_values_split_across_blocks_are_decoded_whole(tmp_path, block_size):
+    path = tmp_path / "values.ndjson"
+    path.write_text('12345 678\n{"name": "Ré", "amount": 10}\n[1, 2.5] "text" true 99')
+    values = list(iter_json_values(str(path), block_size=block_size))
+    assert values == [12345, 678, {"name": "Ré", "amount": 10}, [1, 2.5], "text", True, 99]
+
+def test_truncated_value_raises(tmp_path):
+    path = tmp_path / "broken.ndjson"
+    path.write_text('{"a": 1}\n{"b": ')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_values(str(path), block_size=4))
+
+def test_stream_keeps_records_like_the_regular_loader(tmp_path, sample_data):
+    sample_data["revenue"].append({"name": "Grants", "amount": 250})
+    path = tmp_path / "input.ndjson"
+    write_ndjson(path, sample_data)
+    dataset = ingest_stream(str(path), block_size=32)
+    assert dataset.validation_result is True
+    assert dataset.data == sample_data
+
+def test_aggregation_is_opt_in(tmp_path, sample_data):
+    sample_data["revenue"].append({"name": "Grants", "amount": 250})
+    path = tmp_path / "input.ndjson"
+    write_ndjson(path, sample_data)
+    revenue = ingest_stream(str(path), aggregate=True).data["revenue"]
+    assert len(revenue) == 3
+    assert {"name": "Grants", "amount": 1250} in revenue
+
+def test_both_modes_of_one_file_are_projected_separately(tmp_path, sample_data):
+    sample_data["revenue"].append({"name": "Grants", "amount": 250})
+    path = tmp_path / "input.ndjson"
+    write_ndjson(path, sample_data)
+    per_record = project_budget(dataset=ingest_stream(str(path)))["projected_revenue"]
+    summed = project_budget(dataset=ingest_stream(str(path), aggregate=True))["projected_revenue"]
+    assert [item["name"] for item in per_record].count("Grants") == 2
+    assert [item["name"] for item in summed].count("Grants") == 1
+    assert project_budget(dataset=ingest_stream(str(path)))["projected_revenue"] == per_record
+
+def test_load_dataset_selects_the_summed_stream(tmp_path, sample_data, data_file):
+    sample_data["revenue"].append({"name": "Grants", "amount": 250})
+    path = str(tmp_path / "input.ndjson")
+    write_ndjson(path, sample_data)
+    summed = load_dataset(path, aggregate_stream=True)
+    assert len(summed.revenue) == 3
+    assert load_dataset(path, aggregate_stream=True) is summed
+    assert len(load_dataset(path).revenue) == 4
+    assert load_dataset(data_file, aggregate_stream=True) is load_dataset(data_file)
+
+def test_summing_keeps_no_records():
+    aggregator = StreamingAggregator(aggregate=True)
+    for index in range(1000):
+        aggregator.add("revenue", {"name": f"Tax {index % 3}", "amount": 1})
+        aggregator.add("inflation", {"year": str(2000 + index % 5), "rate": 2.0})
+    assert aggregator.records == {section: [] for section in aggregator.records}
+    assert len(aggregator.category_totals["revenue"]) == 3
+    assert len(aggregator.to_data()["inflation"]) == 5
+
+def test_invalid_records_fail_validation(tmp_path, sample_data):
+    sample_data["expenditure"][1]["amount"] = "lots"
+    path = tmp_path / "input.ndjson"
+    write_ndjson(path, sample_data)
+    assert ingest_stream(str(path)).validation_result is False
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from skills.tax_microsimulation import TaxSchedule, run_microsimulation
+
+SCHEDULE = TaxSchedule.from_bounds([0, 10_000, 40_000, 100_000], [0.0, 0.1, 0.2, 0.35])
+
+def brute_force_tax(income: float) -> float:
+    tax = 0.0
+    uppers = list(SCHEDULE.lower[1:]) + [float("inf")]
+    for lower, upper, rate in zip(SCHEDULE.lower, uppers, SCHEDULE.rates):
+        if income > lower:
+            tax += rate * (min(income, upper) - lower)
+    return tax
+
+@pytest.fixture
+def incomes():
+    rng = np.random.default_rng(7)
+    values = rng.lognormal(10.5, 1.0, 5_000)
+    values[:4] = [0, 10_000, 40_000, -50]  # bounds and a negative income
+    return values
+
+def test_liabilities_match_brute_force(incomes):
+    expected = [brute_force_tax(income) for income in incomes]
+    assert SCHEDULE.liabilities(incomes) == pytest.approx(expected)
+
+@pytest.mark.parametrize("chunk_bytes", [256, 1 << 20])
+def test_csv_simulation_matches_brute_force(tmp_path, incomes, chunk_bytes):
+    path = tmp_path / "incomes.csv"
+    with open(path, 'w') as f:
+        f.write("id,Income\n")
+        f.writelines(f"{row},{income!r}\n" for row, income in enumerate(incomes.tolist()))
+    report = run_microsimulation(str(path), SCHEDULE, workers=1, chunk_bytes=chunk_bytes)
+    assert report["taxpayers"] == len(incomes)
+    assert report["total_tax"] == pytest.approx(sum(brute_force_tax(income) for income in incomes))
+    top = np.searchsorted(SCHEDULE.lower, np.maximum(incomes, 0), side="right") - 1
+    assert [slab["taxpayers"] for slab in report["slabs"]] == np.bincount(top, minlength=4).tolist()
+    # Bracket revenues add up to the same total, split by bracket instead of by taxpayer
+    assert sum(slab["bracket_revenue"] for slab in report["slabs"]) == pytest.approx(report["total_tax"])
+
+def test_npy_simulation_matches_liabilities(tmp_path, incomes):
+    path = tmp_path / "incomes.npy"
+    np.save(path, incomes)
+    report = run_microsimulation(str(path), SCHEDULE, workers=1, chunk_rows=999)
+    assert report["total_tax"] == pytest.approx(SCHEDULE.liabilities(incomes).sum())
+
+def test_missing_income_column_is_an_error(tmp_path):
+    path = tmp_path / "incomes.csv"
+    path.write_text("id,salary\n1,50000\n")
+    with pytest.raises(ValueError, match="income.*id, salary"):
+        run_microsimulation(str(path), SCHEDULE, workers=1)
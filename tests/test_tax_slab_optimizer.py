@@ -0,0 +1,57 @@
+from itertools import combinations
+import numpy as np
+import pytest
+from skills.tax_microsimulation import TaxSchedule
+from skills.tax_slab_optimizer import IncomeDistribution, optimize_tax_slabs
+from skills.tax_slab_tool import create_tax_slabs
+
+QUANTILES = (0.2, 0.4, 0.6, 0.8, 0.95)
+OPTIONS = {"min_slabs": 2, "max_slabs": 3, "max_top_rate": 0.4, "rate_step": 0.1, "boundary_quantiles": QUANTILES}
+
+@pytest.fixture
+def incomes():
+    return np.random.default_rng(3).lognormal(10, 1, 3_000)
+
+def brute_force(incomes, target, tolerance):
+    """
+    Scores every schedule one by one with the microsimulation liabilities.
+    """
+    bounds = np.unique(np.quantile(incomes, QUANTILES))
+    rate_grid = np.round(np.arange(0.0, 0.4 + 1e-9, 0.1), 10)
+    best = None
+    for slabs in (2, 3):
+        for chosen in combinations(bounds.tolist(), slabs - 1):
+            for rates in combinations(rate_grid.tolist(), slabs):
+                revenue = TaxSchedule.from_bounds([0.0, *chosen], rates).liabilities(incomes).sum()
+                error = abs(revenue - target) / target
+                key = (0, rates[-1], slabs, error) if error <= tolerance else (1, error, slabs, 0.0)
+                if best is None or key < best[0]:
+                    best = (key, [0.0, *chosen], list(rates), revenue)
+    return best
+
+@pytest.mark.parametrize("share", [0.05, 0.12, 0.9])
+@pytest.mark.parametrize("block_cells", [5, 1 << 22])
+def test_optimizer_matches_brute_force(incomes, share, block_cells):
+    target = share * incomes.sum()
+    result = optimize_tax_slabs(incomes, target, tolerance=0.05, block_cells=block_cells, **OPTIONS)
+    _, lower, rates, revenue = brute_force(incomes, target, 0.05)
+    assert result["lower"] == pytest.approx(lower)
+    assert result["rates"] == pytest.approx(rates)
+    assert result["revenue"] == pytest.approx(revenue)
+
+def test_distribution_revenue_matches_liabilities(incomes):
+    schedule = TaxSchedule.from_bounds([0, 20_000, 60_000], [0.05, 0.2, 0.35])
+    assert IncomeDistribution(incomes).revenue(schedule.lower, schedule.rates) == \
+        pytest.approx(schedule.liabilities(incomes).sum())
+
+def test_create_tax_slabs_uses_the_optimizer_with_incomes(tmp_path, incomes):
+    path = tmp_path / "incomes.npy"
+    np.save(path, incomes)
+    projections = {"projected_revenue": [{"name": "Tax", "projected_amount": 1000.0}],
+                   "projected_expenditure": [{"name": "Health", "projected_amount": 1500.0}]}
+    baseline = create_tax_slabs(projections)
+    optimized = create_tax_slabs(projections, income_file=str(path), **OPTIONS)
+    assert optimized != baseline
+    schedule = TaxSchedule.from_slabs(optimized)
+    target = TaxSchedule.from_slabs(baseline).liabilities(incomes).sum() + 500.0
+    assert schedule.liabilities(incomes).sum() == pytest.approx(target, rel=0.01)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from skills.trend_forecasting import forecast_batch
+
+SERIES = [
+    ([2015, 2016, 2017, 2018, 2019, 2020], [1.2, 1.9, 2.1, 2.8, 3.0, 3.9]),
+    ([2017, 2019, 2020, 2022], [5.0, 4.1, 4.4, 3.2]),  # ragged, with gaps
+    ([2021], [2.5]),
+    ([], []),
+]
+
+def polyfit_forecast(years, values, target):
+    slope, intercept = np.polyfit(years, values, 1)
+    return slope * target + intercept
+
+def test_linear_batch_matches_polyfit():
+    result = forecast_batch(SERIES, horizon=3)
+    assert result["methods"].tolist() == ["linear", "linear", "mean", "none"]
+    assert result["counts"].tolist() == [6, 4, 1, 0]
+    for row, (years, values) in enumerate(SERIES[:2]):
+        assert result["years"][row].tolist() == [years[-1] + 1, years[-1] + 2, years[-1] + 3]
+        expected = [polyfit_forecast(years, values, year) for year in result["years"][row]]
+        assert result["values"][row] == pytest.approx(expected)
+    assert result["values"][2].tolist() == [2.5] * 3
+    assert np.isnan(result["values"][3]).all()
+    assert result["years"][3].tolist() == [-1] * 3
+
+def test_ses_batch_matches_a_loop():
+    result = forecast_batch(SERIES, horizon=2, method="ses", alpha=0.3)
+    for row, (years, values) in enumerate(SERIES[:2]):
+        level = values[0]
+        for value in values[1:]:
+            level = 0.3 * value + 0.7 * level
+        assert result["values"][row] == pytest.approx([level, level])
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        forecast_batch(SERIES, method="arima")
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import pytest
+import orchestrator
+from agents import data_manager_agent
+from orchestrator import Stage, WorkflowError, run_stages
+from skills.data_validation_tool import validate_data
+from skills.fiscal_dataset import load_dataset
+
+def stage(name, calls, inputs=(), outputs=(), after=(), error=None):
+    async def run(**kwargs):
+        calls.append(name)
+        if error:
+            raise error
+        return {key: f"{name}:{key}" for key in outputs}
+    return Stage(name, run, inputs=inputs, outputs=outputs, after=after)
+
+def test_stages_run_in_dependency_order():
+    calls = []
+    stages = [
+        stage("report", calls, inputs=("projections", "slabs")),
+        stage("tax", calls, inputs=("projections",), outputs=("slabs",)),
+        stage("budget", calls, inputs=("dataset",), outputs=("projections",), after=("validate",)),
+        stage("validate", calls),
+    ]
+    context = asyncio.run(run_stages(stages, {"dataset": None}))
+    assert calls == ["validate", "budget", "tax", "report"]
+    assert context["slabs"] == "tax:slabs"
+
+def test_failed_stage_stops_its_dependents():
+    calls = []
+    stages = [
+        stage("validate", calls, outputs=("checked",), error=WorkflowError("Data validation failed")),
+        stage("budget", calls, inputs=("checked",), outputs=("projections",)),
+        stage("report", calls, after=("budget",)),
+    ]
+    with pytest.raises(WorkflowError, match="Data validation failed"):
+        asyncio.run(run_stages(stages))
+    assert calls == ["validate"]
+
+def test_running_siblings_are_cancelled_on_failure():
+    finished = []
+    async def slow():
+        await asyncio.sleep(10)
+        finished.append("slow")
+        return {}
+    async def failing():
+        raise WorkflowError("stop")
+    with pytest.raises(WorkflowError):
+        asyncio.run(run_stages([Stage("slow", slow), Stage("failing", failing)]))
+    assert finished == []
+
+@pytest.mark.parametrize("stages, message", [
+    ([Stage("a", None, outputs=("x",)), Stage("b", None, outputs=("x",))], "produced by both"),
+    ([Stage("a", None, inputs=("x",))], "no stage produces it"),
+    ([Stage("a", None, after=("missing",))], "unknown stages"),
+    ([Stage("a", None, after=("b",)), Stage("b", None, after=("a",))], "Circular"),
+])
+def test_invalid_graphs_are_rejected(stages, message):
+    with pytest.raises(WorkflowError, match=message):
+        asyncio.run(run_stages(stages))
+
+def test_stage_missing_an_output_fails():
+    calls = []
+    async def incomplete():
+        return {}
+    with pytest.raises(WorkflowError, match="did not return"):
+        asyncio.run(run_stages([Stage("a", incomplete, outputs=("x",)), stage("b", calls, inputs=("x",))]))
+    assert calls == []
+
+def test_run_workflow_reports_the_failure(monkeypatch, tmp_path):
+    data_file = tmp_path / "input_data.json"
+    data_file.write_text(json.dumps({"revenue": [{"name": "Income Tax", "amount": 100}], "expenditure": []}))
+    monkeypatch.setattr(orchestrator, "INPUT_DATA_PATH", str(data_file))
+    calls = []
+    stages = [
+        stage("data_manager", calls, inputs=("dataset",), outputs=("data_validation",),
+              error=WorkflowError("Data validation failed")),
+        stage("budget", calls, inputs=("dataset",), outputs=("projections",), after=("data_manager",)),
+    ]
+    result = asyncio.run(orchestrator.run_workflow(stages))
+    assert result == {"status": "failed", "reason": "Data validation failed"}
+    assert calls == ["data_manager"]
+
+def capture_report(monkeypatch):
+    captured = {}
+    def fake_report_skills(**kwargs):
+        captured.update(kwargs)
+        return {"report_path": "report.pdf"}
+    monkeypatch.setattr(orchestrator, "run_report_skills", fake_report_skills)
+    return captured
+
+@pytest.mark.parametrize("plots_dir, plots, expected", [
+    (None, None, []),                       # plot files disabled: never read a directory
+    ("charts", None, None),                 # read the run's own plots directory
+    ("charts", ["artifact"], ["artifact"]),
+])
+def test_report_stage_uses_the_runs_plots_dir(monkeypatch, plots_dir, plots, expected):
+    captured = capture_report(monkeypatch)
+    asyncio.run(orchestrator.report_stage({}, "low", [], plots=plots, deterministic=True, plots_dir=plots_dir))
+    assert captured["visual_plots_dir"] == plots_dir
+    assert captured["plots"] == expected
+
+def test_workflow_hands_its_plots_dir_to_the_report(monkeypatch):
+    captured = capture_report(monkeypatch)
+    report = next(stage for stage in orchestrator.build_workflow_stages(deterministic=True, plots_dir="charts")
+                  if stage.name == "report")
+    asyncio.run(report.run(projections={}, risk_level="low", tax_slabs=[], plots=[]))
+    assert captured["visual_plots_dir"] == "charts"
+
+def test_plots_are_rendered_when_the_agent_skips_its_tool(monkeypatch, data_file):
+    class SilentAgent:
+        async def run(self, user_prompt):
+            validate_data(dataset=dataset)  # validates but never calls the plot tool
+            return type("Result", (), {"data": {"data_valid": True}})()
+
+    dataset = load_dataset(data_file)
+    monkeypatch.setattr(data_manager_agent, "create_data_manager_agent", lambda *args: SilentAgent())
+    result = asyncio.run(orchestrator.data_manager_stage(dataset, plots_dir=None))
+    assert [plot.name for plot in result["plots"]] == ["pie_chart_revenues", "bar_plot_expenditure",
+                                                       "scatter_plot_gdp_growth", "scatter_plot_inflation"]